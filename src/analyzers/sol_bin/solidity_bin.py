@@ -73,9 +73,16 @@ def analyze_evm_from_solidity(output_path,
             binary=inp['binary'])
 
         env.build_cfg()
+        jump_targets = {}
+        if global_params.STATIC_CFG != 'never':
+            jump_targets = env.get_jump_targets()
         interpreter = evm_interpreter.EVMInterpreter(env, inp['contract'],
                                                      context)
         interpreter.sym_exec()
+        # jumps not reached by symbolic execution in time are added from the
+        # static resolution
+        if global_params.STATIC_CFG == 'always' or context.timeout:
+            env.add_jump_targets(jump_targets)
 
         # add cfg
         cfg_report.set_contract_cfg(inp['contract'], env)
@@ -102,6 +109,7 @@ def analyze_evm_from_solidity(output_path,
     cfg_report.dump_cfg_json()
     cfg_report.dump_cfg_edge_list()
     cfg_report.dump_cfg_abstract()
+    cfg_report.dump_coverage()
 
     if global_params.DEBUG_MOD:
         cfg_report.print_cfg_graph()
@@ -0,0 +1,80 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+// A constant product pool with internal balances, for
+// benchmarks/evm_benchmark.py
+contract AMM {
+    uint256 public reserve0;
+    uint256 public reserve1;
+    uint256 public totalShares;
+    uint256 public fee = 3;
+    uint256 public kLast;
+    address public feeTo;
+
+    mapping(address => uint256) public shares;
+    mapping(address => uint256) public balance0;
+    mapping(address => uint256) public balance1;
+
+    function deposit(uint256 amount0, uint256 amount1) external {
+        balance0[msg.sender] += amount0;
+        balance1[msg.sender] += amount1;
+    }
+
+    function addLiquidity(uint256 amount0, uint256 amount1)
+        external
+        returns (uint256 minted)
+    {
+        require(balance0[msg.sender] >= amount0, "balance0");
+        require(balance1[msg.sender] >= amount1, "balance1");
+        balance0[msg.sender] -= amount0;
+        balance1[msg.sender] -= amount1;
+        if (totalShares == 0) {
+            minted = amount0 + amount1;
+        } else {
+            uint256 share0 = (amount0 * totalShares) / reserve0;
+            uint256 share1 = (amount1 * totalShares) / reserve1;
+            minted = share0 < share1 ? share0 : share1;
+        }
+        require(minted > 0, "minted");
+        shares[msg.sender] += minted;
+        totalShares += minted;
+        reserve0 += amount0;
+        reserve1 += amount1;
+        kLast = reserve0 * reserve1;
+    }
+
+    function removeLiquidity(uint256 amount) external {
+        require(shares[msg.sender] >= amount, "shares");
+        uint256 amount0 = (amount * reserve0) / totalShares;
+        uint256 amount1 = (amount * reserve1) / totalShares;
+        shares[msg.sender] -= amount;
+        totalShares -= amount;
+        reserve0 -= amount0;
+        reserve1 -= amount1;
+        balance0[msg.sender] += amount0;
+        balance1[msg.sender] += amount1;
+        kLast = reserve0 * reserve1;
+    }
+
+    function swap0For1(uint256 amountIn) external returns (uint256 amountOut) {
+        require(balance0[msg.sender] >= amountIn, "balance0");
+        uint256 inWithFee = amountIn * (1000 - fee);
+        amountOut = (inWithFee * reserve1) / (reserve0 * 1000 + inWithFee);
+        require(amountOut > 0 && amountOut < reserve1, "output");
+        balance0[msg.sender] -= amountIn;
+        balance1[msg.sender] += amountOut;
+        reserve0 += amountIn;
+        reserve1 -= amountOut;
+    }
+
+    function swap1For0(uint256 amountIn) external returns (uint256 amountOut) {
+        require(balance1[msg.sender] >= amountIn, "balance1");
+        uint256 inWithFee = amountIn * (1000 - fee);
+        amountOut = (inWithFee * reserve0) / (reserve1 * 1000 + inWithFee);
+        require(amountOut > 0 && amountOut < reserve0, "output");
+        balance1[msg.sender] -= amountIn;
+        balance0[msg.sender] += amountOut;
+        reserve1 += amountIn;
+        reserve0 -= amountOut;
+    }
+}
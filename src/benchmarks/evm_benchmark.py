@@ -0,0 +1,199 @@
+"""Benchmark for symbolic execution of evm bytecode.
+
+Compiles solidity files, symbolically executes every contract in them and
+prints the executed instructions, instructions per second and coverage of
+each contract, e.g.
+
+    cd src && python3 -m benchmarks.evm_benchmark -p /path/to/project a.sol
+
+Storage heavy contracts to benchmark are in benchmarks/contracts, e.g.
+
+    cd src && python3 -m benchmarks.evm_benchmark -p benchmarks/contracts \
+        benchmarks/contracts/ERC20.sol benchmarks/contracts/AMM.sol
+
+With -e all, every contract is executed with every search strategy, so their
+coverage reached at the timeout can be compared. With -m both, every contract
+is executed with and without state merging, to compare their paths and time.
+With --schedule, the time and paths of every function are printed.
+"""
+import argparse
+import time
+
+from evm_engine.input_dealer import input_helper
+from evm_engine.interpreter import evm_interpreter
+from evm_engine.interpreter import explorer
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import smt_util
+from evm_engine.runtime import evm_runtime
+from utils import context as ctx
+from utils import global_params, log
+
+
+def analyze_contract(inp, context):
+    cache = smt_util.SIMPLIFY_CACHE
+    cache.clear()
+    env = evm_runtime.EvmRuntime(context,
+                                 opcodes=inp['opcodes'],
+                                 source_map=inp['source_map'],
+                                 src_file=inp['src_file'],
+                                 input_type=global_params.LanguageType.SOLIDITY,
+                                 binary=inp['binary'])
+    start = time.time()
+    env.build_cfg()
+    build_time = time.time() - start
+
+    interpreter = evm_interpreter.EVMInterpreter(env, inp['contract'],
+                                                 context)
+    interpreter.sym_exec()
+
+    return {
+        'contract': inp['contract'],
+        'simplify': 'lazy' if global_params.LAZY_SIMPLIFY else 'eager',
+        'strategy': global_params.SEARCH_STRATEGY,
+        'merge': global_params.MERGE_STATES,
+        'build_cfg_time': build_time,
+        'sym_exec_time': interpreter.exec_time,
+        'instructions': interpreter.get_executed_instructions(),
+        'instructions_per_second': interpreter.get_instructions_per_second(),
+        'simplify_calls': cache.hits + cache.misses,
+        'simplify_misses': cache.misses,
+        'paths': dict(interpreter.total_no_of_paths),
+        'solver': interpreter.get_solver_stats(),
+        'merged_states': interpreter.merged_states,
+        'function_budgets': interpreter.function_budgets,
+        'max_live_paths': interpreter.max_live_paths,
+        'state_bytes_per_path': interpreter.get_state_size_per_path(),
+        'visited_edges': len(interpreter.total_visited_edges),
+        'visited_pcs': len(interpreter.total_visited_pc),
+        'total_pcs': len(env.instructions),
+        'timeout': context.timeout,
+        'error': context.error_type.name,
+    }
+
+
+def benchmark_file(project_path, src_path, modes, strategies, merges):
+    context = ctx.Context(time.time(), project_path, src_path, [], '')
+    helper = input_helper.InputHelper(global_params.LanguageType.SOLIDITY,
+                                      project_dir=project_path,
+                                      src_file=src_path,
+                                      root_path=project_path,
+                                      include_paths=context.include_paths)
+    inputs, _ = helper.get_solidity_inputs({}, global_params.DEST_PATH)
+    results = []
+    for inp in inputs:
+        for lazy in modes:
+            for strategy in strategies:
+                for merge in merges:
+                    global_params.LAZY_SIMPLIFY = lazy
+                    global_params.SEARCH_STRATEGY = strategy
+                    global_params.MERGE_STATES = merge
+                    # every contract has a whole timeout budget
+                    context.start = time.time()
+                    context.timeout = False
+                    results.append(analyze_contract(inp, context))
+    return results
+
+
+def print_result(src_path, result):
+    merge = ', merging states' if result['merge'] else ''
+    print(f'{src_path}:{result["contract"]} ({result["simplify"]} simplify, '
+          f'{result["strategy"]} search{merge})')
+    print(f'    build cfg time:    {result["build_cfg_time"]:.3f} s')
+    print(f'    sym exec time:     {result["sym_exec_time"]:.3f} s')
+    print(f'    instructions:      {result["instructions"]}')
+    print(f'    instructions/s:    {result["instructions_per_second"]:.0f}')
+    print(f'    simplify calls:    {result["simplify_calls"]} '
+          f'({result["simplify_misses"]} not cached)')
+    print(f'    paths:             {result["paths"]}')
+    solver = result['solver']
+    print(f'    pruned branches:   {solver["pruned"]} '
+          f'({solver["queries"]} queries, {solver["solver_checks"]} solved, '
+          f'{solver["solver_time"]:.3f} s)')
+    print(f'    discarded states:  {solver["discarded_states"]} '
+          f'(blocked {solver["blocked_time"]:.3f} s)')
+    print(f'    merged states:     {result["merged_states"]}')
+    for name, budget in result['function_budgets'].items():
+        print(f'    {name}: {budget["time"]:.3f} s, {budget["paths"]} paths')
+    print(f'    max live paths:    {result["max_live_paths"]}')
+    print(f'    state bytes/path:  {result["state_bytes_per_path"]:.0f}')
+    print(f'    visited edges:     {result["visited_edges"]}')
+    print(f'    visited pcs:       {result["visited_pcs"]}/'
+          f'{result["total_pcs"]}')
+    print(f'    timeout:           {result["timeout"]}')
+    print(f'    error:             {result["error"]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('files', nargs='+', help='solidity files to analyze')
+    parser.add_argument('-p',
+                        '--project',
+                        default='.',
+                        help='project directory of the solidity files')
+    parser.add_argument('-t',
+                        '--timeout',
+                        type=int,
+                        default=global_params.SYM_TIMEOUT,
+                        help='symbolic execution timeout of every contract')
+    parser.add_argument('-b',
+                        '--backend',
+                        choices=smt.BACKENDS,
+                        default=global_params.SYMBOLIC_BACKEND,
+                        help='backend of symbolic expressions')
+    parser.add_argument('-s',
+                        '--simplify',
+                        choices=('eager', 'lazy', 'both'),
+                        default='eager',
+                        help='when to simplify arithmetic results, both runs '
+                        'every contract in the two modes')
+    parser.add_argument('-e',
+                        '--strategy',
+                        choices=explorer.STRATEGIES + ('all',),
+                        default=global_params.SEARCH_STRATEGY,
+                        help='search strategy of paths, all runs every '
+                        'contract with every strategy')
+    parser.add_argument('--prune',
+                        action='store_true',
+                        help='prune infeasible branches with the solver')
+    parser.add_argument('-w',
+                        '--workers',
+                        type=int,
+                        default=global_params.SOLVER_WORKERS,
+                        help='solver worker processes for --prune, 0 for '
+                        'solving in this process')
+    parser.add_argument('-m',
+                        '--merge',
+                        choices=('off', 'on', 'both'),
+                        default='off',
+                        help='merge states at join blocks, both runs every '
+                        'contract in the two modes')
+    parser.add_argument('--schedule',
+                        action='store_true',
+                        help='explore the functions of a contract in turns, '
+                        'each in its share of the timeout')
+    args = parser.parse_args()
+
+    global_params.SYM_TIMEOUT = args.timeout
+    global_params.PRUNE_INFEASIBLE = args.prune
+    global_params.SOLVER_WORKERS = args.workers
+    global_params.SCHEDULE_FUNCTIONS = args.schedule
+    smt.set_backend(args.backend)
+    log.mylogger = log.get_logger('benchmark')
+    modes = {
+        'eager': [False],
+        'lazy': [True],
+        'both': [False, True]
+    }[args.simplify]
+    if args.strategy == 'all':
+        strategies = explorer.STRATEGIES
+    else:
+        strategies = (args.strategy,)
+    merges = {'off': [False], 'on': [True], 'both': [False, True]}[args.merge]
+    for src_path in args.files:
+        for result in benchmark_file(args.project, src_path, modes, strategies,
+                                     merges):
+            print_result(src_path, result)
+
+
+if __name__ == '__main__':
+    main()
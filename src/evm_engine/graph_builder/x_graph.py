@@ -1,8 +1,8 @@
 import networkx as nx
-import z3
-from z3 import z3util
 
-from utils import util, log
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import smt_util
+from utils import log
 
 
 class Node:
@@ -251,7 +251,7 @@ class InputDataNode(VariableNode):
         self.end = end
 
     def __str__(self):
-        if z3.is_expr(self.start) or z3.is_expr(self.end):
+        if smt.is_expr(self.start) or smt.is_expr(self.end):
             return f'input_{self.count}'
         else:
             return f'input_{self.start}_{self.end}'
@@ -340,8 +340,7 @@ class AddressNode(VariableNode):
         label = 'symbolic_value'
         try:
             label = '0x{}'.format(
-                format(int(str(z3.simplify(util.to_symbolic(self.value)))),
-                       '040x'))
+                format(int(str(smt_util.convert_result(self.value))), '040x'))
         except:  # pylint: disable=bare-except
             pass
         return f'Address({label})'.replace('\n', '')
@@ -499,6 +498,8 @@ class XGraph:
         # @global is the default func
         self.graphs = {'@global': nx.DiGraph(name=cname)}
         self.current_function = '@global'
+        # number of edges of all graphs, which are added by add_branch_edge
+        self.edge_count = 0
 
         # nodes in graph
         self.arith_nodes = set()  # only for {'add', 'sub', 'mul', 'exp'}
@@ -543,7 +544,14 @@ class XGraph:
         self.mapping_var_node = {}
 
     # add and initial a DiGraph for a function
+    def get_size(self):
+        """Return the number of nodes and edges of all graphs."""
+        return self.edge_count + sum(
+            graph.number_of_nodes() for graph in self.graphs.values())
+
     def add_func_graph(self, function_name):
+        if function_name in self.graphs:
+            self.edge_count -= self.graphs[function_name].number_of_edges()
         self.graphs[function_name] = nx.DiGraph(name=function_name)
 
     # get the DiGraph of a function by function name
@@ -569,7 +577,7 @@ class XGraph:
             self._add_node(self.mapping_var_node[var])
             return self.mapping_var_node[var]
         else:
-            if z3.is_expr(var):
+            if smt.is_expr(var):
                 node = VariableNode(str(var), var)
             else:
                 node = ConstNode(str(var), var)
@@ -603,6 +611,7 @@ class XGraph:
                                    str(edge[1]),
                                    graph[edge[0]][edge[1]]['type'], edge_type)
             else:
+                self.edge_count += 1
                 if path and label:
                     graph.add_edge(edge[0],
                                    edge[1],
@@ -619,13 +628,14 @@ class XGraph:
     # add an expression node of expr value to graph,
     # if cached in mapping_expr_node, add the old node
     def add_expression_node(self, expr):
+        expr = smt_util.convert_observed(expr)
         # be a const or a variable, e.g. 0 or BitVecVal('a', 256)
-        if not z3.is_expr(expr) or z3.is_const(expr):
+        if not smt.is_expr(expr) or smt.is_const(expr):
             return self.add_var(expr)
         graph = self.graphs[self.current_function]
         # search expr in mapping_expr_node, and add it to graph
-        for key, e_node in self.mapping_expr_node.items():
-            if util.convert_result_to_int(key - expr) == 0:
+        for key, e_node in self._find_items(self.mapping_expr_node, expr):
+            if smt_util.convert_result_to_int(key - expr) == 0:
                 if not graph.has_node(e_node):
                     graph.add_node(e_node)
                     flow_edges = []
@@ -642,13 +652,21 @@ class XGraph:
         graph.add_node(e_node)
 
         flow_edges = []
-        for var in z3util.get_vars(expr):
+        for var in smt.get_vars(expr):
             node = self.add_var(var)
             e_node.add_from_node(node)
             flow_edges.append((node, e_node))
         self.add_branch_edge(flow_edges, 'value_flow')
         return e_node
 
+    # items of mapping to search for a key equal to expr, the item of expr
+    # itself comes first so that the search usually stops at it
+    @staticmethod
+    def _find_items(mapping, expr):
+        if expr in mapping:
+            yield expr, mapping[expr]
+        yield from mapping.items()
+
     # add a constraint node of constraint
     def add_constraint_node(self, path_conditions, pc, path, name=''):
         constraint = path_conditions['path_condition'][-1]
@@ -668,6 +686,10 @@ class XGraph:
             self.mapping_constraint_node[pc] = e_node
         else:
             e_node.add_constraint(constraint, path)
+            # the branch into a function names the node, whichever branch
+            # of the jump is explored first
+            if name and not e_node.name:
+                e_node.name = name
 
         graph = self.graphs[self.current_function]
         graph.add_node(e_node)
@@ -734,11 +756,12 @@ class XGraph:
 
     # add address node of expr to graph
     def add_address_node(self, expr):
+        expr = smt_util.convert_observed(expr)
         graph = self.graphs[self.current_function]
 
         # get address node from mapping address node
-        for key, a_node in self.mapping_address_node.items():
-            if util.convert_result_to_int(key - expr) == 0:
+        for key, a_node in self._find_items(self.mapping_address_node, expr):
+            if smt_util.convert_result_to_int(key - expr) == 0:
                 if not graph.has_node(a_node):
                     graph.add_node(a_node)
                 flow_edge = []
@@ -754,12 +777,12 @@ class XGraph:
         self.mapping_address_node[expr] = a_node
         graph.add_node(a_node)
         flow_edges = []
-        if not z3.is_expr(expr):
+        if not smt.is_expr(expr):
             node = self.add_var(expr)
             flow_edges.append((node, a_node))
             a_node.add_from_node(node)
         else:
-            for var in z3util.get_vars(expr):
+            for var in smt.get_vars(expr):
                 node = self.add_var(var)
                 flow_edges.append((node, a_node))
                 a_node.add_from_node(node)
@@ -850,8 +873,8 @@ class XGraph:
             # add value from var_node in param to sha_node
             param = node.get_param()
             if param is not None:
-                if not z3.is_const(param):
-                    for var in z3util.get_vars(param):
+                if not smt.is_const(param):
+                    for var in smt.get_vars(param):
                         var_node = self.add_var(var)
                         self.add_branch_edge([(var_node, node)], 'value_flow')
                 else:
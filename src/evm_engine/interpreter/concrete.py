@@ -0,0 +1,149 @@
+"""Concrete 256-bit evaluation of EVM arithmetic, comparison and bitwise ops.
+
+All operands and results are python ints in [0, 2**256), and every function
+follows the semantics of the yellow paper, e.g. division by zero is zero.
+"""
+
+WORD_BITS = 256
+WORD_MASK = 2**WORD_BITS - 1
+SIGN_BIT = 2**(WORD_BITS - 1)
+
+
+def to_signed(value):
+    """Interpret an unsigned 256-bit word as a two's complement int."""
+    return value - 2**WORD_BITS if value & SIGN_BIT else value
+
+
+def to_unsigned(value):
+    """Wrap a python int into an unsigned 256-bit word."""
+    return value & WORD_MASK
+
+
+def add(first, second):
+    return (first + second) & WORD_MASK
+
+
+def mul(first, second):
+    return (first * second) & WORD_MASK
+
+
+def sub(first, second):
+    return (first - second) & WORD_MASK
+
+
+def div(first, second):
+    if second == 0:
+        return 0
+    return first // second
+
+
+def sdiv(first, second):
+    if second == 0:
+        return 0
+    first, second = to_signed(first), to_signed(second)
+    sign = -1 if (first < 0) != (second < 0) else 1
+    return to_unsigned(sign * (abs(first) // abs(second)))
+
+
+def mod(first, second):
+    if second == 0:
+        return 0
+    return first % second
+
+
+def smod(first, second):
+    if second == 0:
+        return 0
+    first, second = to_signed(first), to_signed(second)
+    sign = -1 if first < 0 else 1
+    return to_unsigned(sign * (abs(first) % abs(second)))
+
+
+def addmod(first, second, third):
+    if third == 0:
+        return 0
+    return (first + second) % third
+
+
+def mulmod(first, second, third):
+    if third == 0:
+        return 0
+    return (first * second) % third
+
+
+def exp(base, exponent):
+    return pow(base, exponent, 2**WORD_BITS)
+
+
+def signextend(first, second):
+    if first >= 31:
+        return second
+    sign_bit = 1 << (8 * first + 7)
+    if second & sign_bit:
+        return second | (2**WORD_BITS - sign_bit)
+    return second & (sign_bit - 1)
+
+
+def lt(first, second):
+    return 1 if first < second else 0
+
+
+def gt(first, second):
+    return 1 if first > second else 0
+
+
+def slt(first, second):
+    return 1 if to_signed(first) < to_signed(second) else 0
+
+
+def sgt(first, second):
+    return 1 if to_signed(first) > to_signed(second) else 0
+
+
+def eq(first, second):
+    return 1 if first == second else 0
+
+
+def iszero(first):
+    return 1 if first == 0 else 0
+
+
+def and_(first, second):
+    return first & second
+
+
+def or_(first, second):
+    return first | second
+
+
+def xor(first, second):
+    return first ^ second
+
+
+def not_(first):
+    return first ^ WORD_MASK
+
+
+def byte(index, value):
+    if index >= 32:
+        return 0
+    return (value >> (8 * (31 - index))) & 0xff
+
+
+def shl(shift, value):
+    if shift >= WORD_BITS:
+        return 0
+    return (value << shift) & WORD_MASK
+
+
+def shr(shift, value):
+    if shift >= WORD_BITS:
+        return 0
+    return value >> shift
+
+
+def sar(shift, value):
+    value = to_signed(value)
+    if shift >= WORD_BITS:
+        return WORD_MASK if value < 0 else 0
+    return to_unsigned(value >> shift)
@@ -1,16 +1,25 @@
-import copy
-import re
+import math
 import time
 import traceback
 
 import six
-import z3
-import math
 
 from evm_engine.graph_builder import x_graph
+from evm_engine.interpreter import concrete
+from evm_engine.interpreter import evm_memory
 from evm_engine.interpreter import evm_params
+from evm_engine.interpreter import explorer
+from evm_engine.interpreter import feasibility
+from evm_engine.interpreter import keccak
+from evm_engine.interpreter import merging
 from evm_engine.interpreter import opcodes
+from evm_engine.interpreter import persistent
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import smt_util
+from evm_engine.interpreter import solver_pool
 from evm_engine.interpreter import symbolic_var_generator
+from evm_engine.interpreter import world_state
+from evm_engine.runtime import cfg_analysis
 from utils import util, global_params, errors, log, context
 
 
@@ -20,6 +29,8 @@ class EVMInterpreter:
         self.cname = cname
         self.context = context
         self.runtime = runtime
+        # the backend may be configured after the modules are imported
+        smt_util.configure()
 
         self.gen = symbolic_var_generator.Generator()
 
@@ -32,7 +43,11 @@ class EVMInterpreter:
             'normal': 0,
             'exception': 0,
             'loopLimit': 0,
-            'gasLimit': 0
+            'gasLimit': 0,
+            'duplicate': 0,
+            'revert': 0,
+            'unchanged': 0,
+            'saturated': 0
         }
         self.paths = [
         ]  # all paths, e.g. [[block1, block2, ...], [block1, block3, ...]]
@@ -42,10 +57,6 @@ class EVMInterpreter:
         self.total_visited_pc = {}
         # total visited edges and its times
         self.total_visited_edges = {}
-        # function visited edges and its times,
-        # None for not in function,
-        # else in a function
-        self.function_visited_edges = None
 
         # TODO(Yang): should add evm bytecode Node in XGraph?
         # the evm runtime bytecode of the contract.
@@ -53,55 +64,120 @@ class EVMInterpreter:
             self.runtime.binary)  # contract's bytecode in bytes
         # function name on current visiting, null str for not in a function
         self.current_function = ''
-        # the path we're visiting
-        self.current_path = []
-        # TODO(Yang): solvers for solver z3 constraints,
-        #  but it's not used now for efficiency
-        self.single_solver = z3.Solver()
-        self.global_solver = z3.Solver()
-        self.single_solver.set('timeout', evm_params.Z3_TIMEOUT)
-        self.global_solver.set('timeout', evm_params.Z3_TIMEOUT)
+        # solver checks of branches, used if global_params.PRUNE_INFEASIBLE
+        self.feasibility = feasibility.FeasibilityChecker()
+        # workers answering the checks, None for checking in this process
+        self.solver_pool = None
+        # states dropped for the unsat answer of their branch
+        self.discarded_states = 0
+        # time waiting for the answers of the workers
+        self.wait_time = 0
+        # states merged into others, see merging
+        self.merged_states = 0
+        # function name -> fingerprints of the states executed in it
+        self.visited_states = {}
+        # blocks which can only revert -> the next block of their paths, see
+        # cfg_analysis.get_revert_blocks
+        self.revert_blocks = {}
+        # edges of the static and resolved CFG, where loops are bounded at
+        # back edges only, if global_params.LOOP_BOUNDS is 'headers'
+        self.loop_edges = set()
+        # (latch, header) edges of the natural loops, see cfg_analysis.CfgIndex
+        self.back_edges = set()
+        self.loop_headers = set()
+        # blocks starting with JUMPDEST, whose addresses states are not
+        # merged by, if global_params.MERGE_STATES
+        self.jump_dests = set()
+        # start blocks of the functions not reaching the diff, skipped if
+        # global_params.CHANGED_FUNCTIONS_ONLY
+        self.unchanged_functions = set()
+        # function -> its time spent and paths terminated, if
+        # global_params.SCHEDULE_FUNCTIONS
+        self.function_budgets = {}
+        # function -> [paths since its last path adding coverage, time of
+        # that path]
+        self.saturation = {}
+        # functions adding coverage since their last path, and the coverage
+        # it is measured from
+        self.new_coverage = set()
+        self.coverage = None
+        # function -> reason of stopping exploring it before its paths end
+        self.stop_reasons = {}
+        # symbolic data hashed by SHA3 -> its hash variable
+        self.sha3_vars = {}
+        # pc of SHA3 -> number of hash variables of different data
+        self.sha3_counts = {}
+
+        # opcode handlers indexed by opcode, e.g. self._handlers[0x01] is ADD
+        self._handlers = self._build_handlers()
+        # time spent in sym_exec, for instructions per second
+        self.exec_time = 0
+        # max number of paths in the worklist
+        self.max_live_paths = 0
+        # number of paths left in the worklist, not 0 if stopped by timeout
+        self.open_paths = 0
+        # bytes of path states not shared with other paths, summed over all
+        # terminated paths
+        self.path_state_size = 0
 
     def get_function_from_start_block(self, block):
-        if block in self.runtime.start_block_to_func_sig:
-            func_sig = self.runtime.start_block_to_func_sig[block]
-            if self.runtime.source_map.sig_to_func is not None:
-                current_func_name = None
-                for key in self.runtime.source_map.sig_to_func:
-                    # eval for situations like "0x0abc" == "0xabc"
-                    if eval('0x' + key) == eval('0x' + func_sig):
-                        current_func_name = self.runtime.source_map.sig_to_func[
-                            key]
-                        break
-                if current_func_name is not None:
-                    pattern = r'(\w[\w\d_]*)\((.*)\)$'
-                    match = re.match(pattern, current_func_name)
-                    if match:
-                        current_func_name = list(match.groups())[0]
-                else:
-                    current_func_name = func_sig
-            else:
-                current_func_name = func_sig
-            return current_func_name
-        else:
-            return None
+        return self.runtime.start_block_to_func_name.get(block)
 
     def sym_exec(self):
         path_conditions_and_vars = {
-            'path_condition': [],
-            'path_condition_node': [],
-            'branch_flag': []
+            'path_condition': persistent.LinkedList(),
+            'path_condition_node': persistent.LinkedList(),
+            'branch_flag': persistent.LinkedList()
         }
-        global_state = {'balance': {}, 'pc': 0}
+        global_state = {'balance': world_state.StateMap(), 'pc': 0}
         self._init_global_state(path_conditions_and_vars, global_state)
         params = Parameter(path_conditions_and_vars=path_conditions_and_vars,
                            global_state=global_state)
+        distances = {}
+        if (global_params.SEARCH_STRATEGY == 'directed' or
+                global_params.CHANGED_FUNCTIONS_ONLY):
+            distances = cfg_analysis.get_changed_distances(self.runtime)
+        if global_params.CHANGED_FUNCTIONS_ONLY and distances:
+            self.unchanged_functions = {
+                block for block in self.runtime.start_block_to_func_sig
+                if block not in distances
+            }
+        if global_params.SCHEDULE_FUNCTIONS:
+            worklist = explorer.ScheduledWorklist(
+                lambda: explorer.new_worklist(global_params.SEARCH_STRATEGY,
+                                              self.total_visited_edges,
+                                              distances), self._get_task,
+                self.function_budgets,
+                len(self.runtime.start_block_to_func_sig) + 1,
+                global_params.SYM_TIMEOUT - (time.time() - self.context.start),
+                global_params.FUNCTION_PATH_BUDGET)
+        else:
+            worklist = explorer.new_worklist(global_params.SEARCH_STRATEGY,
+                                             self.total_visited_edges,
+                                             distances)
+        if global_params.MERGE_STATES:
+            self.jump_dests = cfg_analysis.get_jump_dests(self.runtime)
+            worklist = explorer.MergingWorklist(
+                worklist, self._get_join_blocks(), self._merge_states)
+        if global_params.SKIP_REVERT_BLOCKS:
+            self.revert_blocks = cfg_analysis.get_revert_blocks(self.runtime)
+        if (global_params.LOOP_BOUNDS == 'headers' or
+                global_params.LOOP_SUMMARY_K > 0):
+            self._set_loops()
+        worklist.push([explorer.State(params, 0, 0, [], None)])
+        if global_params.PRUNE_INFEASIBLE and global_params.SOLVER_WORKERS > 0:
+            self.solver_pool = solver_pool.get_pool(
+                global_params.SOLVER_WORKERS,
+                global_params.MAX_PENDING_QUERIES)
+        start_time = time.time()
         try:
-            self._sym_exec_block(params, 0, 0)
+            self._explore(worklist)
         except TimeoutError:
             log.mylogger.error('system timeout for %s', self.cname)
             self.context.set_timeout()
-            self.context.set_err(context.ExecErrorType.SYMBOL_TIMEOUT)
+            # the XGraph and visited edges so far are kept as the results
+            if not global_params.ANYTIME_RESULTS:
+                self.context.set_err(context.ExecErrorType.SYMBOL_TIMEOUT)
             return None
         except Exception as err:  # pylint: disable=broad-except
             traceback.print_exc()
@@ -110,95 +186,410 @@ class EVMInterpreter:
                 'cause error when symbolic execute for %s, err: %s', self.cname,
                 str(err))
             return None
+        finally:
+            self.exec_time = time.time() - start_time
+            self.open_paths = len(worklist)
+            if global_params.MERGE_STATES:
+                self.merged_states = worklist.merged_states
+            if self.solver_pool is not None:
+                self.solver_pool.cancel()
         return params
 
-    def _enter_block(self, function_name, block):
-        self.current_path.append(block)
+    def get_executed_instructions(self):
+        return sum(self.total_visited_pc.values())
+
+    def get_instructions_per_second(self):
+        if self.exec_time <= 0:
+            return 0
+        return self.get_executed_instructions() / self.exec_time
+
+    def get_state_size_per_path(self):
+        paths = sum(self.total_no_of_paths.values())
+        if paths == 0:
+            return 0
+        return self.path_state_size / paths
+
+    def get_solver_stats(self):
+        stats = self.feasibility.get_stats()
+        stats['discarded_states'] = self.discarded_states
+        stats['blocked_time'] = self.wait_time
+        if self.solver_pool is not None:
+            stats['blocked_time'] += self.solver_pool.blocked_time
+        return stats
+
+    # immediate post dominators of conditional blocks, where the states of
+    # their branches meet and may merge
+    def _get_join_blocks(self):
+        ipdom = self.runtime.get_cfg_index().ipdom
+        return {
+            ipdom[block]
+            for block in self.runtime.vertices
+            if self.runtime.jump_type[block] == 'conditional' and
+            ipdom.get(block) is not None
+        }
+
+    def _merge_states(self, states):
+        return merging.merge(states, global_params.MAX_MERGE_DIFFS,
+                             self.jump_dests, self._add_merge_node)
+
+    # adds the constraint node of the disjunction of the path conditions of
+    # merged states, at the block they merge
+    def _add_merge_node(self, state):
+        self.x_graph.current_function = state.frame.name
+        self.x_graph.add_constraint_node(state.params.path_conditions_and_vars,
+                                         state.block, self.gen.get_path_id())
+
+    # finds the back edges of loops, including the loops through the jumps
+    # resolved statically, e.g. returns of internal functions
+    def _set_loops(self):
+        index = self.runtime.get_cfg_index()
+        self.back_edges = set(index.back_edges)
+        self.loop_headers = set(index.loops)
+        if global_params.LOOP_BOUNDS == 'headers':
+            self.loop_edges = {(block, target)
+                               for block, targets in index.successors.items()
+                               for target in targets}
+
+    def _explore(self, worklist):
+        while worklist:
+            state = worklist.pop()
+            self._record_coverage(state)
+            if state.pending and self._is_infeasible(state):
+                self.discarded_states += 1
+                self._exit_frame(state.frame)
+                continue
+            if (self.stop_reasons and
+                    self._get_task(state) in self.stop_reasons):
+                self._terminate_path('saturated', state, None)
+                self._exit_frame(state.frame)
+                continue
+            if state.block in self.unchanged_functions:
+                log.mylogger.debug('skip unchanged function at block %d',
+                                   state.block)
+                self._terminate_path('unchanged', state, None)
+                self._exit_frame(state.frame)
+                continue
+            if self.revert_blocks and self._skip_revert(state):
+                self._exit_frame(state.frame)
+                continue
+            successors = self._sym_exec_block(state)
+            self._record_coverage(state)
+            if successors:
+                # the successors take the place of state in its function
+                if state.frame is not None:
+                    state.frame.states += len(successors) - 1
+                worklist.push(successors)
+                self.max_live_paths = max(self.max_live_paths, len(worklist))
+            else:
+                self._exit_frame(state.frame)
+
+    def _enter_block(self, function_name, state):
+        if state.frame is None:
+            self.x_graph.current_function = '@global'
+        else:
+            self.x_graph.current_function = state.frame.name
+
+        # the constraint of the branch taken to the block
+        if state.branch is not None:
+            pc, name = state.branch
+            self.x_graph.add_constraint_node(
+                state.params.path_conditions_and_vars, pc,
+                self.gen.get_path_id(), name)
+
+        state.path.append(state.block)
 
         if function_name is not None:
             log.mylogger.debug('enter function %s', function_name)
             self.x_graph.add_func_graph(function_name)
             self.x_graph.current_function = function_name
-            self.function_visited_edges = {}
-
-    def _exit_block(self, function_name):
-        self.current_path.pop()
+            state.frame = explorer.Frame(function_name, state.frame)
 
-        if function_name is not None:
-            log.mylogger.debug('exit function %s', function_name)
+    def _exit_frame(self, frame):
+        # a path is terminated, exit the functions no other path is in
+        while frame is not None:
+            frame.states -= 1
+            if frame.states > 0:
+                return
+            log.mylogger.debug('exit function %s', frame.name)
             self.x_graph.current_function = '@global'
             self.current_function = '@global'
-            self.function_visited_edges = None
+            frame = frame.parent
+
+    # returns True if a state of the same block, stack, memory, storage,
+    # balances, calls and path conditions was executed in the function,
+    # and records the state otherwise
+    def _is_duplicate(self, state):
+        if global_params.STATE_TABLE_SIZE <= 0:
+            return False
+        params = state.params
+        global_state = params.global_state
+        path_condition = params.path_conditions_and_vars['path_condition']
+        # symbolic values by their ids, which the snapshot keeps unique
+        fingerprint = (state.block,
+                       tuple((True, value.get_id()) if smt.is_expr(value) else
+                             (False, value) for value in params.stack),
+                       tuple(params.calls), params.memory.get_hash(),
+                       global_state['storage'].get_hash(),
+                       global_state['balance'].get_hash(),
+                       path_condition.get_hash())
+        name = '@global' if state.frame is None else state.frame.name
+        fingerprints = self.visited_states.get(name)
+        if fingerprints is None:
+            fingerprints = util.LruCache(global_params.STATE_TABLE_SIZE)
+            self.visited_states[name] = fingerprints
+        snapshot = fingerprints.get(fingerprint)
+        # the hashes of memory, maps and path conditions may collide
+        if snapshot is not None and _is_same_snapshot(snapshot, params):
+            return True
+        fingerprints.put(fingerprint,
+                         (tuple(params.stack), params.memory.copy(),
+                          global_state['storage'].copy(),
+                          global_state['balance'].copy(),
+                          path_condition.copy()))
+        return False
+
+    # update visited edges for global and function's symbolic execution
+    def _count_edge(self, state, edge):
+        if edge in self.total_visited_edges:
+            updated_count_number = self.total_visited_edges[edge] + 1
+            self.total_visited_edges.update({edge: updated_count_number})
+        else:
+            self.total_visited_edges.update({edge: 1})
+        if state.frame is not None:
+            function_visited_edges = state.frame.visited_edges
+            if edge in function_visited_edges:
+                updated_count_number = function_visited_edges[edge] + 1
+                function_visited_edges.update({edge: updated_count_number})
+            else:
+                function_visited_edges.update({edge: 1})
+
+    # terminates the path of state if its block can only revert, recording
+    # the coverage and REVERT of the blocks as executing them would, returns
+    # True if the path is terminated
+    def _skip_revert(self, state):
+        block = state.block
+        if (block not in self.revert_blocks or
+                self.get_function_from_start_block(block) is not None):
+            return False
+        start_time = time.time() if global_params.DEBUG_MOD else None
+        log.mylogger.debug('reach revert block address %d', block)
+        self._enter_block(None, state)
+        edge = state.get_edge()
+        while True:
+            self._count_edge(state, edge)
+            block_ins = self.runtime.vertices[block].get_decoded_instructions()
+            for ins in block_ins:
+                self.total_visited_pc[ins.pc] = self.total_visited_pc.get(
+                    ins.pc, 0) + 1
+            successor = self.revert_blocks[block]
+            if successor is None:
+                break
+            edge = (block, successor)
+            block = successor
+            state.path.append(block)
+
+        ins = block_ins[-1]
+        if ins.code == opcodes.REVERT.code:
+            self.x_graph.add_terminal_node(
+                x_graph.TerminalNode(ins.name, ins.pc),
+                state.params.path_conditions_and_vars, self.gen.get_path_id())
+        self._terminate_path('revert', state, start_time)
+        return True
+
+    # the function of the dispatcher which state is in or enters, '@global'
+    # for the dispatcher
+    def _get_task(self, state):
+        frame = state.frame
+        if frame is None:
+            name = self.get_function_from_start_block(state.block)
+            return '@global' if name is None else name
+        while frame.parent is not None:
+            frame = frame.parent
+        return frame.name
 
-    def _terminate_path(self, kind, function_name, params, start_time, block):
-        del params  # Unused, reserve for name hint
+    @staticmethod
+    def _is_saturating():
+        return (global_params.SATURATION_PATHS > 0 or
+                global_params.SATURATION_TIME > 0)
+
+    # adds the function of state to new_coverage if the coverage, i.e.
+    # visited edges, pcs, and nodes and edges of the XGraph, grew since the
+    # last call, which was for the state executed before
+    def _record_coverage(self, state):
+        if not self._is_saturating():
+            return
+        coverage = (len(self.total_visited_edges), len(self.total_visited_pc),
+                    self.x_graph.get_size())
+        if coverage != self.coverage:
+            self.coverage = coverage
+            self.new_coverage.add(self._get_task(state))
+
+    # stops exploring the function of state once its paths stop adding
+    # coverage
+    def _check_saturation(self, state):
+        if not self._is_saturating():
+            return
+        task = self._get_task(state)
+        if task in self.stop_reasons:
+            return
+        self._record_coverage(state)
+        now = time.time()
+        saturation = self.saturation.get(task)
+        if saturation is None or task in self.new_coverage:
+            self.new_coverage.discard(task)
+            self.saturation[task] = [0, now]
+            return
+        saturation[0] += 1
+        if 0 < global_params.SATURATION_PATHS <= saturation[0]:
+            reason = f'saturated, {saturation[0]} paths without new coverage'
+        elif 0 < global_params.SATURATION_TIME <= now - saturation[1]:
+            reason = (f'saturated, {now - saturation[1]:.3f} s without new '
+                      f'coverage')
+        else:
+            return
+        log.mylogger.info('stop exploring %s: %s', task, reason)
+        self.stop_reasons[task] = reason
+
+    def _terminate_path(self, kind, state, start_time):
         self.total_no_of_paths[kind] += 1
+        self._check_saturation(state)
+        if global_params.SCHEDULE_FUNCTIONS:
+            self.function_budgets.setdefault(self._get_task(state), {
+                'time': 0,
+                'paths': 0
+            })['paths'] += 1
+        self.path_state_size += state.params.get_private_size()
         self.gen.gen_path_id()
         if global_params.DEBUG_MOD:
-            self.paths.append(copy.deepcopy(self.current_path))
-
-        self._exit_block(function_name)
+            self.paths.append(list(state.path))
 
-        if global_params.DEBUG_MOD:
             end_time = time.time()
             execution_time = end_time - start_time
             log.mylogger.debug('block: %s symbolic execution time: %.6f s',
-                               str(block), execution_time)
+                               str(state.block), execution_time)
             log.mylogger.debug('*********************************')
 
-    # Symbolically executing a block from the start address
-    def _sym_exec_block(self, params, block, pre_block):
+    # returns the loop bound scaled by the fraction of SYM_TIMEOUT left, at
+    # least 1
+    def _get_loop_bound(self, limit):
+        left = global_params.SYM_TIMEOUT - (time.time() - self.context.start)
+        return max(1, math.ceil(limit * left / global_params.SYM_TIMEOUT))
+
+    # returns True if the path of state overcomes the number of unrolling a
+    # loop at the edge to its block
+    def _is_loop_limit(self, state):
+        current_edge = state.get_edge()
+        if current_edge in self.back_edges and current_edge in self.loop_edges:
+            limit = self._get_loop_bound(evm_params.LOOP_LIMIT)
+            edge_limit = self._get_loop_bound(evm_params.EDGE_LIMIT)
+        elif current_edge in self.loop_edges:
+            # not a loop, only the paths of all functions are bounded
+            limit = math.inf
+            edge_limit = evm_params.EDGE_LIMIT
+        else:
+            # TODO(Yang): how to implement better loop detection?
+            #  It's a pay-off between time consuming and coverage
+            limit = evm_params.LOOP_LIMIT
+            if self.runtime.jump_type[state.block] != 'conditional':
+                limit = math.inf
+            edge_limit = evm_params.EDGE_LIMIT
+        if (global_params.LOOP_SUMMARY_K > 0 and
+                current_edge in self.back_edges):
+            # the summary of the loop terminates the path
+            limit = math.inf
+
+        if state.params.visited.get(current_edge, 0) > limit:
+            log.mylogger.debug(
+                'overcome a number of loop limit for path visited. Terminating this path ...')
+            return True
+        if state.frame is None:  # not in a function
+            if self.total_visited_edges.get(current_edge, 0) > edge_limit:
+                log.mylogger.debug('overcome a number of loop limit for total visited. '
+                                   'Terminating this path ...')
+                return True
+        else:  # in a function
+            if state.frame.visited_edges.get(current_edge, 0) > edge_limit:
+                log.mylogger.debug('overcome a number of loop limit for function visited. '
+                                   'Terminating this path ...')
+                return True
+        return False
+
+    # records the stack and storage of state at a loop header, and replaces
+    # the values changed by an iteration with fresh variables at its
+    # LOOP_SUMMARY_K-th back edge, returns True if the path passed the
+    # summarized iteration and is terminated
+    def _summarize_loop(self, state):
+        current_edge = state.get_edge()
+        params = state.params
+        crossings = 0
+        if current_edge in self.back_edges:
+            crossings = params.visited.get(current_edge, 0) + 1
+            if crossings > global_params.LOOP_SUMMARY_K:
+                log.mylogger.debug(
+                    'pass a summarized loop. Terminating this path ...')
+                return True
+        elif state.block not in self.loop_headers:
+            return False
+
+        storage = params.global_state['storage']
+        entry = params.loop_entries.get(state.block)
+        if crossings == global_params.LOOP_SUMMARY_K and entry is not None:
+            log.mylogger.debug('summarize the loop at block %d', state.block)
+            stack, old_storage = entry
+            loop_id = self.gen.gen_loop_id()
+            if len(stack) == len(params.stack):
+                for i, value in enumerate(stack):
+                    if not smt_util.is_same(value, params.stack[i]):
+                        params.stack[i] = self._new_loop_var(
+                            state.block, loop_id, f'stack_{i}')
+            for key, value in list(storage.items()):
+                if key not in old_storage or not smt_util.is_same(
+                        value, old_storage[key]):
+                    storage[key] = self._new_loop_var(state.block, loop_id,
+                                                      f'storage_{key}')
+        params.loop_entries[state.block] = (tuple(params.stack),
+                                            storage.copy())
+        return False
+
+    def _new_loop_var(self, block, loop_id, slot):
+        name = self.gen.gen_loop_var(block, loop_id, slot)
+        var = smt.BitVec(name, 256)
+        self.x_graph.cache_var_node(var, x_graph.VariableNode(name, var))
+        return var
+
+    # Symbolically executing a block from the start address, returns the
+    # states of its successors, none for the path is terminated
+    def _sym_exec_block(self, state):
         start_time = None
         if global_params.DEBUG_MOD:
             start_time = time.time()
 
+        params = state.params
+        block = state.block
         log.mylogger.debug('*********************************')
         log.mylogger.debug('reach block address %d', block)
 
         # find if we're into a function
         function_name = self.get_function_from_start_block(block)
-        self._enter_block(function_name, block)
+        self._enter_block(function_name, state)
 
         visited = params.visited
-        current_edge = (pre_block, block)
+        current_edge = state.get_edge()
 
         # check unexpected block address
         if block < 0 or block not in self.runtime.vertices:
             log.mylogger.error(
                 'unknown block address %d. Terminating this path ...', block)
-            self._terminate_path('exception', function_name, params, start_time,
-                                 block)
-            return
+            self._terminate_path('exception', state, start_time)
+            return []
 
-        # TODO(Yang): how to implement better loop detection?
-        #  It's a pay-off between time consuming and coverage
-        if (current_edge in visited and
-                visited[current_edge] > evm_params.LOOP_LIMIT and
-                self.runtime.jump_type[block] == 'conditional'):
-            log.mylogger.debug(
-                'overcome a number of loop limit for path visited. Terminating this path ...')
-            self._terminate_path('loopLimit', function_name, params, start_time,
-                                 block)
-            return
-        else:
-            if self.function_visited_edges is None:  # not in a function
-                if current_edge in self.total_visited_edges and \
-                        self.total_visited_edges[
-                            current_edge] > 10:
-                    log.mylogger.debug('overcome a number of loop limit for total visited. '
-                                       'Terminating this path ...')
-                    self._terminate_path('loopLimit', function_name, params,
-                                         start_time, block)
-                    return
-            else:  # in a function
-                if current_edge in self.function_visited_edges and \
-                        self.function_visited_edges[
-                            current_edge] > 10:
-                    log.mylogger.debug('overcome a number of loop limit for function visited. '
-                                       'Terminating this path ...')
-                    self._terminate_path('loopLimit', function_name, params,
-                                         start_time, block)
-                    return
+        if self._is_loop_limit(state):
+            self._terminate_path('loopLimit', state, start_time)
+            return []
+        if (global_params.LOOP_SUMMARY_K > 0 and
+                self._summarize_loop(state)):
+            self._terminate_path('loopLimit', state, start_time)
+            return []
 
         # TODO(Yang): gas_used cannot be calculated accurately because of miu,
         #  now we keep the less used gas by instructions and less memory used,
@@ -206,30 +597,33 @@ class EVMInterpreter:
         #  exactly
         if params.gas > evm_params.GAS_LIMIT:
             log.mylogger.debug('run out of gas. Terminating this path ... ')
-            self._terminate_path('gasLimit', function_name, params, start_time,
-                                 block)
-            return
+            self._terminate_path('gasLimit', state, start_time)
+            return []
+
+        if self._is_duplicate(state):
+            log.mylogger.debug(
+                'reach a visited state. Terminating this path ...')
+            self._terminate_path('duplicate', state, start_time)
+            return []
 
         # Execute every instruction, one at a time
         # TODO(Yang): Exception is caught, it may be a bug, but it should not
         #  influence other path
-        block_ins = self.runtime.vertices[block].get_instructions()
+        block_ins = self.runtime.vertices[block].get_decoded_instructions()
         try:
-            for instr in block_ins:
-                self._sym_exec_ins(params, block, instr)
+            for ins in block_ins:
+                self._sym_exec_ins(params, block, ins)
         except errors.JumpTargetError as err:
             log.mylogger.error(
                 'jump Target Error: %s, Terminating this path ...', str(err))
-            self._terminate_path('exception', function_name, params, start_time,
-                                 block)
-            return
+            self._terminate_path('exception', state, start_time)
+            return []
         except TimeoutError as err:
             # global timeout means the analysis should be ended
             # globally, so we raise up
             log.mylogger.error('global timeout: %s, Terminating this path ...',
                                str(err))
-            self._terminate_path('exception', function_name, params, start_time,
-                                 block)
+            self._terminate_path('exception', state, start_time)
             raise err
 
         # update visited edges for current path
@@ -238,29 +632,14 @@ class EVMInterpreter:
             visited.update({current_edge: updated_count_number})
         else:
             visited.update({current_edge: 1})
-        # update visited edges for global symbolic execution
-        if current_edge in self.total_visited_edges:
-            updated_count_number = self.total_visited_edges[current_edge] + 1
-            self.total_visited_edges.update(
-                {current_edge: updated_count_number})
-        else:
-            self.total_visited_edges.update({current_edge: 1})
-        # update functions visited edges for function's symbolic execution
-        if self.function_visited_edges is not None:
-            if current_edge in self.function_visited_edges:
-                updated_count_number = self.function_visited_edges[
-                    current_edge] + 1
-                self.function_visited_edges.update(
-                    {current_edge: updated_count_number})
-            else:
-                self.function_visited_edges.update({current_edge: 1})
+        self._count_edge(state, current_edge)
 
+        successors = []
         # go to next basic block or terminate according to jump type
         if self.runtime.jump_type[block] == 'terminal':
             log.mylogger.debug('normally terminating this path ...')
-            self._terminate_path('normal', function_name, params, start_time,
-                                 block)
-            return
+            self._terminate_path('normal', state, start_time)
+            return []
 
         elif self.runtime.jump_type[
                 block] == 'unconditional':  # executing 'JUMP'
@@ -272,12 +651,13 @@ class EVMInterpreter:
             # target for 'JUMP'
             if successor is None:
                 log.mylogger.error('successor of unconditional jump is None')
-                self._terminate_path('exception', function_name, params,
-                                     start_time, block)
-                return
+                self._terminate_path('exception', state, start_time)
+                return []
             else:
                 params.global_state['pc'] = successor
-                self._sym_exec_block(params, successor, block)
+                successors.append(
+                    explorer.State(params, successor, block, state.path,
+                                   state.frame, pending=state.pending))
 
         elif self.runtime.jump_type[
                 block] == 'falls_to':  # just follow to the next basic block
@@ -285,15 +665,16 @@ class EVMInterpreter:
             #  it's an unexpected condition, which means falls to target is none
             if successor is None:
                 log.mylogger.error('Successor of falls to is None')
-                self._terminate_path('exception', function_name, params,
-                                     start_time, block)
-                return
+                self._terminate_path('exception', state, start_time)
+                return []
             else:
                 params.global_state['pc'] = successor
-                self._sym_exec_block(params, successor, block)
+                successors.append(
+                    explorer.State(params, successor, block, state.path,
+                                   state.frame, pending=state.pending))
 
         elif self.runtime.jump_type[block] == 'conditional':
-            # A choice point, we proceed with depth first search
+            # A choice point, the left branch is explored first
             branch_expression = self.runtime.vertices[
                 block].get_branch_expression()
 
@@ -305,14 +686,18 @@ class EVMInterpreter:
                 #  we get string format of branch condition for simple
                 #  judgement of impossible path
                 str_expr = ""
-                if z3.is_const(branch_expression):
+                if smt.is_const(branch_expression):
                     str_expr = str(branch_expression)
 
+                end = self.runtime.vertices[block].end
                 left_branch = self.runtime.vertices[block].get_jump_target()
                 # find if left_branch is the start block of a new function
                 selector = self.get_function_from_start_block(left_branch)
+                negated_branch_expression = smt.Not(branch_expression)
 
-                if str_expr != 'False':
+                left_check = str_expr != 'False' and self._check_branch(
+                    params, branch_expression)
+                if left_check:
                 # if True:
                     # we copy params for one branch of conditional jump
                     new_params = params.copy()
@@ -322,51 +707,41 @@ class EVMInterpreter:
                     new_params.path_conditions_and_vars['branch_flag'].append(
                         True)
 
-                    if selector is not None:
-                        self.x_graph.add_constraint_node(
-                            new_params.path_conditions_and_vars,
-                            self.runtime.vertices[block].end,
-                            self.gen.get_path_id(),
-                            f'{selector}()',
-                        )
-                    else:
-                        self.x_graph.add_constraint_node(
-                            new_params.path_conditions_and_vars,
-                            self.runtime.vertices[block].end,
-                            self.gen.get_path_id(),
-                        )
-                    self._sym_exec_block(new_params, left_branch, block)
+                    name = '' if selector is None else f'{selector}()'
+                    successors.append(
+                        explorer.State(new_params, left_branch, block,
+                                       list(state.path), state.frame,
+                                       (end, name),
+                                       self._add_query(state, left_check)))
                 else:
-                    c = copy.deepcopy(self.current_path)
+                    c = list(state.path)
                     c.append(left_branch)
                     self.impossible_paths.append(c)
 
-                negated_branch_expression = z3.Not(branch_expression)
                 right_branch = self.runtime.vertices[block].get_falls_to()
 
-                if str_expr != 'True':
+                right_check = str_expr != 'True' and self._check_branch(
+                    params, negated_branch_expression)
+                if right_check:
                 # if True:
                     params.global_state['pc'] = right_branch
                     params.path_conditions_and_vars['path_condition'].append(
                         negated_branch_expression)
                     params.path_conditions_and_vars['branch_flag'].append(False)
 
-                    self.x_graph.add_constraint_node(
-                        params.path_conditions_and_vars,
-                        self.runtime.vertices[block].end,
-                        self.gen.get_path_id(),
-                    )
-                    self._sym_exec_block(params, right_branch, block)
+                    successors.append(
+                        explorer.State(params, right_branch, block,
+                                       state.path, state.frame, (end, ''),
+                                       self._add_query(state, right_check)))
                 else:
-                    c = copy.deepcopy(self.current_path)
+                    c = list(state.path)
                     c.append(left_branch)
                     self.impossible_paths.append(c)
             else:
                 log.mylogger.error(
                     'branch expression of conditional jump is None')
-                self._terminate_path('exception', function_name, params,
-                                     start_time, block)
-                return
+                self._terminate_path('exception', state, start_time)
+                return []
         else:
             raise NotImplementedError('unknown Jump-Type')
         if global_params.DEBUG_MOD:
@@ -376,8 +751,7 @@ class EVMInterpreter:
                                str(block), execution_time)
             log.mylogger.debug('*********************************')
 
-        self._exit_block(function_name)
-        return
+        return successors
 
     # TODO(Yang): 1.slot precision; 2.memory model; 3.sha3;
     #  4.system contracts call; 5.evm instructions expansion;
@@ -400,1206 +774,1095 @@ class EVMInterpreter:
 
     #  scc:
     #  instructions:
-    def _sym_exec_ins(self, params, block, instr):
+    def _sym_exec_ins(self, params, block, ins):
         start_time = time.time()
         # we detect global timeout for symbolic execution for every instruction
         if (start_time - self.context.start) >= global_params.SYM_TIMEOUT:
             raise TimeoutError('global timeout')
 
         stack = params.stack
-        # mem = params.mem
-        memory = params.memory
-        global_state = params.global_state
-        path_conditions_and_vars = params.path_conditions_and_vars
-        calls = params.calls
-
         b_len = len(stack)
+        if b_len < ins.pop:
+            raise ValueError('STACK underflow')
+
+        if ins.pc in self.total_visited_pc:
+            self.total_visited_pc[ins.pc] += 1
+        else:
+            self.total_visited_pc[ins.pc] = 1
+
+        if global_params.DEBUG_MOD:
+            log.mylogger.debug('==============================')
+            log.mylogger.debug('Start executing: %s', ins)
+
+        # global_state['pc'] always points to the next instruction, handlers
+        # refer to the executing instruction by ins.pc
+        params.global_state['pc'] = ins.pc + ins.size
+        if ins.code is None:
+            self._op_unknown(params, block, ins)
+        else:
+            self._handlers[ins.code](params, block, ins)
+
+        if (len(stack) - b_len) != (ins.push - ins.pop):
+            raise AssertionError('Stack push and pop un-match')
+        if global_params.DEBUG_MOD:
+            end_time = time.time()
+            execution_time = end_time - start_time
+            log.mylogger.debug('End executing: %s symbolic execution time: %.6f s',
+                               ins, execution_time)
+            log.mylogger.debug('==============================')
+
+    # returns if the branch of condition is feasible, or a
+    # solver_pool.Query answered before the branch is explored
+    def _check_branch(self, params, condition):
+        if not global_params.PRUNE_INFEASIBLE or smt.is_const(condition):
+            return True
+        path_conditions = params.path_conditions_and_vars['path_condition']
+        if self.solver_pool is None:
+            return self.feasibility.is_feasible(path_conditions, condition)
+        return self.feasibility.submit(path_conditions, condition,
+                                       self.solver_pool)
+
+    @staticmethod
+    def _add_query(state, check):
+        if isinstance(check, solver_pool.Query):
+            return state.pending + (check,)
+        return state.pending
+
+    # waits for the queries of the branches taken to the block of state,
+    # returns True if one of them is answered unsat, so nothing of an
+    # infeasible branch is added to the XGraph, coverage or paths
+    def _is_infeasible(self, state):
+        start_time = time.time()
+        pending, state.pending = state.pending, ()
+        infeasible = not all(
+            self.feasibility.poll(query, wait=True) for query in pending)
+        self.wait_time += time.time() - start_time
+        return infeasible
+
+    def _build_handlers(self):
+        """Build the dispatch table of opcode handlers indexed by opcode."""
+        handlers = [self._op_unknown] * 256
+        for code, opcode in six.iteritems(opcodes.BYTECODES):
+            if not 0 <= code < 256:  # not an evm opcode, e.g. TAC operations
+                continue
+            if opcode.is_push():
+                handlers[code] = self._op_push
+            elif opcode.is_dup():
+                handlers[code] = self._op_dup
+            elif opcode.is_swap():
+                handlers[code] = self._op_swap
+            elif opcode.is_log():
+                handlers[code] = self._op_log
+            else:
+                handlers[code] = getattr(self,
+                                         f'_op_{opcode.name.lower()}',
+                                         self._op_unknown)
+        handlers[opcodes.SHA3.code] = self._op_sha3
+        return handlers
+
+    @staticmethod
+    def _op_unknown(params, block, ins):
+        raise NotImplementedError('UNKNOWN INSTRUCTION: ' + ins.name)
+
+    #
+    #  0s: Stop and Arithmetic Operations
+    #
+    @staticmethod
+    def _op_stop(params, block, ins):
+        return
+
+    @staticmethod
+    def _op_invalid(params, block, ins):
+        return
+
+    @staticmethod
+    def _op_add(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.add(first, second))
+        else:
+            computed = (first + second) & evm_params.UNSIGNED_BOUND_NUMBER
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_mul(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.mul(first, second))
+        else:
+            computed = (first * second) & evm_params.UNSIGNED_BOUND_NUMBER
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_sub(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.sub(first, second))
+        else:
+            computed = (first - second) & evm_params.UNSIGNED_BOUND_NUMBER
+            stack.append(smt_util.convert_intermediate(computed))
+
+    # the divisor of DIV, SDIV, MOD, SMOD, ADDMOD and MULMOD should not be
+    # zero, return True if the divisor is zero for sure
+    def _check_divisor(self, params, divisor, ins):
+        if smt.is_expr(divisor):
+            path_conditions_and_vars = params.path_conditions_and_vars
+            path_conditions_and_vars['path_condition'].append(divisor != 0)
+            path_conditions_and_vars['branch_flag'].append(True)
+            self.x_graph.add_constraint_node(path_conditions_and_vars, ins.pc,
+                                             self.gen.get_path_id(),
+                                             f'{ins.name}_{ins.pc}')
+            return False
+        return divisor == 0
+
+    def _op_div(self, params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.div(first, second))
+        elif self._check_divisor(params, second, ins):
+            stack.append(0)
+        else:
+            computed = smt.UDiv(smt_util.to_symbolic(first), second)
+            stack.append(smt_util.convert_intermediate(computed))
+
+    def _op_sdiv(self, params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.sdiv(first, second))
+        elif self._check_divisor(params, second, ins):
+            stack.append(0)
+        else:
+            computed = smt_util.to_symbolic(first) / second
+            stack.append(smt_util.convert_intermediate(computed))
+
+    def _op_mod(self, params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.mod(first, second))
+        elif self._check_divisor(params, second, ins):
+            stack.append(0)
+        else:
+            computed = smt.URem(first, smt_util.to_symbolic(second))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    def _op_smod(self, params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.smod(first, second))
+        elif self._check_divisor(params, second, ins):
+            stack.append(0)
+        else:
+            computed = smt.SRem(first, smt_util.to_symbolic(second))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    def _op_addmod(self, params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+        third = stack.pop()
+
+        if smt_util.is_all_real(first, second, third):
+            stack.append(concrete.addmod(first, second, third))
+        elif self._check_divisor(params, third, ins):
+            stack.append(0)
+        else:
+            computed = smt.URem(first + second, smt_util.to_symbolic(third))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    def _op_mulmod(self, params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+        third = stack.pop()
+
+        if smt_util.is_all_real(first, second, third):
+            stack.append(concrete.mulmod(first, second, third))
+        elif self._check_divisor(params, third, ins):
+            stack.append(0)
+        else:
+            computed = smt.URem(first * second, smt_util.to_symbolic(third))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    def _op_exp(self, params, block, ins):
+        stack = params.stack
+        base = smt_util.convert_observed(stack.pop())
+        exponent = smt_util.convert_observed(stack.pop())
+        # Type conversion is needed when they are mismatched
+        if smt_util.is_all_real(base, exponent):
+            computed = concrete.exp(base, exponent)
+        else:
+            # The computed value is unknown, this is because power is
+            # not supported in bit-vector theory
+            new_var_name = self.gen.gen_exp_var(base, exponent)
+            computed = smt.BitVec(new_var_name, 256)
+            # add to graph
+            # todo: should we add pc for exp nodes
+            node = x_graph.ExpNode(new_var_name, computed, base, exponent)
+            self.x_graph.cache_var_node(computed, node)
+
+        stack.append(computed)
+
+    @staticmethod
+    def _op_signextend(params, block, ins):
+        # todo: review this process
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.signextend(first, second))
+        else:
+            signbit_index_from_right = 8 * first + 7
+            computed = second & ((1 << signbit_index_from_right) - 1)
+            stack.append(smt_util.convert_intermediate(computed))
+
+    #
+    #  10s: Comparison and Bitwise Logic Operations
+    #
+    @staticmethod
+    def _op_lt(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.lt(first, second))
+        else:
+            computed = smt.If(smt.ULT(first, smt_util.to_symbolic(second)),
+                              smt.BitVecVal(1, 256), smt.BitVecVal(0, 256))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_gt(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.gt(first, second))
+        else:
+            computed = smt.If(smt.UGT(first, smt_util.to_symbolic(second)),
+                              smt.BitVecVal(1, 256), smt.BitVecVal(0, 256))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_slt(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.slt(first, second))
+        else:
+            computed = smt.If(
+                smt_util.to_symbolic(first) < second, smt.BitVecVal(1, 256),
+                smt.BitVecVal(0, 256))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_sgt(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.sgt(first, second))
+        else:
+            computed = smt.If(
+                smt_util.to_symbolic(first) > second, smt.BitVecVal(1, 256),
+                smt.BitVecVal(0, 256))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_eq(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.eq(first, second))
+        else:
+            computed = smt.If(first == second, smt.BitVecVal(1, 256),
+                              smt.BitVecVal(0, 256))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_iszero(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+
+        if smt_util.is_all_real(first):
+            stack.append(concrete.iszero(first))
+        else:
+            computed = smt.If(first == 0, smt.BitVecVal(1, 256),
+                              smt.BitVecVal(0, 256))
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_and(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.and_(first, second))
+        else:
+            stack.append(smt_util.convert_intermediate(first & second))
+
+    @staticmethod
+    def _op_or(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.or_(first, second))
+        else:
+            stack.append(smt_util.convert_intermediate(first | second))
+
+    @staticmethod
+    def _op_xor(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.xor(first, second))
+        else:
+            stack.append(smt_util.convert_intermediate(first ^ second))
+
+    @staticmethod
+    def _op_not(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+
+        if smt_util.is_all_real(first):
+            stack.append(concrete.not_(first))
+        else:
+            computed = (~first) & evm_params.UNSIGNED_BOUND_NUMBER
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_byte(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.byte(first, second))
+        else:
+            byte_index = 31 - first
+            computed = smt.LShR(
+                smt_util.to_symbolic(second),
+                (8 * byte_index)) & evm_params.UNSIGNED_BYTE_NUMBER
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_sar(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.sar(first, second))
+        else:
+            computed = smt_util.to_symbolic(second) >> first
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_shr(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
 
-        instr_parts = str.split(instr, ' ')
-        opcode = instr_parts[1]
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.shr(first, second))
+        else:
+            computed = smt.LShR(smt_util.to_symbolic(second), first)
+            stack.append(smt_util.convert_intermediate(computed))
+
+    @staticmethod
+    def _op_shl(params, block, ins):
+        stack = params.stack
+        first = stack.pop()
+        second = stack.pop()
+
+        if smt_util.is_all_real(first, second):
+            stack.append(concrete.shl(first, second))
+        else:
+            stack.append(smt_util.to_symbolic(second) << first)
 
-        visited_pc = instr_parts[0]
+    #
+    # 20s: SHA3
+    # the hash of concrete data is computed, and the hash of symbolic data is
+    # a variable, the same for the same data
+    def _op_sha3(self, params, block, ins):
+        stack = params.stack
+        s0 = smt_util.convert_observed(stack.pop())
+        s1 = smt_util.convert_observed(stack.pop())
+        value = None
+        if smt_util.is_all_real(s0, s1) and s1 <= evm_params.MAX_MEMORY_SIZE:
+            value = params.memory.load(s0, s1) if s1 else 0
+            if not smt.is_expr(value):
+                stack.append(
+                    int.from_bytes(keccak.keccak256(value.to_bytes(s1, 'big')),
+                                   'big'))
+                return
+            computed = self.sha3_vars.get(value)
+            if computed is not None:
+                stack.append(computed)
+                return
 
-        if visited_pc in self.total_visited_pc:
-            self.total_visited_pc[visited_pc] += 1
+        # data of different hashes at a pc are told apart by their order
+        name = str(ins.pc)
+        if value is not None:
+            count = self.sha3_counts.get(ins.pc, 0)
+            self.sha3_counts[ins.pc] = count + 1
+            if count:
+                name = f'{ins.pc}_{count}'
+        new_var_name = self.gen.gen_sha3_var(name)
+        computed = smt.BitVec(new_var_name, 256)
+        node = x_graph.ShaNode(new_var_name, computed, ins.pc, value)
+        self.x_graph.cache_var_node(computed, node)
+        if value is not None:
+            self.sha3_vars[value] = computed
+
+        stack.append(computed)
+
+    #
+    # 30s: Environment Information
+    #
+    @staticmethod
+    def _op_address(params, block, ins):
+        # get address of currently executing account
+        params.stack.append(params.global_state['receiverAddress'])
+
+    # get the balance variable of address, create it if not exist
+    def _get_balance(self, global_state, address):
+        # TODO(Yang): we do not consider balance that
+        #  dealed twice in a path
+        key = global_state['balance'].find(address)
+        if key is not None:
+            new_var = global_state['balance'][key]
         else:
-            self.total_visited_pc[visited_pc] = 1
-
-        log.mylogger.debug('==============================')
-        log.mylogger.debug('Start executing: %s', instr)
-        # log.mylogger.debug('Memory: ' + str(used_mem))
-        # log.mylogger.debug('Stack: %s', str(stack))
-        #
-        #  0s: Stop and Arithmetic Operations
-        #
-        if opcode == 'STOP':
+            new_var_name = self.gen.gen_balance_of(address)
+            new_var = smt.BitVec(new_var_name, 256)
+            global_state['balance'][address] = new_var
+            b_node = x_graph.BalanceNode(new_var_name, new_var, address)
+            self.x_graph.cache_var_node(new_var, b_node)
+        return new_var
+
+    def _op_balance(self, params, block, ins):
+        address = smt_util.convert_observed(params.stack.pop())
+        params.stack.append(self._get_balance(params.global_state, address))
+
+    @staticmethod
+    def _op_caller(params, block, ins):
+        # get caller address that is directly responsible for this execution
+        params.stack.append(params.global_state['senderAddress'])
+
+    @staticmethod
+    def _op_origin(params, block, ins):
+        # get execution origination address
+        params.stack.append(params.global_state['origin'])
+
+    @staticmethod
+    def _op_callvalue(params, block, ins):
+        # get value of this transaction
+        params.stack.append(params.global_state['value'])
+
+    def _op_calldataload(self, params, block, ins):
+        # from input data from environment
+        stack = params.stack
+        start = smt_util.convert_observed(stack.pop())
+        stack.append(self._load_call_data(start))
+
+    def _load_call_data(self, start):
+        end = smt_util.convert_result(start + 31)
+        new_var_name = self.gen.gen_data_var(start, end, self.current_function)
+        value = smt.BitVec(new_var_name, 256)
+        node = x_graph.InputDataNode(new_var_name, value, start, end)
+        self.x_graph.cache_var_node(value, node)
+        return value
+
+    @staticmethod
+    def _op_calldatasize(params, block, ins):
+        params.stack.append(params.global_state['callDataSize'])
+
+    def _op_calldatacopy(self, params, block, ins):
+        # Copy input data to memory
+        stack = params.stack
+        memory_start = smt_util.convert_observed(stack.pop())
+        input_start = smt_util.convert_observed(stack.pop())
+        size = smt_util.convert_observed(stack.pop())
+        self._copy_to_memory(
+            params, memory_start, size, lambda offset: self._load_call_data(
+                smt_util.convert_result(input_start + offset)))
+
+    def _op_codesize(self, params, block, ins):
+        # length of the executing contract's code in bytes
+        params.stack.append(len(self.evm_bytecode))
+
+    def _op_codecopy(self, params, block, ins):
+        # copy executing contract's bytecode
+        stack = params.stack
+        mem_start = smt_util.convert_observed(stack.pop())
+        code_start = smt_util.convert_observed(stack.pop())
+        size = smt_util.convert_observed(stack.pop())  # in bytes
+        if smt.is_expr(code_start):
+            params.memory.clear(mem_start)
+            log.mylogger.debug('symbolic offset of CODECOPY')
             return
-        elif opcode == 'INVALID':
+
+        def read_code(offset):
+            code = self.evm_bytecode[code_start + offset:code_start + offset +
+                                     32]
+            return int.from_bytes(bytes(code), 'big') << (8 * (32 - len(code)))
+
+        self._copy_to_memory(params, mem_start, size, read_code)
+
+    def _op_returndatacopy(self, params, block, ins):
+        stack = params.stack
+        mem_start = smt_util.convert_observed(stack.pop())
+        return_start = smt_util.convert_observed(stack.pop())
+        size = smt_util.convert_observed(stack.pop())  # in bytes
+        if not params.calls:
+            # the return data is empty before any call
+            self._copy_to_memory(params, mem_start, size, lambda offset: 0)
             return
-        elif opcode == 'ADD':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+        call_pc = params.calls[-1]
 
-                computed = (first + second) & evm_params.UNSIGNED_BOUND_NUMBER
+        def read_return_data(offset):
+            start = smt_util.convert_result(return_start + offset)
+            end = smt_util.convert_result(start + 31)
+            new_var_name = self.gen.gen_return_data(call_pc, start, end)
+            value = smt.BitVec(new_var_name, 256)
+            node = x_graph.ReturnDataNode(new_var_name, value)
+            self.x_graph.cache_var_node(value, node)
+            return value
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'MUL':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+        self._copy_to_memory(params, mem_start, size, read_return_data)
 
-                computed = (first * second) & evm_params.UNSIGNED_BOUND_NUMBER
+    def _op_returndatasize(self, params, block, ins):
+        new_var_name = self.gen.gen_return_data_size(params.calls[-1])
+        new_var = smt.BitVec(new_var_name, 256)
+        node = x_graph.ReturnDataSizeNode(new_var_name, new_var)
+        self.x_graph.cache_var_node(new_var, node)
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SUB':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+        params.stack.append(new_var)
 
-                computed = (first - second) & evm_params.UNSIGNED_BOUND_NUMBER
+    @staticmethod
+    def _op_gasprice(params, block, ins):
+        params.stack.append(params.global_state['gasPrice'])
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'DIV':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-
-                flag = False
-                if z3.is_expr(second):
-                    path_conditions_and_vars['path_condition'].append(
-                        second != 0)
-                    path_conditions_and_vars['branch_flag'].append(True)
-                    self.x_graph.add_constraint_node(
-                        path_conditions_and_vars, global_state['pc'] - 1,
-                        self.gen.get_path_id(), f'DIV_{global_state["pc"] - 1}')
-                else:
-                    if second == 0:
-                        flag = True
-                        stack.insert(0, 0)
-                if not flag:
-                    computed = z3.UDiv(util.to_symbolic(first), second)
-                    stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SDIV':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-                flag = False
-                if z3.is_expr(second):
-                    path_conditions_and_vars['path_condition'].append(
-                        second != 0)
-                    path_conditions_and_vars['branch_flag'].append(True)
-                    self.x_graph.add_constraint_node(
-                        path_conditions_and_vars, global_state['pc'] - 1,
-                        self.gen.get_path_id(),
-                        f'SDIV_{global_state["pc"] - 1}')
-                else:
-                    if second == 0:
-                        flag = True
-                        stack.insert(0, 0)
+    def _op_extcodesize(self, params, block, ins):
+        stack = params.stack
+        address = smt_util.convert_observed(stack.pop())
 
-                if not flag:
-                    computed = util.to_symbolic(first) / second
+        new_var_name = self.gen.gen_code_size_var(address)
+        new_var = smt.BitVec(new_var_name, 256)
+        node = x_graph.ExtcodeSizeNode(new_var_name, new_var, address)
+        self.x_graph.cache_var_node(new_var, node)
 
-                    stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'MOD':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-
-                flag = False
-                if z3.is_expr(second):
-                    path_conditions_and_vars['path_condition'].append(
-                        second != 0)
-                    path_conditions_and_vars['branch_flag'].append(True)
-                    self.x_graph.add_constraint_node(
-                        path_conditions_and_vars, global_state['pc'] - 1,
-                        self.gen.get_path_id(), f'MOD_{global_state["pc"] - 1}')
-                else:
-                    if second == 0:
-                        flag = True
-                        stack.insert(0, 0)
+        stack.append(new_var)
 
-                if not flag:
-                    computed = z3.URem(first, util.to_symbolic(second))
-                    stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SMOD':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-
-                flag = False
-                if z3.is_expr(second):
-                    path_conditions_and_vars['path_condition'].append(
-                        second != 0)
-                    path_conditions_and_vars['branch_flag'].append(True)
-                    self.x_graph.add_constraint_node(
-                        path_conditions_and_vars, global_state['pc'] - 1,
-                        self.gen.get_path_id(),
-                        f'SMOD_{global_state["pc"] - 1}')
+    def _op_extcodecopy(self, params, block, ins):
+        stack = params.stack
+        address = smt_util.convert_observed(stack.pop())
+        mem_location = smt_util.convert_observed(stack.pop())
+        code_from = smt_util.convert_observed(stack.pop())
+        no_bytes = smt_util.convert_observed(stack.pop())
+
+        def read_ext_code(offset):
+            start = smt_util.convert_result(code_from + offset)
+            end = smt_util.convert_result(start + 31)
+            new_var_name = self.gen.gen_ext_code_data(address, start, end)
+            value = smt.BitVec(new_var_name, 256)
+            node = x_graph.CodeNode(new_var_name, value, address)
+            self.x_graph.cache_var_node(value, node)
+            return value
+
+        self._copy_to_memory(params, mem_location, no_bytes, read_ext_code)
+
+    # copy size bytes to memory at start, read_word(offset) is the word of
+    # the source at offset; memory from start is forgotten if the copy is
+    # not concrete or too large to copy word by word
+    @staticmethod
+    def _copy_to_memory(params, start, size, read_word):
+        memory = params.memory
+        if (not smt_util.is_all_real(start, size) or
+                start + size > evm_params.MAX_MEMORY_SIZE):
+            memory.clear(start)
+            log.mylogger.debug('symbolic or large memory copy')
+            return
+        for offset in range(0, size, 32):
+            value = read_word(offset)
+            length = min(32, size - offset)
+            if length < 32:
+                if smt.is_expr(value):
+                    value = smt_util.convert_result(
+                        smt.Extract(255, 256 - 8 * length, value))
                 else:
-                    if second == 0:
-                        flag = True
-                        stack.insert(0, 0)
+                    value >>= 8 * (32 - length)
+            memory.write(start + offset, value, length)
 
-                if not flag:
-                    computed = z3.SRem(first, util.to_symbolic(second))
+    def _op_extcodehash(self, params, block, ins):
+        stack = params.stack
+        address = smt_util.convert_observed(stack.pop())
 
-                    stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'ADDMOD':
-            if len(stack) > 2:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-                third = stack.pop(0)
-
-                flag = False
-                if z3.is_expr(third):
-                    path_conditions_and_vars['path_condition'].append(
-                        third != 0)
-                    path_conditions_and_vars['branch_flag'].append(True)
-                    self.x_graph.add_constraint_node(
-                        path_conditions_and_vars, global_state['pc'] - 1,
-                        self.gen.get_path_id(),
-                        f'ADDMOD_{global_state["pc"] - 1}')
-                else:
-                    if third == 0:
-                        flag = True
-                        stack.insert(0, 0)
-
-                if not flag:
-                    if util.is_all_real(first, second, third):
-                        computed = (first + second) % third
-                    else:
-                        computed = z3.URem(first + second,
-                                           util.to_symbolic(third))
-                    stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'MULMOD':
-            if len(stack) > 2:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-                third = stack.pop(0)
-
-                flag = False
-                if z3.is_expr(third):
-                    path_conditions_and_vars['path_condition'].append(
-                        third != 0)
-                    path_conditions_and_vars['branch_flag'].append(True)
-                    self.x_graph.add_constraint_node(
-                        path_conditions_and_vars, global_state['pc'] - 1,
-                        self.gen.get_path_id(),
-                        f'MULMOD_{global_state["pc"] - 1}')
-                else:
-                    if third == 0:
-                        flag = True
-                        stack.insert(0, 0)
-
-                if not flag:
-                    if util.is_all_real(first, second, third):
-                        computed = (first * second) % third
-                    else:
-                        computed = z3.URem(first * second,
-                                           util.to_symbolic(third))
-                    stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'EXP':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                base = stack.pop(0)
-                exponent = stack.pop(0)
-                # Type conversion is needed when they are mismatched
-                if util.is_all_real(base, exponent):
-                    computed = pow(base, exponent, 2**256)
-                else:
-                    # The computed value is unknown, this is because power is
-                    # not supported in bit-vector theory
-                    new_var_name = self.gen.gen_exp_var(base, exponent)
-                    computed = z3.BitVec(new_var_name, 256)
-                    # add to graph
-                    # todo: should we add pc for exp nodes
-                    node = x_graph.ExpNode(new_var_name, computed, base,
-                                           exponent)
-                    self.x_graph.cache_var_node(computed, node)
-
-                stack.insert(0, computed)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SIGNEXTEND':
-            if len(stack) > 1:
-                # todo: review this process
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-                if util.is_all_real(first, second):
-                    if first >= 32:
-                        computed = second
-                    else:
-                        signbit_index_from_right = 8 * first + 7
-                        if second & (1 << signbit_index_from_right):
-                            computed = second | (
-                                2**256 - (1 << signbit_index_from_right))
-                        else:
-                            computed = second & (
-                                (1 << signbit_index_from_right) - 1)
-                else:
-                    signbit_index_from_right = 8 * first + 7
-                    computed = second & ((1 << signbit_index_from_right) - 1)
+        new_var_name = self.gen.gen_code_size_var(address)
+        new_var = smt.BitVec(new_var_name, 256)
+        node = x_graph.ExtcodeHashNode(new_var_name, new_var, address)
+        self.x_graph.cache_var_node(new_var, node)
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        #
-        #  10s: Comparison and Bitwise Logic Operations
-        #
-        elif opcode == 'LT':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-
-                computed = z3.If(z3.ULT(first, util.to_symbolic(second)),
-                                 z3.BitVecVal(1, 256), z3.BitVecVal(0, 256))
-
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'GT':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+        stack.append(new_var)
 
-                computed = z3.If(z3.UGT(first, util.to_symbolic(second)),
-                                 z3.BitVecVal(1, 256), z3.BitVecVal(0, 256))
+    #
+    #  40s: Block Information
+    #
+    def _op_blockhash(self, params, block, ins):
+        # information from block header
+        stack = params.stack
+        block_number = smt_util.convert_observed(stack.pop())
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SLT':  # Not fully faithful to signed comparison
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-
-                computed = z3.If(
-                    util.to_symbolic(first) < second, z3.BitVecVal(1, 256),
-                    z3.BitVecVal(0, 256))
-
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SGT':  # Not fully faithful to signed comparison
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-
-                computed = z3.If(
-                    util.to_symbolic(first) > second, z3.BitVecVal(1, 256),
-                    z3.BitVecVal(0, 256))
-
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'EQ':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+        new_var_name = self.gen.gen_blockhash(block_number)
+        value = smt.BitVec(new_var_name, 256)
+        node = x_graph.BlockhashNode(new_var_name, value, block_number)
 
-                computed = z3.If(first == second, z3.BitVecVal(1, 256),
-                                 z3.BitVecVal(0, 256))
+        self.x_graph.cache_var_node(value, node)
+        stack.append(value)
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'ISZERO':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
+    @staticmethod
+    def _op_coinbase(params, block, ins):
+        # information from block header
+        params.stack.append(params.global_state['currentCoinbase'])
 
-                computed = z3.If(first == 0, z3.BitVecVal(1, 256),
-                                 z3.BitVecVal(0, 256))
+    @staticmethod
+    def _op_timestamp(params, block, ins):
+        # information from block header
+        params.stack.append(params.global_state['currentTimestamp'])
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'AND':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+    @staticmethod
+    def _op_number(params, block, ins):
+        # information from block header
+        params.stack.append(params.global_state['currentNumber'])
 
-                computed = first & second
+    @staticmethod
+    def _op_difficulty(params, block, ins):
+        # information from block header
+        params.stack.append(params.global_state['currentDifficulty'])
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'OR':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+    @staticmethod
+    def _op_gaslimit(params, block, ins):
+        # information from block header
+        params.stack.append(params.global_state['currentGasLimit'])
 
-                computed = first | second
+    @staticmethod
+    def _op_chainid(params, block, ins):
+        # information from block header
+        params.stack.append(params.global_state['chainId'])
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'XOR':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+    def _op_selfbalance(self, params, block, ins):
+        global_state = params.global_state
+        params.stack.append(
+            self._get_balance(global_state, global_state['receiverAddress']))
 
-                computed = first ^ second
+    @staticmethod
+    def _op_basefee(params, block, ins):
+        params.stack.append(params.global_state['baseFee'])
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'NOT':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
+    #
+    #  50s: Stack, Memory, Storage, and Flow Information
+    #
+    @staticmethod
+    def _op_pop(params, block, ins):
+        params.stack.pop()
 
-                computed = (~first) & evm_params.UNSIGNED_BOUND_NUMBER
+    def _op_mload(self, params, block, ins):
+        stack = params.stack
+        address = smt_util.convert_observed(stack.pop())
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'BYTE':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                byte_index = 31 - first
-                second = stack.pop(0)
-
-                computed = z3.LShR(
-                    util.to_symbolic(second),
-                    (8 * byte_index)) & evm_params.UNSIGNED_BYTE_NUMBER
-
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        #
-        # 20s: SHA3
-        # todo: review this process
-        elif opcode in ('SHA3', 'KECCAK256'):
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                s0 = stack.pop(0)
-                s1 = stack.pop(0)
-                if util.is_all_real(s0, s1) and s0 + s1 <= len(memory):
-                    data = list(memory[s0:s0 + s1])
-                    value = util.to_symbolic(data[0], 8)
-                    for x in data[1:]:
-                        value = z3.Concat(value, util.to_symbolic(x, 8))
-
-                    new_var_name = self.gen.gen_sha3_var(
-                        str(global_state['pc'] - 1))
-                    computed = z3.BitVec(new_var_name, 256)
-                    node = x_graph.ShaNode(new_var_name, computed,
-                                           global_state['pc'] - 1, value)
-                    self.x_graph.cache_var_node(computed, node)
-                else:
-                    # TODO(Yang): push into the stack a fresh symbolic variable,
-                    #  and all the data from which computed sha3 is missing
-                    new_var_name = self.gen.gen_sha3_var(
-                        str(global_state['pc'] - 1))
-                    new_var = z3.BitVec(new_var_name, 256)
-                    computed = new_var
-                    # add to node
-                    node = x_graph.ShaNode(new_var_name, computed,
-                                           global_state['pc'] - 1)
-                    self.x_graph.cache_var_node(computed, node)
-
-                stack.insert(0, computed)
-            else:
-                raise ValueError('STACK underflow')
-        #
-        # 30s: Environment Information
-        #
-        elif opcode == 'ADDRESS':  # get address of currently executing account
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['receiverAddress'])
-        elif opcode == 'BALANCE':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                address = stack.pop(0)
-                # get balance of address
-                new_var = None
-
-                # TODO(Yang): we do not consider balance that
-                #  dealed twice in a path
-                for x in global_state['balance']:
-                    try:
-                        if int(str(z3.simplify(
-                                util.to_symbolic(x - address)))) == 0:
-                            new_var = global_state['balance'][x]
-                            break
-                    except:  # pylint: disable=bare-except
-                        pass
-
-                if new_var is None:
-                    new_var_name = self.gen.gen_balance_of(address)
-                    new_var = z3.BitVec(new_var_name, 256)
-                    global_state['balance'][address] = new_var
-                    b_node = x_graph.BalanceNode(new_var_name, new_var, address)
-                    self.x_graph.cache_var_node(new_var, b_node)
-
-                stack.insert(0, new_var)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'CALLER':  # get caller address
-            # that is directly responsible for this execution
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['senderAddress'])
-        elif opcode == 'ORIGIN':  # get execution origination address
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['origin'])
-        elif opcode == 'CALLVALUE':  # get value of this transaction
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['value'])
-        elif opcode == 'CALLDATALOAD':  # from input data from environment
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                start = stack.pop(0)
-
-                end = util.convert_result(start + 31)
-                new_var_name = self.gen.gen_data_var(
-                    start, end, self.current_function)
-                value = z3.BitVec(new_var_name, 256)
-                node = x_graph.InputDataNode(new_var_name, value, start, end)
-                self.x_graph.cache_var_node(value, node)
-
-                stack.insert(0, value)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'CALLDATASIZE':
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['callDataSize'])
-        elif opcode == 'CALLDATACOPY':  # Copy input data to memory
-            if len(stack) > 2:
-                global_state['pc'] = global_state['pc'] + 1
-                memory_start = stack.pop(0)
-                input_start = stack.pop(0)
-                size = stack.pop(0)
-                # Unused, reserve for name hint
-                del memory_start, input_start, size
-                # Todo: implement this instruction
-                params.memory = {}
-                log.mylogger.debug('unhandled instruction CALLDATACOPY')
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'CODESIZE':
-            # length of the executing contract's code in bytes
-            code_size = len(self.evm_bytecode)
-            stack.insert(0, code_size)
-        elif opcode == 'CODECOPY':
-            # copy executing contract's bytecode
-            if len(stack) > 2:
-                global_state['pc'] = global_state['pc'] + 1
-                mem_start = stack.pop(0)
-                code_start = stack.pop(0)
-                size = stack.pop(0)  # in bytes
-                # Unused, reserve for name hint
-                del mem_start, code_start, size
-                # Todo: implement this instruction
-                params.memory = {}
-                log.mylogger.debug('unhandled instruction CODECOPY')
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'RETURNDATACOPY':
-            if len(stack) > 2:
-                global_state['pc'] += 1
-                mem_start = stack.pop(0)
-                return_start = stack.pop(0)
-                size = stack.pop(0)  # in bytes
-                # Unused, reserve for name hint
-                del mem_start, return_start, size
-                # Todo: implement this instruction
-                params.memory = {}
-                log.mylogger.debug('unhandled instruction RETURNDATACOPY')
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'RETURNDATASIZE':
-            global_state['pc'] += 1
-            new_var_name = self.gen.gen_return_data_size(calls[-1])
-            new_var = z3.BitVec(new_var_name, 256)
-            node = x_graph.ReturnDataSizeNode(new_var_name, new_var)
-            self.x_graph.cache_var_node(new_var, node)
-
-            stack.insert(0, new_var)
-        elif opcode == 'GASPRICE':
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['gas_price'])
-        elif opcode == 'EXTCODESIZE':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                address = stack.pop(0)
-
-                new_var_name = self.gen.gen_code_size_var(address)
-                new_var = z3.BitVec(new_var_name, 256)
-                node = x_graph.ExtcodeSizeNode(new_var_name, new_var, address)
-                self.x_graph.cache_var_node(new_var, node)
-
-                stack.insert(0, new_var)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'EXTCODECOPY':
-            if len(stack) > 3:
-                global_state['pc'] = global_state['pc'] + 1
-                address = stack.pop(0)
-                mem_location = stack.pop(0)
-                code_from = stack.pop(0)
-                no_bytes = stack.pop(0)
-                # Unused, reserve for name hint
-                del address, mem_location, code_from, no_bytes
-                # TODO: implement this instruction
-                params.memory = {}
-                log.mylogger.debug('unhandled instruction EXTCODECOPY')
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'EXTCODEHASH':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                address = stack.pop(0)
-
-                new_var_name = self.gen.gen_code_size_var(address)
-                new_var = z3.BitVec(new_var_name, 256)
-                node = x_graph.ExtcodeHashNode(new_var_name, new_var, address)
-                self.x_graph.cache_var_node(new_var, node)
-
-                stack.insert(0, new_var)
-            else:
-                raise ValueError('STACK underflow')
-        #
-        #  40s: Block Information
-        #
-        elif opcode == 'BLOCKHASH':  # information from block header
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                block_number = stack.pop(0)
-
-                new_var_name = self.gen.gen_blockhash(block_number)
-                value = z3.BitVec(new_var_name, 256)
-                node = x_graph.BlockhashNode(new_var_name, value, block_number)
-
-                self.x_graph.cache_var_node(value, node)
-
-                stack.insert(0, value)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'COINBASE':  # information from block header
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['currentCoinbase'])
-        elif opcode == 'TIMESTAMP':  # information from block header
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['currentTimestamp'])
-        elif opcode == 'NUMBER':  # information from block header
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['currentNumber'])
-        elif opcode == 'DIFFICULTY':  # information from block header
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['currentDifficulty'])
-        elif opcode == 'GASLIMIT':  # information from block header
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['currentGasLimit'])
-        elif opcode == 'CHAINID':  # information from block header
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['chainId'])
-        elif opcode == 'SELFBALANCE':
-            global_state['pc'] = global_state['pc'] + 1
-            # get balance of address
-            new_var = None
-            address = global_state['receiverAddress']
-            for x in global_state['balance']:
-                try:
-                    if int(str(z3.simplify(util.to_symbolic(x -
-                                                            address)))) == 0:
-                        new_var = global_state['balance'][x]
-                        break
-                except:  # pylint: disable=bare-except
-                    pass
-
-            if new_var is None:
-                new_var_name = self.gen.gen_balance_of(address)
-                new_var = z3.BitVec(new_var_name, 256)
-                global_state['balance'][address] = new_var
-                b_node = x_graph.BalanceNode(new_var_name, new_var, address)
-                self.x_graph.cache_var_node(new_var, b_node)
-
-            stack.insert(0, new_var)
-        elif opcode == 'BASEFEE':
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, global_state['baseFee'])
-        #
-        #  50s: Stack, Memory, Storage, and Flow Information
-        #
-        elif opcode == 'POP':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                stack.pop(0)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'MLOAD':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                address = stack.pop(0)
+        value = self.load_memory(address, params, 32)
 
-                value = self.load_memory(address, params, 32)
+        stack.append(value)
 
-                stack.insert(0, value)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'MSTORE':
-            # bigger end of stack value is stored in lower address of memory
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                stored_address = stack.pop(0)
-                stored_value = stack.pop(0)
-
-                self.write_memory(stored_address, stored_value, params, 32)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'MSTORE8':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                stored_address = stack.pop(0)
-                stored_value = stack.pop(0)
-
-                self.write_memory(stored_address, stored_value, params, 1)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SLOAD':
-            if len(stack) > 0:
-                global_state['pc'] = global_state['pc'] + 1
-                position = stack.pop(0)
-
-                value = None
-                for key in global_state['storage']:
-                    if util.convert_result_to_int(key - position) == 0:
-                        value = global_state['storage'][key]
-                        break
-
-                if value is None:
-                    new_var_name = self.gen.gen_storage_var(position)
-                    value = z3.BitVec(new_var_name, 256)
-                    node = x_graph.StateNode(new_var_name, value, position,
-                                             global_state['pc'] - 1)
-                    self.x_graph.add_var_node(value, node)
-
-                    global_state['storage'][position] = value
-                stack.insert(0, value)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SSTORE':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                stored_address = stack.pop(0)
-                stored_value = stack.pop(0)
-
-                global_state['storage'][stored_address] = stored_value
-                # add to graph
-                self.x_graph.add_sstore_node(opcode, global_state['pc'] - 1,
-                                             [stored_address, stored_value],
-                                             self.gen.get_path_id(),
-                                             path_conditions_and_vars)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'JUMP':
-            if len(stack) > 0:
-                target_address = util.convert_result(stack.pop(0))
-
-                if z3.is_expr(target_address):
-                    log.mylogger.error(
-                        'Target address of JUMP must be an integer: '
-                        'but it is %s', str(target_address))
-                    raise errors.JumpTargetError(
-                        'Target address for jump is symbolic')
-                else:
-                    if target_address not in self.runtime.vertices:
-                        raise errors.JumpTargetError(
-                            f'Target address {target_address} '
-                            f'for jump is not in vertices')
-                    self.runtime.vertices[block].set_jump_targets(
-                        target_address)
-                    if target_address not in self.runtime.edges[block]:
-                        self.runtime.edges[block].append(target_address)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'JUMPI':
-            # We need to prepare two branches
-            if len(stack) > 1:
-                target_address = util.convert_result(stack.pop(0))
-                if z3.is_expr(target_address):
-                    log.mylogger.error(
-                        'Target address of JUMPI must be an integer: '
-                        'but it is %s', str(target_address))
-                    raise errors.JumpTargetError(
-                        'Target address for jumpi is symbolic')
-                else:
-                    if target_address not in self.runtime.vertices:
-                        raise errors.JumpTargetError(
-                            f'Target address {target_address} '
-                            f'for jumpi is not in vertices')
-                    self.runtime.vertices[block].set_jump_targets(
-                        target_address)
-                    if target_address not in self.runtime.edges[block]:
-                        self.runtime.edges[block].append(target_address)
-
-                    flag = stack.pop(0)
-                    if not z3.is_expr(flag):  # must be int
-                        if flag == 0:
-                            branch_expression = z3.BoolVal(False)
-                        else:
-                            branch_expression = z3.BoolVal(True)
-                    else:
-                        branch_expression = util.to_symbolic(flag != 0)
-
-                    self.runtime.vertices[block].set_branch_expression(
-                        z3.simplify(branch_expression))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'PC':
-            stack.insert(0, global_state['pc'])
-            global_state['pc'] = global_state['pc'] + 1
-        elif opcode == 'MSIZE':
-            global_state['pc'] = global_state['pc'] + 1
-            stack.insert(0, util.convert_result(32 * global_state['miu']))
-        elif opcode == 'GAS':
-            # Todo: we do not have this precisely. It depends on both the
-            #  initial gas and the amount has been depleted
-            #  we need to think about this in the future, in case precise gas
-            #  can be tracked
-            global_state['pc'] = global_state['pc'] + 1
-            new_var_name = self.gen.gen_gas_var(global_state['pc'] - 1)
-            new_var = z3.BitVec(new_var_name, 256)
-            node = x_graph.GasNode(new_var_name, new_var)
-            self.x_graph.cache_var_node(new_var, node)
-
-            stack.insert(0, new_var)
-        elif opcode == 'JUMPDEST':
-            global_state['pc'] = global_state['pc'] + 1
-        #
-        #  60s & 70s: Push Operations
-        #
-        elif opcode.startswith('PUSH', 0):  # this is a push instruction
-            position = int(opcode[4:], 10)
-            global_state['pc'] = global_state['pc'] + 1 + position
-            pushed_value = int(instr_parts[2], 16)
-            stack.insert(0, pushed_value)
-            # add to graph
-            node = x_graph.ConstNode(str(pushed_value), pushed_value)
-            self.x_graph.cache_var_node(pushed_value, node)
-        #
-        #  80s: Duplication Operations
-        #
-        elif opcode.startswith('DUP', 0):
-            global_state['pc'] = global_state['pc'] + 1
-            position = int(opcode[3:], 10) - 1
-            if len(stack) > position:
-                duplicate = stack[position]
-                stack.insert(0, duplicate)
-            else:
-                raise ValueError('STACK underflow')
-        #
-        #  90s: Swap Operations
-        #
-        elif opcode.startswith('SWAP', 0):
-            global_state['pc'] = global_state['pc'] + 1
-            position = int(opcode[4:], 10)
-            if len(stack) > position:
-                temp = stack[position]
-                stack[position] = stack[0]
-                stack[0] = temp
-            else:
-                raise ValueError('STACK underflow')
-        #
-        #  a0s: Logging Operations
-        #
-        elif opcode in ('LOG0', 'LOG1', 'LOG2', 'LOG3', 'LOG4'):
-            global_state['pc'] = global_state['pc'] + 1
-            # We do not simulate these log operations
-            num_of_pops = 2 + int(opcode[3:])
-            while num_of_pops > 0:
-                stack.pop(0)
-                num_of_pops -= 1
-        #
-        #  f0s: System Operations
-        #
-        elif opcode == 'CREATE':  # Todo: the different of create and create2
-            if len(stack) > 2:
-                global_state['pc'] += 1
-                stack.pop(0)
-                stack.pop(0)
-                stack.pop(0)
-
-                new_var_name = self.gen.gen_contract_address(
-                    global_state['pc'] - 1)
-                new_var = z3.BitVec(new_var_name, 256)
-                node = x_graph.AddressNode(new_var_name, new_var)
-                self.x_graph.cache_var_node(new_var, node)
-
-                stack.insert(0, new_var)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'CALL':
-            if len(stack) > 6:
-                calls.append(global_state['pc'])
-                global_state['pc'] = global_state['pc'] + 1
-
-                out_gas = stack.pop(0)
-                recipient = stack.pop(0)
-                transfer_amount = stack.pop(0)
-                start_data_input = stack.pop(0)
-                size_data_input = stack.pop(0)
-                start_data_output = stack.pop(0)
-                size_data_output = stack.pop(0)
-
-                # update balance of call's sender that's this contract's address
-                balance_ia = global_state['balance'][
-                    global_state['receiverAddress']]
-                new_balance_ia = util.convert_result(balance_ia -
-                                                     transfer_amount)
-                global_state['balance'][
-                    global_state['receiverAddress']] = new_balance_ia
-                # update the balance of recipient
-                old_balance = None
-                for key in global_state['balance']:
-                    if util.convert_result_to_int(key - recipient) == 0:
-                        old_balance = global_state['balance'].pop(key)
-                        break
-
-                if old_balance is None:
-                    new_balance_name = self.gen.gen_balance_of(recipient)
-                    old_balance = z3.BitVec(new_balance_name, 256)
-                global_state['balance'][recipient] = util.convert_result(
-                    old_balance + transfer_amount)
-
-                # add enough_fund condition to path_conditions
-                is_enough_fund = z3.And((transfer_amount <= balance_ia),
-                                        old_balance >= 0)
-                params.path_conditions_and_vars['path_condition'].append(
-                    is_enough_fund)
-                params.path_conditions_and_vars['branch_flag'].append(True)
-                self.x_graph.add_constraint_node(
-                    params.path_conditions_and_vars, global_state['pc'] - 1,
-                    self.gen.get_path_id(),
-                    f'fund_call_{global_state["pc"] - 1}')
-                # get return status
-                new_var_name = self.gen.gen_return_status(calls[-1])
-                new_var = z3.BitVec(new_var_name, 256)
-                stack.insert(0, new_var)
-                return_node = x_graph.ReturnStatusNode(new_var_name,
-                                                       new_var_name, calls[-1])
-
-                # add call instruction to graph
-                self.x_graph.add_message_call_node(
-                    opcode, global_state['pc'] - 1, [
-                        out_gas, recipient, transfer_amount, start_data_input,
-                        size_data_input, start_data_output, size_data_output
-                    ], return_node, self.gen.get_path_id(),
-                    path_conditions_and_vars)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'CALLCODE':
-            if len(stack) > 6:
-                calls.append(global_state['pc'])
-                global_state['pc'] = global_state['pc'] + 1
-
-                out_gas = stack.pop(0)
-                recipient = stack.pop(0)
-                transfer_amount = stack.pop(0)
-                start_data_input = stack.pop(0)
-                size_data_input = stack.pop(0)
-                start_data_output = stack.pop(0)
-                size_data_output = stack.pop(0)
-
-                # update balance of call's sender that's this contract's address
-                balance_ia = global_state['balance'][
-                    global_state['receiverAddress']]
-                new_balance_ia = util.convert_result(balance_ia -
-                                                     transfer_amount)
-                global_state['balance'][
-                    global_state['receiverAddress']] = new_balance_ia
-                # update the balance of recipient
-                old_balance = None
-                for key in global_state['balance']:
-                    if util.convert_result_to_int(key - recipient):
-                        old_balance = global_state['balance'].pop(key)
-                        break
-
-                if old_balance is None:
-                    new_balance_name = self.gen.gen_balance_of(recipient)
-                    old_balance = z3.BitVec(new_balance_name, 256)
-                global_state['balance'][recipient] = util.convert_result(
-                    old_balance + transfer_amount)
-
-                # add enough_fund condition to path_conditions
-                is_enough_fund = z3.And((transfer_amount <= balance_ia),
-                                        old_balance >= 0)
-                params.path_conditions_and_vars['path_condition'].append(
-                    is_enough_fund)
-                params.path_conditions_and_vars['branch_flag'].append(True)
-                self.x_graph.add_constraint_node(
-                    params.path_conditions_and_vars, global_state['pc'] - 1,
-                    self.gen.get_path_id(),
-                    f'fund_callcode_{global_state["pc"] - 1}')
-
-                # get return status
-                new_var_name = self.gen.gen_return_status(calls[-1])
-                new_var = z3.BitVec(new_var_name, 256)
-                stack.insert(0, new_var)
-                return_node = x_graph.ReturnStatusNode(new_var_name,
-                                                       new_var_name, calls[-1])
-
-                # add call instruction to graph
-                self.x_graph.add_message_call_node(
-                    opcode, global_state['pc'] - 1, [
-                        out_gas, recipient, transfer_amount, start_data_input,
-                        size_data_input, start_data_output, size_data_output
-                    ], return_node, self.gen.get_path_id(),
-                    path_conditions_and_vars)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode in ('DELEGATECALL', 'STATICCALL'):
-            if len(stack) > 5:
-                calls.append(global_state['pc'])
-                global_state['pc'] = global_state['pc'] + 1
-                out_gas = stack.pop(0)
-                recipient = stack.pop(0)
-
-                start_data_input = stack.pop(0)
-                size_data_input = stack.pop(0)
-                start_data_output = stack.pop(0)
-                size_data_output = stack.pop(0)
-
-                # the execution is possibly okay
-                new_var_name = self.gen.gen_return_status(calls[-1])
-                new_var = z3.BitVec(new_var_name, 256)
-                stack.insert(0, new_var)
-                return_node = x_graph.ReturnStatusNode(new_var_name, new_var,
-                                                       calls[-1])
-
-                # add call instruction to graph
-                self.x_graph.add_message_call_node(
-                    opcode, global_state['pc'] - 1, [
-                        out_gas, recipient, start_data_input, size_data_input,
-                        start_data_output, size_data_output
-                    ], return_node, self.gen.get_path_id(),
-                    path_conditions_and_vars)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'CREATE2':
-            if len(stack) > 3:
-                global_state['pc'] += 1
-                stack.pop(0)
-                stack.pop(0)
-                stack.pop(0)
-                stack.pop(0)
-
-                new_var_name = self.gen.gen_contract_address(
-                    global_state['pc'] - 1)
-                new_var = z3.BitVec(new_var_name, 256)
-                node = x_graph.AddressNode(new_var_name, new_var)
-                self.x_graph.cache_var_node(new_var, node)
-
-                stack.insert(0, new_var)
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode in ('RETURN', 'REVERT'):
-            if len(stack) > 1:
-                # TODO(Yang): deal with offset and length, and
-                #  add return value to graph
-                offset = stack.pop(0)
-                length = stack.pop(0)
-                # Unused, reserve for name hint
-                del offset, length
-                if opcode == 'REVERT':
-                    node = x_graph.TerminalNode(opcode, global_state['pc'])
-                    self.x_graph.add_terminal_node(node,
-                                                   path_conditions_and_vars,
-                                                   self.gen.get_path_id())
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode in ('SELFDESTRUCT', 'SUICIDE'):
-            # todo: add selfdestruct and suicide instruction to graph
-            global_state['pc'] = global_state['pc'] + 1
-            recipient = stack.pop(0)
-            # get transfer_amount and update the new balance
-            transfer_amount = None
-            for key in global_state['balance']:
-                if util.convert_result_to_int(
-                        key - global_state['receiverAddress']) == 0:
-                    transfer_amount = global_state['balance'][key]
-                    global_state['balance'][key] = 0
-                    break
-
-            assert transfer_amount is not None, 'transfer amount is None'
-            # get the balance of recipient and update recipient's balance
-            balance_recipient = None
-            for key in global_state['balance']:
-                if util.convert_result_to_int(key == recipient) == 0:
-                    balance_recipient = global_state['balance'].pop(key)
-                    break
-            if balance_recipient is None:
-                new_address_value_name = self.gen.gen_balance_of(recipient)
-                balance_recipient = z3.BitVec(new_address_value_name, 256)
-
-            new_balance = balance_recipient + transfer_amount
-            global_state['balance'][recipient] = new_balance
-
-        elif opcode == 'SAR':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
-
-                computed = (second >> first)
-
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SHR':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+    def _op_mstore(self, params, block, ins):
+        # bigger end of stack value is stored in lower address of memory
+        stack = params.stack
+        stored_address = smt_util.convert_observed(stack.pop())
+        stored_value = stack.pop()
 
-                computed = z3.LShR(second, util.to_symbolic(first))
+        self.write_memory(stored_address, stored_value, params, 32)
 
-                stack.insert(0, util.convert_result(computed))
-            else:
-                raise ValueError('STACK underflow')
-        elif opcode == 'SHL':
-            if len(stack) > 1:
-                global_state['pc'] = global_state['pc'] + 1
-                first = stack.pop(0)
-                second = stack.pop(0)
+    def _op_mstore8(self, params, block, ins):
+        stack = params.stack
+        stored_address = smt_util.convert_observed(stack.pop())
+        stored_value = stack.pop()
+
+        self.write_memory(stored_address, stored_value, params, 1)
 
-                computed = (second << first)
+    def _op_sload(self, params, block, ins):
+        stack = params.stack
+        global_state = params.global_state
+        position = smt_util.convert_observed(stack.pop())
 
-                stack.insert(0, computed)
+        key = global_state['storage'].find(position)
+        if key is not None:
+            value = global_state['storage'][key]
+        else:
+            new_var_name = self.gen.gen_storage_var(position)
+            value = smt.BitVec(new_var_name, 256)
+            node = x_graph.StateNode(new_var_name, value, position, ins.pc)
+            self.x_graph.add_var_node(value, node)
+
+            global_state['storage'][position] = value
+        stack.append(value)
+
+    def _op_sstore(self, params, block, ins):
+        stack = params.stack
+        stored_address = smt_util.convert_observed(stack.pop())
+        stored_value = smt_util.convert_observed(stack.pop())
+
+        params.global_state['storage'][stored_address] = stored_value
+        # add to graph
+        self.x_graph.add_sstore_node(ins.name, ins.pc,
+                                     [stored_address, stored_value],
+                                     self.gen.get_path_id(),
+                                     params.path_conditions_and_vars)
+
+    # check the jump target of block and record it as an edge of cfg
+    def _set_jump_target(self, block, target_address, ins):
+        if smt.is_expr(target_address):
+            log.mylogger.error(
+                'Target address of %s must be an integer: '
+                'but it is %s', ins.name, str(target_address))
+            raise errors.JumpTargetError(
+                f'Target address for {ins.name.lower()} is symbolic')
+        if target_address not in self.runtime.vertices:
+            raise errors.JumpTargetError(
+                f'Target address {target_address} '
+                f'for {ins.name.lower()} is not in vertices')
+        self.runtime.vertices[block].set_jump_targets(target_address)
+        self.runtime.add_edge(block, target_address)
+
+    def _op_jump(self, params, block, ins):
+        target_address = smt_util.convert_result(params.stack.pop())
+        self._set_jump_target(block, target_address, ins)
+
+    def _op_jumpi(self, params, block, ins):
+        # We need to prepare two branches
+        stack = params.stack
+        target_address = smt_util.convert_result(stack.pop())
+        self._set_jump_target(block, target_address, ins)
+
+        flag = stack.pop()
+        if not smt.is_expr(flag):  # must be int
+            if flag == 0:
+                branch_expression = smt.BoolVal(False)
             else:
-                raise ValueError('STACK underflow')
+                branch_expression = smt.BoolVal(True)
         else:
-            raise NotImplementedError('UNKNOWN INSTRUCTION: ' + opcode)
-        a_len = len(stack)
-        if (a_len - b_len) != (opcodes.opcode_by_name(opcode).push -
-                               opcodes.opcode_by_name(opcode).pop):
-            raise AssertionError('Stack push and pop un-match')
-        if global_params.DEBUG_MOD:
-            end_time = time.time()
-            execution_time = end_time - start_time
-            log.mylogger.debug('End executing: %s symbolic execution time: %.6f s',
-                               instr, execution_time)
-            log.mylogger.debug('==============================')
+            branch_expression = smt_util.to_symbolic(flag != 0)
+
+        self.runtime.vertices[block].set_branch_expression(
+            smt.simplify(branch_expression))
+
+    @staticmethod
+    def _op_pc(params, block, ins):
+        params.stack.append(ins.pc)
+
+    @staticmethod
+    def _op_msize(params, block, ins):
+        params.stack.append(
+            params.memory.get_size())
+
+    def _op_gas(self, params, block, ins):
+        # Todo: we do not have this precisely. It depends on both the
+        #  initial gas and the amount has been depleted
+        #  we need to think about this in the future, in case precise gas
+        #  can be tracked
+        new_var_name = self.gen.gen_gas_var(ins.pc)
+        new_var = smt.BitVec(new_var_name, 256)
+        node = x_graph.GasNode(new_var_name, new_var)
+        self.x_graph.cache_var_node(new_var, node)
+
+        params.stack.append(new_var)
+
+    @staticmethod
+    def _op_jumpdest(params, block, ins):
+        return
+
+    #
+    #  60s & 70s: Push Operations
+    #
+    def _op_push(self, params, block, ins):
+        pushed_value = ins.operand
+        params.stack.append(pushed_value)
+        # add to graph
+        node = x_graph.ConstNode(str(pushed_value), pushed_value)
+        self.x_graph.cache_var_node(pushed_value, node)
+
+    #
+    #  80s: Duplication Operations
+    #
+    @staticmethod
+    def _op_dup(params, block, ins):
+        stack = params.stack
+        stack.append(stack[-ins.pop])
+
+    #
+    #  90s: Swap Operations
+    #
+    @staticmethod
+    def _op_swap(params, block, ins):
+        stack = params.stack
+        position = -ins.pop
+        stack[position], stack[-1] = stack[-1], stack[position]
+
+    #
+    #  a0s: Logging Operations
+    #
+    @staticmethod
+    def _op_log(params, block, ins):
+        # We do not simulate these log operations
+        del params.stack[-ins.pop:]
+
+    #
+    #  f0s: System Operations
+    #
+    def _op_create(self, params, block, ins):
+        # Todo: the different of create and create2
+        stack = params.stack
+        del stack[-ins.pop:]
+
+        new_var_name = self.gen.gen_contract_address(ins.pc)
+        new_var = smt.BitVec(new_var_name, 256)
+        node = x_graph.AddressNode(new_var_name, new_var)
+        self.x_graph.cache_var_node(new_var, node)
+
+        stack.append(new_var)
+
+    _op_create2 = _op_create
+
+    def _op_call(self, params, block, ins):
+        stack = params.stack
+        global_state = params.global_state
+        calls = params.calls
+        calls.append(ins.pc)
+
+        out_gas = stack.pop()
+        recipient = smt_util.convert_observed(stack.pop())
+        transfer_amount = smt_util.convert_observed(stack.pop())
+        start_data_input = stack.pop()
+        size_data_input = stack.pop()
+        start_data_output = stack.pop()
+        size_data_output = stack.pop()
+
+        # update balance of call's sender that's this contract's address
+        balance_ia = global_state['balance'][global_state['receiverAddress']]
+        new_balance_ia = smt_util.convert_result(balance_ia - transfer_amount)
+        global_state['balance'][
+            global_state['receiverAddress']] = new_balance_ia
+        # update the balance of recipient
+        key = global_state['balance'].find(recipient)
+        if key is not None:
+            old_balance = global_state['balance'].pop(key)
+        else:
+            new_balance_name = self.gen.gen_balance_of(recipient)
+            old_balance = smt.BitVec(new_balance_name, 256)
+        global_state['balance'][recipient] = smt_util.convert_result(
+            old_balance + transfer_amount)
+
+        # add enough_fund condition to path_conditions
+        is_enough_fund = smt.And((transfer_amount <= balance_ia),
+                                 old_balance >= 0)
+        params.path_conditions_and_vars['path_condition'].append(
+            is_enough_fund)
+        params.path_conditions_and_vars['branch_flag'].append(True)
+        self.x_graph.add_constraint_node(params.path_conditions_and_vars,
+                                         ins.pc, self.gen.get_path_id(),
+                                         f'fund_{ins.name.lower()}_{ins.pc}')
+        # get return status
+        new_var_name = self.gen.gen_return_status(calls[-1])
+        new_var = smt.BitVec(new_var_name, 256)
+        stack.append(new_var)
+        return_node = x_graph.ReturnStatusNode(new_var_name, new_var_name,
+                                               calls[-1])
+
+        # add call instruction to graph
+        self.x_graph.add_message_call_node(
+            ins.name, ins.pc, [
+                out_gas, recipient, transfer_amount, start_data_input,
+                size_data_input, start_data_output, size_data_output
+            ], return_node, self.gen.get_path_id(),
+            params.path_conditions_and_vars)
+
+    _op_callcode = _op_call
+
+    def _op_delegatecall(self, params, block, ins):
+        stack = params.stack
+        calls = params.calls
+        calls.append(ins.pc)
+        out_gas = stack.pop()
+        recipient = smt_util.convert_observed(stack.pop())
+
+        start_data_input = stack.pop()
+        size_data_input = stack.pop()
+        start_data_output = stack.pop()
+        size_data_output = stack.pop()
+
+        # the execution is possibly okay
+        new_var_name = self.gen.gen_return_status(calls[-1])
+        new_var = smt.BitVec(new_var_name, 256)
+        stack.append(new_var)
+        return_node = x_graph.ReturnStatusNode(new_var_name, new_var,
+                                               calls[-1])
+
+        # add call instruction to graph
+        self.x_graph.add_message_call_node(
+            ins.name, ins.pc, [
+                out_gas, recipient, start_data_input, size_data_input,
+                start_data_output, size_data_output
+            ], return_node, self.gen.get_path_id(),
+            params.path_conditions_and_vars)
+
+    _op_staticcall = _op_delegatecall
+
+    @staticmethod
+    def _op_return(params, block, ins):
+        # TODO(Yang): deal with offset and length, and
+        #  add return value to graph
+        stack = params.stack
+        offset = stack.pop()
+        length = stack.pop()
+        # Unused, reserve for name hint
+        del offset, length
+
+    def _op_revert(self, params, block, ins):
+        self._op_return(params, block, ins)
+        node = x_graph.TerminalNode(ins.name, ins.pc)
+        self.x_graph.add_terminal_node(node, params.path_conditions_and_vars,
+                                       self.gen.get_path_id())
+
+    def _op_selfdestruct(self, params, block, ins):
+        # todo: add selfdestruct and suicide instruction to graph
+        global_state = params.global_state
+        recipient = smt_util.convert_observed(params.stack.pop())
+        # get transfer_amount and update the new balance
+        key = global_state['balance'].find(global_state['receiverAddress'])
+        assert key is not None, 'transfer amount is None'
+        transfer_amount = global_state['balance'][key]
+        global_state['balance'][key] = 0
+
+        # get the balance of recipient and update recipient's balance
+        key = global_state['balance'].find(recipient)
+        if key is not None:
+            balance_recipient = global_state['balance'].pop(key)
+        else:
+            new_address_value_name = self.gen.gen_balance_of(recipient)
+            balance_recipient = smt.BitVec(new_address_value_name, 256)
+
+        new_balance = balance_recipient + transfer_amount
+        global_state['balance'][recipient] = new_balance
 
     def _init_global_state(self, path_conditions_and_vars, global_state):
-        new_var = z3.BitVec('Is', 256)
+        new_var = smt.BitVec('Is', 256)
         sender_address = new_var & evm_params.CONSTANT_ONES_159
         s_node = x_graph.SenderNode('Is', new_var)
         self.x_graph.cache_var_node(new_var, s_node)
 
-        new_var = z3.BitVec('Ia', 256)
+        new_var = smt.BitVec('Ia', 256)
         receiver_address = new_var & evm_params.CONSTANT_ONES_159
         r_node = x_graph.ReceiverNode('Ia', new_var)
         self.x_graph.cache_var_node(new_var, r_node)
 
-        deposited_value = z3.BitVec('Iv', 256)  # value of transaction
+        deposited_value = smt.BitVec('Iv', 256)  # value of transaction
         dv_node = x_graph.DepositValueNode('Iv', deposited_value)
         self.x_graph.cache_var_node(deposited_value, dv_node)
 
-        init_is = z3.BitVec(
+        init_is = smt.BitVec(
             'init_Is', 256
         )  # balance of sender, balance variable name is 'init_'+addressName
         isb_node = x_graph.BalanceNode('init_Is', init_is, sender_address)
         self.x_graph.cache_var_node(init_is, isb_node)
 
-        init_ia = z3.BitVec('init_Ia', 256)  # balance of receiver
+        init_ia = smt.BitVec('init_Ia', 256)  # balance of receiver
         irb_node = x_graph.BalanceNode('init_Ia', init_is, receiver_address)
         self.x_graph.cache_var_node(init_ia, irb_node)
 
         call_data_size_name = self.gen.gen_data_size()
-        call_data_size = z3.BitVec(call_data_size_name, 256)
+        call_data_size = smt.BitVec(call_data_size_name, 256)
         ds_node = x_graph.InputDataSizeNode(call_data_size_name, call_data_size)
         self.x_graph.cache_var_node(call_data_size, ds_node)
 
         new_var_name = self.gen.gen_gas_price_var()
-        gas_price = z3.BitVec(new_var_name, 256)
+        gas_price = smt.BitVec(new_var_name, 256)
         gp_node = x_graph.GasPriceNode(new_var_name, gas_price)
         self.x_graph.cache_var_node(gas_price, gp_node)
 
         new_var_name = self.gen.gen_origin_var()
-        origin = z3.BitVec(new_var_name, 256)
+        origin = smt.BitVec(new_var_name, 256)
         os_node = x_graph.OriginNode(new_var_name, origin)
         self.x_graph.cache_var_node(origin, os_node)
 
         new_var_name = self.gen.gen_coin_base()
-        current_coinbase = z3.BitVec(new_var_name, 256)
+        current_coinbase = smt.BitVec(new_var_name, 256)
         cb_node = x_graph.CoinbaseNode(new_var_name, current_coinbase)
         self.x_graph.cache_var_node(current_coinbase, cb_node)
 
         new_var_name = self.gen.gen_number()
-        current_number = z3.BitVec(new_var_name, 256)
+        current_number = smt.BitVec(new_var_name, 256)
         bn_node = x_graph.BlockNumberNode(new_var_name, current_number)
         self.x_graph.cache_var_node(current_number, bn_node)
 
         new_var_name = self.gen.gen_difficult()
-        current_difficulty = z3.BitVec(new_var_name, 256)
+        current_difficulty = smt.BitVec(new_var_name, 256)
         d_node = x_graph.DifficultyNode(new_var_name, current_difficulty)
         self.x_graph.cache_var_node(current_difficulty, d_node)
 
         new_var_name = self.gen.gen_gas_limit()
-        current_gas_limit = z3.BitVec(new_var_name, 256)
+        current_gas_limit = smt.BitVec(new_var_name, 256)
         gl_node = x_graph.GasLimitNode(new_var_name, current_gas_limit)
         self.x_graph.cache_var_node(current_gas_limit, gl_node)
 
         new_var_name = self.gen.gen_chain_id()
-        current_chain_id = z3.BitVec(new_var_name, 256)
+        current_chain_id = smt.BitVec(new_var_name, 256)
         ci_node = x_graph.ChainIdNode(new_var_name, current_chain_id)
         self.x_graph.cache_var_node(current_chain_id, ci_node)
 
         new_var_name = self.gen.gen_base_fee()
-        current_base_fee = z3.BitVec(new_var_name, 256)
+        current_base_fee = smt.BitVec(new_var_name, 256)
         bf_node = x_graph.BaseFeeNode(new_var_name, current_base_fee)
         self.x_graph.cache_var_node(current_base_fee, bf_node)
 
         new_var_name = self.gen.gen_timestamp()
-        current_timestamp = z3.BitVec(new_var_name, 256)
+        current_timestamp = smt.BitVec(new_var_name, 256)
         ts_node = x_graph.TimeStampNode(new_var_name, current_timestamp)
         self.x_graph.cache_var_node(current_timestamp, ts_node)
 
         # set all the world state before symbolic execution of tx
-        global_state['storage'] = {}  # the state of the current contract
-        global_state[
-            'miu'] = 0  # the size of memory in use, 1 == 32 bytes == 256 bits
+        # the state of the current contract
+        global_state['storage'] = world_state.StateMap()
         global_state['value'] = deposited_value
         global_state['senderAddress'] = sender_address
         global_state['receiverAddress'] = receiver_address
@@ -1614,11 +1877,11 @@ class EVMInterpreter:
         global_state['baseFee'] = current_base_fee
         global_state['callDataSize'] = call_data_size
 
-        constraint0 = (deposited_value >= z3.BitVecVal(0, 256))
+        constraint0 = (deposited_value >= smt.BitVecVal(0, 256))
         constraint1 = (init_is >= deposited_value)
-        constraint2 = (init_ia >= z3.BitVecVal(0, 256))
+        constraint2 = (init_ia >= smt.BitVecVal(0, 256))
         path_conditions_and_vars['path_condition'].append(
-            z3.And(constraint0, constraint1, constraint2))
+            smt.And(constraint0, constraint1, constraint2))
         path_conditions_and_vars['branch_flag'].append(True)
         self.x_graph.add_constraint_node(path_conditions_and_vars, 0, -1,
                                          'init')
@@ -1631,177 +1894,43 @@ class EVMInterpreter:
         global_state['balance'][global_state['receiverAddress']] = (
             init_ia + deposited_value)
 
-    # [start, start+size-1], e.g. [0, 31]
-    # memory for real indexes, map key is start, map value is (end, value)
-    # mem for symbolic indexes, map key is start, map value is (end, value)
     @staticmethod
     def write_memory(start, value, params, size=32):
-        new_miu = util.convert_result(start + size)
-        if util.is_all_real(new_miu, params.global_state["miu"]):
-            params.global_state["miu"] = max(math.ceil(new_miu / 32.0),
-                                             params.global_state["miu"])
-        else:
-            new_miu = util.convert_result(new_miu / 32)
-            params.global_state["miu"] = z3.If(
-                new_miu > params.global_state["miu"], new_miu,
-                params.global_state["miu"])
-
-        if util.is_all_real(start, size):
-            # [start, end] is filled with new value
-            end = start + size - 1
-            memory = params.memory
-            old_keys = list(memory.keys())
-            for old_start in old_keys:
-                old_end = memory[old_start][0]
-                old_value = memory[old_start][1]
-                old_size = old_end - old_start + 1
-
-                if end < old_start:
-                    continue
-                elif start <= old_start <= end:
-                    if end >= old_end:
-                        memory.pop(old_start)
-                    else:  # old_end > end
-                        memory[end +
-                               1] = (old_end,
-                                     util.convert_result(
-                                         z3.Extract(
-                                             8 * (old_end - old_start + 1) - 1,
-                                             8 * (end + 1 - old_start),
-                                             util.to_symbolic(old_value,
-                                                              bits=old_size *
-                                                              8))))
-                        memory.pop(old_start)
-                elif old_start < start:
-                    if old_end < start:
-                        continue
-                    elif end >= old_end >= start:
-                        memory[old_start] = (start - 1,
-                                             util.convert_result(
-                                                 z3.Extract(
-                                                     8 * (start - old_start) -
-                                                     1, 0,
-                                                     util.to_symbolic(
-                                                         old_value,
-                                                         bits=old_size * 8))))
-                    else:  # old_end > end
-                        memory[old_start] = (start - 1,
-                                             util.convert_result(
-                                                 z3.Extract(
-                                                     8 * (start - old_start) -
-                                                     1, 0,
-                                                     util.to_symbolic(
-                                                         old_value,
-                                                         bits=old_size * 8))))
-                        memory[end +
-                               1] = (old_end,
-                                     util.convert_result(
-                                         z3.Extract(
-                                             8 * (old_end - old_start + 1) - 1,
-                                             8 * (end + 1 - old_start),
-                                             util.to_symbolic(old_value,
-                                                              bits=old_size *
-                                                              8))))
-            memory[start] = (end,
-                             util.convert_result(
-                                 z3.Extract(8 * size - 1, 0,
-                                            util.to_symbolic(value))))
-        else:
-            params.mem = {start: (start + size - 1, value)}
-
-    # load a value of 32 bytes size from memory indexed by 'start'(in byte)
-    # the sort of return value should be in {real int, BitVec(256)}
-    # we assume that real index should load value from memory and symbol
-    # index should load memory from mem
-    # TODO(Yang): debug this function at runtime and implement the unit test,
-    #  and simplify for z3 expression of contract and extra
-    def load_memory(self, start, params,
-                    size):  # size = start - end + 1, e.g. 32
-        if util.is_all_real(start):
-            memory = params.memory
-            if start in memory:  # memory := (start, (end, value))
-                end = memory[start][0]
-                value = memory[start][1]
-                if end - start == size - 1:
-                    result = value
-                elif end - start > size - 1:
-                    result = z3.Extract(
-                        8 * size - 1, 0,
-                        util.to_symbolic(value, bits=8 * (end - start + 1)))
-                else:
-                    result = z3.Concat(
-                        util.to_symbolic(value, bits=8 * (end - start + 1)),
-                        util.to_symbolic(self.load_memory(
-                            end + 1, params, size - (end - start + 1)),
-                                         bits=(size - (end - start + 1)) * 8))
-            else:
-                flag = False
-                for x in memory:
-                    end = memory[x][0]
-                    value = memory[x][1]
-                    if x < start <= end:
-                        flag = True
-                        if end - start == size - 1:
-                            result = z3.Extract(
-                                8 * (end - x + 1) - 1, 8 * (start - x),
-                                util.to_symbolic(value, bits=8 * (end - x + 1)))
-                        elif end - start > size - 1:
-                            result = z3.Extract(
-                                8 * (start + size - x) - 1, 8 * (start - x),
-                                util.to_symbolic(value, bits=8 * (end - x + 1)))
-                        else:
-                            result = z3.Concat(
-                                z3.Extract(
-                                    8 * (end - x + 1) - 1, 8 * (start - x),
-                                    util.to_symbolic(value,
-                                                     bits=8 * (end - x + 1))),
-                                util.to_symbolic(
-                                    self.load_memory(end + 1, params,
-                                                     size - (end - start + 1)),
-                                    bits=(size - (end - start + 1)) * 8))
-                        if z3.is_expr(result):
-                            assert result.sort() == z3.BitVecSort(
-                                8 * size), 'load memory is not BitVecSort(256)'
-
-                        return util.convert_result(result)
-                if not flag:
-                    end = start + size - 1
-                    for x in list(memory.keys()):
-                        if start < x <= end:
-                            result = z3.Concat(
-                                util.to_symbolic(0, (x - start) * 8),
-                                util.to_symbolic(
-                                    self.load_memory(x, params,
-                                                     size - x + start),
-                                    (size - x + start) * 8))
-                            if z3.is_expr(result):
-                                assert result.sort() == z3.BitVecSort(
-                                    8 *
-                                    size), 'load memory is not BitVecSort(256)'
-
-                            return util.convert_result(result)
-                result = z3.BitVecVal(0, 8 * size)
-        else:
-            mem = params.mem
-            for x in mem:
-                if (util.convert_result_to_int(start - x) == 0 and
-                        util.convert_result_to_int(mem[x][0] - start)
-                        == size - 1):
-                    return mem[x][1]
-            else:
-                log.mylogger.debug(
-                    'symbolic index not in mem, create a new memory variable')
-                new_var_name = self.gen.gen_mem_var(params.global_state['pc'] -
-                                                    1)
-                result = z3.BitVec(new_var_name, 256)
-                node = x_graph.MemoryNode(new_var_name, result, start)
-                self.x_graph.cache_var_node(result, node)
+        params.memory.write(start, value, size)
 
-        if z3.is_expr(result):
-            assert result.sort() == z3.BitVecSort(
-                8 * size), 'load memory is not BitVecSort(256)'
-
-        return util.convert_result(result)
+    # load a value of size bytes from memory indexed by 'start'(in byte)
+    # the sort of return value should be in {real int, BitVec(8 * size)}
+    def load_memory(self, start, params, size):
+        result = params.memory.load(start, size)
+        if result is None:
+            log.mylogger.debug(
+                'symbolic index not in mem, create a new memory variable')
+            new_var_name = self.gen.gen_mem_var(params.global_state['pc'] - 1)
+            result = smt.BitVec(new_var_name, 256)
+            node = x_graph.MemoryNode(new_var_name, result, start)
+            self.x_graph.cache_var_node(result, node)
+        return result
+
+
+def _is_same_snapshot(snapshot, params):
+    stack, memory, storage, balance, path_condition = snapshot
+    global_state = params.global_state
+    conditions = params.path_conditions_and_vars['path_condition']
+    return (len(stack) == len(params.stack) and
+            all(smt_util.is_same(x, y) for x, y in zip(stack, params.stack)) and
+            memory.is_same(params.memory) and
+            _is_same_map(storage, global_state['storage']) and
+            _is_same_map(balance, global_state['balance']) and
+            len(path_condition) == len(conditions) and
+            (path_condition.get_common_length(conditions) == len(conditions) or
+             all(smt_util.is_same(x, y)
+                 for x, y in zip(path_condition, conditions))))
+
+
+def _is_same_map(first, second):
+    return len(first) == len(second) and all(
+        key in second and smt_util.is_same(value, second[key])
+        for key, value in first.items())
 
 
 class Parameter:
@@ -1809,13 +1938,11 @@ class Parameter:
     def __init__(self, **kwargs):
         attr_defaults = {
             # for all elem in stack, they should be either 'python int' or
-            # z3 type BitVecRef(256) or other types of data
+            # z3 type BitVecRef(256) or other types of data, the top of stack
+            # is the last element so that push and pop are O(1)
             'stack': [],
-            # all variables located with real type of address and size is
-            # stored and loaded by memory, and with one symbolic var in address
-            # or size, the value is stored and loaded in mem
-            'memory': {},
-            'mem': {},
+            # byte addressed memory, see evm_memory.Memory
+            'memory': evm_memory.Memory(),
 
             # used to show all calls of current path, every element is the
             # real int representing pc of call instruction
@@ -1824,7 +1951,11 @@ class Parameter:
             # mark all the visited edges of current_path, for detecting loops
             # and control the loop_depth under limits
             # {Edge:num}
-            'visited': {},
+            'visited': persistent.CowDict(),
+
+            # stack and storage of the path at the loop headers it entered,
+            # for summarizing the loops, {header: (stack, storage)}
+            'loop_entries': persistent.CowDict(),
 
             # path conditions and vars form constrains of this path
             'path_conditions_and_vars': {},
@@ -1839,5 +1970,15 @@ class Parameter:
             setattr(self, attr, kwargs.get(attr, default))
 
     def copy(self):
-        kwargs = util.custom_deepcopy(self.__dict__)
+        # O(1) for maps and path conditions, they are copied on write
+        kwargs = {
+            attr: persistent.fork(value)
+            for attr, value in six.iteritems(self.__dict__)
+        }
         return Parameter(**kwargs)
+
+    def get_private_size(self):
+        """Return the size in bytes of the state not shared with forks."""
+        return sum(
+            persistent.get_private_size(value)
+            for value in self.__dict__.values())
@@ -0,0 +1,261 @@
+"""Byte addressed memory of a path with a symbolic overlay.
+
+Memory has two layers:
+
+    concrete: a bytearray of the concrete bytes at concrete addresses, so
+        loads and stores of concrete values, e.g. the free memory pointer and
+        abi encoding, are O(1) and build no symbolic expressions
+    overlay: intervals of concrete addresses holding symbolic values, and
+        the last store at a symbolic address
+
+A load is built from the overlay values it intersects and the concrete
+bytes between them. The size of memory in use is tracked as a concrete
+number of words plus the symbolic sizes of stores at symbolic addresses.
+Memory is copied on its first write after copy().
+"""
+import bisect
+import sys
+
+from evm_engine.interpreter import evm_params
+from evm_engine.interpreter import persistent
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import smt_util
+
+
+class Memory(persistent.Persistent):
+
+    __slots__ = ('_data', '_starts', '_overlay', '_symbolic', '_shared',
+                 '_hash', 'words', 'symbolic_words')
+
+    def __init__(self):
+        # concrete bytes, memory beyond its length is zero
+        self._data = bytearray()
+        # sorted starts of the overlay intervals
+        self._starts = []
+        # overlay intervals, start -> (end, value), value has 8 * (end -
+        # start + 1) bits, or is an int beyond evm_params.MAX_MEMORY_SIZE
+        self._overlay = {}
+        # the last store at a symbolic address, start -> (end, value)
+        self._symbolic = {}
+        self._shared = False
+        # hash of the contents, None for not computed since the last write
+        self._hash = None
+        # size of memory in use in words of 32 bytes
+        self.words = 0
+        # sizes in words of stores at symbolic addresses
+        self.symbolic_words = ()
+
+    def copy(self):
+        new = Memory.__new__(Memory)
+        new._data = self._data
+        new._starts = self._starts
+        new._overlay = self._overlay
+        new._symbolic = self._symbolic
+        new._shared = True
+        new._hash = self._hash
+        new.words = self.words
+        new.symbolic_words = self.symbolic_words
+        self._shared = True
+        return new
+
+    def clear(self, start=0):
+        """Forget the contents of memory from start, but not its size."""
+        if smt.is_expr(start) or start <= 0:
+            self._data = bytearray()
+            self._starts = []
+            self._overlay = {}
+            self._symbolic = {}
+            self._shared = False
+            self._hash = None
+            return
+        self._write_owned()
+        del self._data[start:]
+        if self._starts:
+            self._remove_overlay(start, self._overlay[self._starts[-1]][0])
+        self._symbolic = {}
+
+    def is_same(self, other):
+        """Return if other holds the same values, compared by identity."""
+        if self.words != other.words or not _is_same_tuple(
+                self.symbolic_words, other.symbolic_words):
+            return False
+        if self._data != other._data or self._starts != other._starts:
+            return False
+        for mine, others in ((self._overlay, other._overlay),
+                             (self._symbolic, other._symbolic)):
+            if mine is others:
+                continue
+            if len(mine) != len(others):
+                return False
+            for x, (end, value) in mine.items():
+                if x not in others or not _is_same_tuple(
+                        (end, value), others[x]):
+                    return False
+        return True
+
+    def get_hash(self):
+        """Return a hash of the contents and size of memory."""
+        if self._hash is None:
+            self._hash = hash((bytes(self._data).rstrip(b'\0'),
+                               tuple((x, self._overlay[x])
+                                     for x in self._starts),
+                               tuple(self._symbolic.items()), self.words,
+                               self.symbolic_words))
+        return self._hash
+
+    def get_size(self):
+        """Return the size of memory in use in bytes, i.e. MSIZE."""
+        words = self.words
+        for symbolic_words in self.symbolic_words:
+            words = smt.If(symbolic_words > words, symbolic_words, words)
+        return smt_util.convert_result(32 * words)
+
+    def get_private_size(self):
+        if self._shared:
+            return 0
+        return (sys.getsizeof(self._data) + sys.getsizeof(self._starts) +
+                sys.getsizeof(self._overlay) + sys.getsizeof(self._symbolic))
+
+    def write(self, start, value, size):
+        """Store the lowest size bytes of value at start."""
+        if not smt.is_expr(start):
+            self.words = max(self.words, -(-(start + size) // 32))
+            self._write_concrete(start, value, size)
+            return
+
+        symbolic_words = smt_util.convert_result(
+            smt.UDiv(smt_util.to_symbolic(start + size + 31), 32))
+        if not smt.is_expr(symbolic_words):
+            self.words = max(self.words, symbolic_words)
+        elif not any(
+                smt.is_expr(words) and words.get_id() ==
+                symbolic_words.get_id() for words in self.symbolic_words):
+            self.symbolic_words += (symbolic_words,)
+        self._write_owned()
+        self._symbolic = {start: (start + size - 1, value)}
+
+    def load(self, start, size):
+        """Return size bytes at start, None if start is an unknown symbol."""
+        if smt.is_expr(start):
+            for x in self._symbolic:
+                if (smt_util.convert_result_to_int(start - x) == 0 and
+                        smt_util.convert_result_to_int(self._symbolic[x][0] -
+                                                   start) == size - 1):
+                    return self._symbolic[x][1]
+            return None
+
+        end = start + size - 1
+        overlaps = self._find_overlaps(start, end)
+        if not overlaps:
+            return self._read_bytes(start, end)
+        if len(overlaps) == 1:
+            x, (x_end, value) = overlaps[0]
+            if x == start and x_end == end:
+                return value
+
+        pieces = []
+        address = start
+        for x, (x_end, value) in overlaps:
+            if address < x:
+                pieces.append((self._read_bytes(address, x - 1), x - address))
+                address = x
+            piece_end = min(x_end, end)
+            pieces.append((_slice(value, x, x_end, address,
+                                  piece_end), piece_end - address + 1))
+            address = piece_end + 1
+        if address <= end:
+            pieces.append((self._read_bytes(address, end), end - address + 1))
+
+        if smt_util.is_all_real(*[piece for piece, _ in pieces]):
+            result = 0
+            for piece, piece_size in pieces:
+                result = (result << (8 * piece_size)) | piece
+            return result
+        if len(pieces) == 1:
+            return pieces[0][0]
+        return smt_util.convert_result(
+            smt.Concat(*[
+                smt_util.to_symbolic(piece, 8 * piece_size)
+                for piece, piece_size in pieces
+            ]))
+
+    def _write_owned(self):
+        self._hash = None
+        if self._shared:
+            self._data = bytearray(self._data)
+            self._starts = list(self._starts)
+            self._overlay = dict(self._overlay)
+            self._symbolic = dict(self._symbolic)
+            self._shared = False
+
+    def _write_concrete(self, start, value, size):
+        self._write_owned()
+        end = start + size - 1
+        self._remove_overlay(start, end)
+        if smt.is_expr(value) or end >= evm_params.MAX_MEMORY_SIZE:
+            if smt.is_expr(value):
+                value = smt_util.convert_result(
+                    smt.Extract(8 * size - 1, 0, smt_util.to_symbolic(value)))
+            else:
+                value &= (1 << (8 * size)) - 1
+            bisect.insort(self._starts, start)
+            self._overlay[start] = (end, value)
+            return
+
+        if len(self._data) <= end:
+            self._data.extend(bytes(end + 1 - len(self._data)))
+        value &= (1 << (8 * size)) - 1
+        self._data[start:end + 1] = value.to_bytes(size, 'big')
+
+    # overlay intervals intersecting [start, end], in the order of address
+    def _find_overlaps(self, start, end):
+        if not self._starts:
+            return []
+        overlaps = []
+        i = bisect.bisect_left(self._starts, start)
+        if i > 0 and self._overlay[self._starts[i - 1]][0] >= start:
+            i -= 1
+        while i < len(self._starts) and self._starts[i] <= end:
+            x = self._starts[i]
+            overlaps.append((x, self._overlay[x]))
+            i += 1
+        return overlaps
+
+    # remove [start, end] from the overlay, keeping the rest of intervals
+    # partly overlapped
+    def _remove_overlay(self, start, end):
+        for x, (x_end, value) in self._find_overlaps(start, end):
+            self._starts.remove(x)
+            del self._overlay[x]
+            if x < start:
+                bisect.insort(self._starts, x)
+                self._overlay[x] = (start - 1,
+                                    _slice(value, x, x_end, x, start - 1))
+            if x_end > end:
+                bisect.insort(self._starts, end + 1)
+                self._overlay[end + 1] = (x_end,
+                                          _slice(value, x, x_end, end + 1,
+                                                 x_end))
+
+    def _read_bytes(self, start, end):
+        if start >= len(self._data):
+            return 0
+        data = self._data[start:end + 1]
+        return int.from_bytes(data, 'big') << (8 *
+                                                (end - start + 1 - len(data)))
+
+
+# bytes [start, end] of value, which holds bytes [x, x_end] big endian
+def _slice(value, x, x_end, start, end):
+    if not smt.is_expr(value):
+        return (value >> (8 * (x_end - end))) & ((1 << (8 *
+                                                        (end - start + 1))) - 1)
+    if start == x and end == x_end:
+        return value
+    return smt_util.convert_result(
+        smt.Extract(8 * (x_end - start) + 7, 8 * (x_end - end), value))
+
+
+def _is_same_tuple(first, second):
+    return len(first) == len(second) and all(
+        smt_util.is_same(x, y) for x, y in zip(first, second))
@@ -1,10 +1,11 @@
-import z3
-
 # timeout for z3 (in ms)
 Z3_TIMEOUT = 3000
 
 LOOP_LIMIT = 2
 
+# max times an edge is visited by all paths of a function
+EDGE_LIMIT = 10
+
 GAS_LIMIT = 200000
 
 DEPTH_LIMIT = 10
@@ -15,4 +16,4 @@ UNSIGNED_BOUND_NUMBER = 2**256 - 1
 
 UNSIGNED_BYTE_NUMBER = 2**8 - 1
 
-CONSTANT_ONES_159 = z3.BitVecVal((1 << 160) - 1, 256)
+CONSTANT_ONES_159 = (1 << 160) - 1
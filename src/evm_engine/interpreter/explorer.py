@@ -0,0 +1,288 @@
+"""Worklists of execution states for the path exploration of EVMInterpreter.
+
+EVMInterpreter.sym_exec pops a state from a worklist, executes its block and
+pushes the successor states, so the length of a path is not bounded by the
+python recursion limit. The order of popping states is the search strategy:
+
+    dfs: the last pushed state, i.e. the order of the former recursion
+    bfs: the first pushed state
+    random: a random state
+    uncovered: the last pushed state whose edge is not visited yet, otherwise
+        the last pushed state
+    directed: the state whose block is the nearest to a block changed by
+        the diff, the last pushed of them first
+
+With global_params.MERGE_STATES, a MergingWorklist holds the states at join
+blocks for merging, and pops the other states by the strategy. With
+global_params.SCHEDULE_FUNCTIONS, a ScheduledWorklist explores the functions
+of the contract in turns, each in its own budget.
+"""
+import collections
+import heapq
+import random
+import time
+
+STRATEGIES = ('dfs', 'bfs', 'random', 'uncovered', 'directed')
+
+
+class Frame:
+    """A function entered by states.
+
+    A frame is exited once no state is in it, that is every path through the
+    function is terminated.
+    """
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        # visited edges of the function and their times
+        self.visited_edges = {}
+        # number of states in the function
+        self.states = 1
+
+
+class State:
+    """A path to explore, i.e. the block to execute next and its params."""
+
+    def __init__(self,
+                 params,
+                 block,
+                 pre_block,
+                 path,
+                 frame,
+                 branch=None,
+                 pending=()):
+        self.params = params
+        self.block = block
+        self.pre_block = pre_block
+        # blocks of the path, e.g. [block1, block2, ...]
+        self.path = path
+        # innermost function of the path, None for not in a function
+        self.frame = frame
+        # (pc, name) of the branch constraint to add to the XGraph before
+        # executing the block, None for not a branch
+        self.branch = branch
+        # solver_pool.Query of the branches taken to the block, answered
+        # before executing it
+        self.pending = pending
+
+    def get_edge(self):
+        return self.pre_block, self.block
+
+
+class DfsWorklist:
+
+    def __init__(self):
+        self.states = []
+
+    def __len__(self):
+        return len(self.states)
+
+    def push(self, states):
+        """Push states, the first of states is explored first."""
+        self.states.extend(reversed(states))
+
+    def pop(self):
+        return self.states.pop()
+
+
+class BfsWorklist:
+
+    def __init__(self):
+        self.states = collections.deque()
+
+    def __len__(self):
+        return len(self.states)
+
+    def push(self, states):
+        self.states.extend(states)
+
+    def pop(self):
+        return self.states.popleft()
+
+
+class RandomWorklist(DfsWorklist):
+
+    def __init__(self, seed=0):
+        super().__init__()
+        self.random = random.Random(seed)
+
+    def pop(self):
+        index = self.random.randrange(len(self.states))
+        self.states[index], self.states[-1] = self.states[-1], self.states[index]
+        return self.states.pop()
+
+
+class UncoveredWorklist(DfsWorklist):
+
+    def __init__(self, visited_edges):
+        super().__init__()
+        # global visited edges of the interpreter, updated while exploring
+        self.visited_edges = visited_edges
+
+    def pop(self):
+        for index in range(len(self.states) - 1, -1, -1):
+            if self.states[index].get_edge() not in self.visited_edges:
+                return self.states.pop(index)
+        return self.states.pop()
+
+
+class DirectedWorklist:
+
+    def __init__(self, distances):
+        # block -> number of edges to the nearest changed block, blocks not
+        # reaching a changed block are not in it
+        self.distances = distances
+        # heap of (distance, -push order, state)
+        self.states = []
+        self.pushed = 0
+
+    def __len__(self):
+        return len(self.states)
+
+    def push(self, states):
+        for state in reversed(states):
+            self.pushed += 1
+            heapq.heappush(self.states,
+                           (self.distances.get(state.block, float('inf')),
+                            -self.pushed, state))
+
+    def pop(self):
+        return heapq.heappop(self.states)[2]
+
+
+class MergingWorklist:
+    """A worklist which holds states at join blocks so that they can merge.
+
+    A state entering a join block of a function waits there until every
+    state in the function waits, then the waiting states of each block are
+    merged by merge(states) and pushed to worklist.
+    """
+
+    def __init__(self, worklist, join_blocks, merge):
+        self.worklist = worklist
+        self.join_blocks = join_blocks
+        self.merge = merge
+        # frame -> {block: [states waiting at the block]}
+        self.waiting = {}
+        self.waiting_states = 0
+        # number of states merged into others
+        self.merged_states = 0
+
+    def __len__(self):
+        return len(self.worklist) + self.waiting_states
+
+    def push(self, states):
+        active = []
+        for state in states:
+            # the constraint of a branch is added when entering its block,
+            # so states of branches do not wait
+            if (state.frame is None or state.branch is not None or
+                    state.block not in self.join_blocks):
+                active.append(state)
+                continue
+            self.waiting.setdefault(state.frame, {}).setdefault(
+                state.block, []).append(state)
+            self.waiting_states += 1
+        self.worklist.push(active)
+
+    def pop(self):
+        released = False
+        for frame, blocks in list(self.waiting.items()):
+            waiting_states = sum(len(states) for states in blocks.values())
+            if waiting_states >= frame.states:
+                self._release(frame)
+                released = True
+        if not self.worklist and not released:
+            # no frame is done, e.g. states wait in frames of each other
+            for frame in list(self.waiting):
+                self._release(frame)
+        return self.worklist.pop()
+
+    def _release(self, frame):
+        for states in self.waiting.pop(frame).values():
+            self.waiting_states -= len(states)
+            merged = self.merge(states)
+            frame.states -= len(states) - len(merged)
+            self.merged_states += len(states) - len(merged)
+            self.worklist.push(merged)
+
+
+class ScheduledWorklist:
+    """A worklist which gives every function of a contract a budget.
+
+    The states are grouped into tasks by get_task(state), e.g. the function
+    of the dispatcher they enter, and popped by the strategy of each task.
+    The first task in its budget is explored, so a costly function early in
+    the dispatcher cannot starve the later ones. A task is in its budget
+    until it spends its time slice or terminates path_budget paths, where the
+    time slice is the time left by the finished tasks divided by the tasks
+    not finished. Once every task is out of its budget, the task which spent
+    the least time is explored.
+    """
+
+    def __init__(self, new_worklist, get_task, budgets, tasks, time_budget,
+                 path_budget):
+        self.new_worklist = new_worklist
+        self.get_task = get_task
+        # task -> {'time': seconds spent, 'paths': terminated paths}, the
+        # paths are counted by the interpreter
+        self.budgets = budgets
+        # number of tasks expected, including the ones not pushed yet
+        self.tasks = tasks
+        self.time_budget = time_budget
+        self.path_budget = path_budget
+        # task -> worklist of its states, in the order of first push
+        self.worklists = {}
+        # task of the state popped last and the time it was popped
+        self.current = None
+        self.popped_time = None
+
+    def __len__(self):
+        return sum(len(worklist) for worklist in self.worklists.values())
+
+    def push(self, states):
+        tasks = {}
+        for state in states:
+            tasks.setdefault(self.get_task(state), []).append(state)
+        for task, task_states in tasks.items():
+            if task not in self.worklists:
+                self.worklists[task] = self.new_worklist()
+                self.budgets.setdefault(task, {'time': 0, 'paths': 0})
+            self.worklists[task].push(task_states)
+
+    def pop(self):
+        now = time.time()
+        if self.current is not None:
+            self.budgets[self.current]['time'] += now - self.popped_time
+        self.popped_time = now
+
+        active = [task for task, worklist in self.worklists.items() if worklist]
+        finished_time = sum(budget['time']
+                            for task, budget in self.budgets.items()
+                            if not self.worklists[task])
+        time_slice = (self.time_budget - finished_time) / max(
+            self.tasks - len(self.budgets) + len(active), 1)
+        for task in active:
+            budget = self.budgets[task]
+            if (budget['time'] < time_slice and
+                    budget['paths'] < self.path_budget):
+                break
+        else:
+            task = min(active, key=lambda task: self.budgets[task]['time'])
+        self.current = task
+        return self.worklists[task].pop()
+
+
+def new_worklist(strategy, visited_edges, distances=None):
+    if strategy == 'dfs':
+        return DfsWorklist()
+    if strategy == 'bfs':
+        return BfsWorklist()
+    if strategy == 'random':
+        return RandomWorklist()
+    if strategy == 'uncovered':
+        return UncoveredWorklist(visited_edges)
+    if strategy == 'directed':
+        return DirectedWorklist(distances or {})
+    raise ValueError(f'unknown search strategy: {strategy}')
@@ -0,0 +1,205 @@
+"""Solver checks of branch feasibility, for pruning infeasible paths.
+
+A query asks if a branch condition is satisfiable together with the path
+conditions, and is answered in three steps:
+
+    1. slicing: only the path conditions sharing variables with the branch
+       condition, directly or through other path conditions, are kept
+    2. caching: results are cached by the set of sliced conditions, and
+       models of recent satisfiable queries are tried on the conditions
+    3. solving: the sliced conditions are added to an incremental z3 solver
+       with one scope per condition, so the queries along a path push and pop
+       only the conditions after their common prefix
+
+Unknown results, e.g. solver timeouts, are treated as feasible. With submit,
+step 3 is done by a solver_pool.SolverPool instead, and the result is polled
+later, before the branch is explored.
+"""
+import collections
+import time
+
+import z3
+
+from evm_engine.interpreter import evm_params
+from evm_engine.interpreter import smt
+from utils import global_params, util
+
+# number of recent models tried before solving
+MAX_MODELS = 4
+
+
+class FeasibilityChecker:
+
+    def __init__(self):
+        self.solver = z3.Solver()
+        self.solver.set('timeout', evm_params.Z3_TIMEOUT)
+        # conditions added to the solver, one scope for each
+        self.asserted = []
+        # expression id -> (expression, names of its variables)
+        self.vars_cache = util.LruCache(global_params.SOLVER_CACHE_SIZE)
+        # frozenset of condition ids -> (conditions, is satisfiable)
+        self.result_cache = util.LruCache(global_params.SOLVER_CACHE_SIZE)
+        self.models = collections.deque(maxlen=MAX_MODELS)
+
+        self.queries = 0
+        self.cache_hits = 0
+        self.model_hits = 0
+        self.solver_checks = 0
+        self.unknown = 0
+        self.infeasible = 0
+        self.solver_time = 0
+
+    def is_feasible(self, path_conditions, condition):
+        """Return False if condition can not hold on the path for sure."""
+        if not smt.is_expr(condition):
+            return bool(condition)
+        self.queries += 1
+        conditions = self._slice(path_conditions, condition)
+        if conditions is None:
+            feasible = False
+        else:
+            feasible = self._check(conditions)
+        if not feasible:
+            self.infeasible += 1
+        return feasible
+
+    def submit(self, path_conditions, condition, pool):
+        """Like is_feasible, but return a solver_pool.Query if not known."""
+        if not smt.is_expr(condition):
+            return bool(condition)
+        self.queries += 1
+        conditions = self._slice(path_conditions, condition)
+        if conditions is None:
+            self.infeasible += 1
+            return False
+        key, z3_conditions, feasible = self._lookup(conditions)
+        if feasible is None:
+            return pool.submit(key, conditions, z3_conditions)
+        if not feasible:
+            self.infeasible += 1
+        return feasible
+
+    def poll(self, query, wait=False):
+        """Return if the submitted query is feasible, None if not known.
+
+        With wait, wait for the query to be answered instead.
+        """
+        recorded = query.result is not None
+        result = query.wait() if wait else query.poll()
+        if result is None:
+            return None
+        feasible = result != 'unsat'
+        if not recorded:
+            self.solver_checks += 1
+            self.solver_time += query.solver_time
+            if result == 'unknown':
+                self.unknown += 1
+            elif not feasible:
+                self.infeasible += 1
+            self.result_cache.put(query.key, (query.conditions, feasible))
+        return feasible
+
+    def get_stats(self):
+        return {
+            'queries': self.queries,
+            'cache_hits': self.cache_hits,
+            'model_hits': self.model_hits,
+            'solver_checks': self.solver_checks,
+            'unknown': self.unknown,
+            'pruned': self.infeasible,
+            'solver_time': self.solver_time,
+        }
+
+    def _get_vars(self, expr):
+        key = expr.get_id()
+        entry = self.vars_cache.get(key)
+        if entry is None:
+            entry = (expr, frozenset(str(var) for var in smt.get_vars(expr)))
+            self.vars_cache.put(key, entry)
+        return entry[1]
+
+    # the path conditions condition depends on and condition, in the order
+    # of the path, or None if a path condition is False
+    def _slice(self, path_conditions, condition):
+        candidates = []
+        for expr in path_conditions:
+            if smt.is_expr(expr):
+                candidates.append((expr, self._get_vars(expr)))
+            elif not expr:
+                return None
+
+        names = set(self._get_vars(condition))
+        selected = [False] * len(candidates)
+        changed = True
+        while changed:
+            changed = False
+            for i, (_, expr_names) in enumerate(candidates):
+                if not selected[i] and not names.isdisjoint(expr_names):
+                    selected[i] = True
+                    names.update(expr_names)
+                    changed = True
+        conditions = [
+            expr for i, (expr, _) in enumerate(candidates) if selected[i]
+        ]
+        conditions.append(condition)
+        return conditions
+
+    def _check(self, conditions):
+        key, z3_conditions, feasible = self._lookup(conditions)
+        if feasible is None:
+            feasible = self._solve(conditions, z3_conditions)
+            # the conditions are kept alive so that their ids are not reused
+            self.result_cache.put(key, (conditions, feasible))
+        return feasible
+
+    # returns the cache key, the z3 conditions and if the conditions are
+    # feasible by the cache or recent models, None for unknown
+    def _lookup(self, conditions):
+        key = frozenset(expr.get_id() for expr in conditions)
+        entry = self.result_cache.get(key)
+        if entry is not None:
+            self.cache_hits += 1
+            return key, None, entry[1]
+
+        z3_conditions = [smt.to_z3(expr) for expr in conditions]
+        if self._satisfied_by_model(z3_conditions):
+            self.model_hits += 1
+            self.result_cache.put(key, (conditions, True))
+            return key, z3_conditions, True
+        return key, z3_conditions, None
+
+    def _satisfied_by_model(self, z3_conditions):
+        for model in self.models:
+            if all(
+                    z3.is_true(model.eval(expr, model_completion=True))
+                    for expr in z3_conditions):
+                return True
+        return False
+
+    def _solve(self, conditions, z3_conditions):
+        # pop the scopes after the common prefix and push the rest
+        common = 0
+        while (common < len(self.asserted) and
+               common < len(conditions) - 1 and
+               self.asserted[common].get_id() == conditions[common].get_id()):
+            common += 1
+        for _ in range(len(self.asserted) - common):
+            self.solver.pop()
+        del self.asserted[common:]
+        for i in range(common, len(conditions) - 1):
+            self.solver.push()
+            self.solver.add(z3_conditions[i])
+            self.asserted.append(conditions[i])
+
+        self.solver.push()
+        self.solver.add(z3_conditions[-1])
+        start_time = time.time()
+        result = self.solver.check()
+        self.solver_time += time.time() - start_time
+        self.solver_checks += 1
+        if result == z3.sat:
+            self.models.append(self.solver.model())
+        elif result == z3.unknown:
+            self.unknown += 1
+        self.solver.pop()
+        return result != z3.unsat
@@ -0,0 +1,68 @@
+"""Keccak-256 as used by the SHA3 instruction of EVM.
+
+This is the original Keccak padding, which differs from hashlib.sha3_256, so
+the permutation is implemented here in pure python.
+"""
+
+_RATE = 136
+_MASK = 2**64 - 1
+
+_ROUND_CONSTANTS = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A,
+    0x8000000080008000, 0x000000000000808B, 0x0000000080000001,
+    0x8000000080008081, 0x8000000000008009, 0x000000000000008A,
+    0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089,
+    0x8000000000008003, 0x8000000000008002, 0x8000000000000080,
+    0x000000000000800A, 0x800000008000000A, 0x8000000080008081,
+    0x8000000000008080, 0x0000000080000001, 0x8000000080008008)
+
+# rotation offsets of lane x + 5 * y
+_ROTATIONS = (0, 1, 62, 28, 27, 36, 44, 6, 55, 20, 3, 10, 43, 25, 39, 41, 45,
+              15, 21, 8, 18, 2, 61, 56, 14)
+
+
+def _rotate(lane, offset):
+    return ((lane << offset) | (lane >> (64 - offset))) & _MASK
+
+
+def _permute(lanes):
+    for round_constant in _ROUND_CONSTANTS:
+        # theta
+        parities = [
+            lanes[x] ^ lanes[x + 5] ^ lanes[x + 10] ^ lanes[x + 15] ^
+            lanes[x + 20] for x in range(5)
+        ]
+        for x in range(5):
+            d = parities[(x - 1) % 5] ^ _rotate(parities[(x + 1) % 5], 1)
+            for y in range(0, 25, 5):
+                lanes[x + y] ^= d
+        # rho and pi
+        moved = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                moved[y + 5 * ((2 * x + 3 * y) % 5)] = _rotate(
+                    lanes[x + 5 * y], _ROTATIONS[x + 5 * y])
+        # chi
+        for y in range(0, 25, 5):
+            for x in range(5):
+                lanes[x + y] = moved[x + y] ^ (
+                    (~moved[(x + 1) % 5 + y]) & moved[(x + 2) % 5 + y])
+        # iota
+        lanes[0] ^= round_constant
+
+
+def keccak256(data):
+    """Return the keccak-256 digest of data as bytes of 32."""
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(bytes(-len(padded) % _RATE))
+    padded[-1] |= 0x80
+
+    lanes = [0] * 25
+    for offset in range(0, len(padded), _RATE):
+        for i in range(_RATE // 8):
+            lanes[i] ^= int.from_bytes(
+                padded[offset + 8 * i:offset + 8 * i + 8], 'little')
+        _permute(lanes)
+    return b''.join(lane.to_bytes(8, 'little') for lane in lanes[:4])
@@ -0,0 +1,142 @@
+"""Merging of states which meet at a join block of a function.
+
+States forked at a branch often meet again a few blocks later with nearly
+the same state, e.g. after a ternary or a SafeMath check. Two such states
+are merged into one:
+
+    path condition: the common prefix of their path conditions, and the
+        disjunction of the conditions after it, whose constraint node is
+        added by the caller
+    stack, storage and balances: If(conditions of the first state, value of
+        the first state, value of the second state) for the values differing
+    loop counts and gas: the max of them
+
+The states are merged only if their memory, calls and other world state are
+the same, and at most max_diffs values differ, since every If makes the
+later expressions and solver queries larger. Stack values differing by a
+jump destination, e.g. the return addresses of calls of an internal
+function, are not merged, since the If would be a symbolic jump target.
+"""
+from evm_engine.interpreter import persistent
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import smt_util
+
+
+def merge(states, max_diffs, jump_dests, add_constraint_node):
+    """Merge the states at a block, return the states to explore.
+
+    Args:
+      states: states waiting at a block
+      max_diffs: max number of differing values of two merged states
+      jump_dests: addresses of the JUMPDEST blocks
+      add_constraint_node: adds the constraint node of the last path
+        condition of a merged state, as entering a branch does
+    """
+    merged = []
+    for state in states:
+        for i, other in enumerate(merged):
+            new = merge_pair(other, state, max_diffs, jump_dests,
+                             add_constraint_node)
+            if new is not None:
+                merged[i] = new
+                break
+        else:
+            merged.append(state)
+    return merged
+
+
+def merge_pair(first, second, max_diffs, jump_dests, add_constraint_node):
+    """Merge second into first and return first, None if not mergeable."""
+    if (first.frame is not second.frame or first.block != second.block or
+            first.pending or second.pending):
+        return None
+    params, other = first.params, second.params
+    if (len(params.stack) != len(other.stack) or
+            params.calls != other.calls or
+            not params.memory.is_same(other.memory)):
+        return None
+    diffs = _get_diffs(params, other, max_diffs, jump_dests)
+    if diffs is None:
+        return None
+
+    path_conditions = params.path_conditions_and_vars['path_condition']
+    other_conditions = other.path_conditions_and_vars['path_condition']
+    common = path_conditions.get_common_length(other_conditions)
+    if common in (len(path_conditions), len(other_conditions)):
+        return None
+    condition = _conjunction(list(path_conditions)[common:])
+    other_condition = _conjunction(list(other_conditions)[common:])
+
+    for values, key, value, other_value in diffs:
+        values[key] = smt_util.convert_result(
+            smt.If(condition, smt_util.to_symbolic(value),
+                   smt_util.to_symbolic(other_value)))
+
+    merged_conditions = path_conditions.head(common)
+    merged_conditions.append(
+        smt_util.convert_result(smt.Or(condition, other_condition)))
+    branch_flags = params.path_conditions_and_vars['branch_flag'].head(common)
+    branch_flags.append(True)
+    params.path_conditions_and_vars = {
+        'path_condition': merged_conditions,
+        'path_condition_node': params.path_conditions_and_vars[
+            'path_condition_node'].head(common),
+        'branch_flag': branch_flags
+    }
+    add_constraint_node(first)
+
+    visited = persistent.CowDict(params.visited)
+    for edge, count in other.visited.items():
+        visited[edge] = max(count, visited.get(edge, 0))
+    params.visited = visited
+    params.gas = max(params.gas, other.gas)
+    return first
+
+
+# returns (map, key, value, other value) of the values differing, None if
+# the states are not mergeable
+def _get_diffs(params, other, max_diffs, jump_dests):
+    diffs = []
+    for i, (value, other_value) in enumerate(zip(params.stack, other.stack)):
+        if not smt_util.is_same(value, other_value):
+            if _is_jump_dest(value, jump_dests) or _is_jump_dest(
+                    other_value, jump_dests):
+                return None
+            diffs.append((params.stack, i, value, other_value))
+
+    global_state, other_state = params.global_state, other.global_state
+    if global_state.keys() != other_state.keys():
+        return None
+    for key, value in global_state.items():
+        if key == 'pc':
+            continue
+        if key not in ('storage', 'balance'):
+            if not smt_util.is_same(value, other_state[key]):
+                return None
+            continue
+        other_values = other_state[key]
+        if len(value) != len(other_values):
+            return None
+        for address, item in value.items():
+            if address not in other_values:
+                return None
+            if not smt_util.is_same(item, other_values[address]):
+                diffs.append((value, address, item, other_values[address]))
+
+    if len(diffs) > max_diffs:
+        return None
+    return diffs
+
+
+def _is_jump_dest(value, jump_dests):
+    return isinstance(value, int) and value in jump_dests
+
+
+def _conjunction(conditions):
+    conditions = [
+        expr if smt.is_expr(expr) else smt.BoolVal(bool(expr))
+        for expr in conditions
+    ]
+    if len(conditions) == 1:
+        return conditions[0]
+    return smt.And(*conditions)
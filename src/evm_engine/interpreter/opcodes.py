@@ -171,7 +171,7 @@ DIFFICULTY = OpCode('DIFFICULTY', 0x44, 0, 1)
 GASLIMIT = OpCode('GASLIMIT', 0x45, 0, 1)
 CHAINID = OpCode('CHAINID', 0x46, 0, 1)
 SELFBALANCE = OpCode('SELFBALANCE', 0x47, 0, 1)
-BASEFEE = OpCode('BASEFEE', 0x48, 1, 1)
+BASEFEE = OpCode('BASEFEE', 0x48, 0, 1)
 
 # Stack, Memory, Storage, Flow
 POP = OpCode('POP', 0x50, 1, 0)
@@ -337,3 +337,49 @@ def missing_opcode(val):
     if val in BYTECODES:
         raise ValueError(f'Opcode "0x{val:02X}" exists.')
     return OpCode('MISSING', val, 0, 0)
+
+
+class Instruction:
+    """An EVM instruction decoded once from the disassembly of a contract."""
+
+    def __init__(self, pc, name, operand=None):
+        """
+        Args:
+          pc (int): Byte offset of the instruction in the runtime bytecode.
+          name (str): Opcode name as printed by the disassembler.
+          operand (int): Immediate of a PUSH instruction, None otherwise.
+        """
+        self.pc = pc
+        self.name = name
+        self.operand = operand
+        try:
+            opcode = opcode_by_name(name)
+            self.code = opcode.code
+            self.pop = opcode.pop
+            self.push = opcode.push
+            self.size = 1 + opcode.push_len()
+        except LookupError:
+            # unknown opcodes are kept so that executing them fails loudly
+            self.code = None
+            self.pop = 0
+            self.push = 0
+            self.size = 1
+
+    def __str__(self):
+        if self.operand is None:
+            return f'{self.pc} {self.name}'
+        return f'{self.pc} {self.name} {hex(self.operand)}'
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} object '
+                f'{hex(id(self))}, {self.__str__()}>')
+
+
+def decode_instruction(text):
+    """
+    Decodes one line of the disassembly, e.g. '12 PUSH1 0x80', into an
+    Instruction.
+    """
+    parts = text.split(' ')
+    operand = int(parts[2], 16) if len(parts) > 2 else None
+    return Instruction(int(parts[0]), parts[1], operand)
@@ -0,0 +1,214 @@
+"""Containers of the path state which are cheap to fork.
+
+Forking a path at a conditional jump copies its Parameter. With these
+containers the copy is O(1): a CowDict shares its items with its copies until
+one of them is written, and a LinkedList shares its common prefix with its
+copies, e.g. the path conditions before the fork.
+"""
+import collections.abc
+import sys
+
+# hashes of containers are sums of the hashes of their items in 64 bits, so
+# they are updated in O(1) by a write
+HASH_MASK = 2**64 - 1
+
+
+class Persistent:
+    """A container of the path state which is shared by copy()."""
+
+    __slots__ = ()
+
+    def copy(self):
+        raise NotImplementedError
+
+    def get_private_size(self):
+        """Return the size in bytes not shared with copies."""
+        raise NotImplementedError
+
+
+class CowDict(Persistent, collections.abc.MutableMapping):
+    """A dict which is copied on its first write after copy()."""
+
+    __slots__ = ('_data', '_shared')
+
+    def __init__(self, *args, **kwargs):
+        self._data = dict(*args, **kwargs)
+        # the items may be shared with other copies
+        self._shared = False
+
+    def copy(self):
+        new = CowDict.__new__(CowDict)
+        new._data = self._data
+        new._shared = True
+        self._shared = True
+        return new
+
+    def _write(self):
+        if self._shared:
+            self._data = dict(self._data)
+            self._shared = False
+        return self._data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._write()[key] = value
+
+    def __delitem__(self, key):
+        del self._write()[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f'CowDict({self._data!r})'
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def keys(self):
+        return self._data.keys()
+
+    def items(self):
+        return self._data.items()
+
+    def values(self):
+        return self._data.values()
+
+    def pop(self, key, *default):
+        return self._write().pop(key, *default)
+
+    def update(self, *args, **kwargs):
+        self._write().update(*args, **kwargs)
+
+    def get_private_size(self):
+        """Return the size in bytes not shared with other copies."""
+        if self._shared:
+            return 0
+        return sys.getsizeof(self._data)
+
+
+class LinkedList(Persistent):
+    """An append only list which shares its prefix with its copies.
+
+    Items are stored in nodes (item, previous node) from the last one, so
+    append and copy are O(1) and the item k-th from the end is read in O(k).
+    """
+
+    __slots__ = ('_last', '_len', '_own', '_hash')
+
+    def __init__(self, items=()):
+        self._last = None
+        self._len = 0
+        # number of nodes appended since the last copy
+        self._own = 0
+        # sum of the hashes of items, updated by append
+        self._hash = 0
+        for item in items:
+            self.append(item)
+
+    def copy(self):
+        new = LinkedList()
+        new._last = self._last
+        new._len = self._len
+        new._hash = self._hash
+        self._own = 0
+        return new
+
+    def append(self, item):
+        self._last = (item, self._last)
+        self._len += 1
+        self._own += 1
+        self._hash = (self._hash + hash(item)) & HASH_MASK
+
+    def get_hash(self):
+        """Return a hash of the items regardless of their order."""
+        return self._hash
+
+    def __len__(self):
+        return self._len
+
+    def head(self, length):
+        """Return a list of the first length items, sharing their nodes."""
+        node = self._last
+        new_hash = self._hash
+        for _ in range(self._len - length):
+            new_hash -= hash(node[0])
+            node = node[1]
+        new = LinkedList()
+        new._last = node
+        new._len = length
+        new._hash = new_hash & HASH_MASK
+        return new
+
+    def get_common_length(self, other):
+        """Return the length of the prefix whose nodes are shared with other.
+
+        Lists forked from one list share the nodes before the fork, so this
+        is O(n) without comparing the items.
+        """
+        first, second = self._last, other._last
+        length = min(self._len, other._len)
+        for _ in range(self._len - length):
+            first = first[1]
+        for _ in range(other._len - length):
+            second = second[1]
+        while first is not second:
+            first, second = first[1], second[1]
+            length -= 1
+        return length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('LinkedList index out of range')
+        node = self._last
+        for _ in range(self._len - 1 - index):
+            node = node[1]
+        return node[0]
+
+    def __iter__(self):
+        items = []
+        node = self._last
+        while node is not None:
+            items.append(node[0])
+            node = node[1]
+        return reversed(items)
+
+    def __repr__(self):
+        return f'LinkedList({list(self)!r})'
+
+    def get_private_size(self):
+        """Return the size in bytes of nodes appended since the last copy."""
+        return self._own * sys.getsizeof((None, None))
+
+
+def fork(value):
+    """Copy value for a forked path, sharing what the containers allow."""
+    if isinstance(value, Persistent):
+        return value.copy()
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return {key: fork(item) for key, item in value.items()}
+    return value
+
+
+def get_private_size(value):
+    """Return the size in bytes of value not shared with forked paths."""
+    if isinstance(value, Persistent):
+        return value.get_private_size()
+    if isinstance(value, list):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            get_private_size(item) for item in value.values())
+    return 0
@@ -0,0 +1,148 @@
+"""Expression builders of the configured symbolic backend.
+
+The interpreter and XGraph build symbolic expressions through this module
+instead of calling z3 directly. With the default 'z3' backend every function
+is the z3 one, with the 'term' backend expressions are the lightweight
+hash-consed terms of symbolic_term, and to_z3 translates them for a solver.
+"""
+import z3
+from z3 import z3util
+
+from evm_engine.interpreter import symbolic_term
+from utils import global_params
+
+BACKENDS = ('z3', 'term')
+
+
+class _Z3Backend:
+    BitVec = staticmethod(z3.BitVec)
+    BitVecVal = staticmethod(z3.BitVecVal)
+    BoolVal = staticmethod(z3.BoolVal)
+    If = staticmethod(z3.If)
+    ULT = staticmethod(z3.ULT)
+    ULE = staticmethod(z3.ULE)
+    UGT = staticmethod(z3.UGT)
+    UGE = staticmethod(z3.UGE)
+    UDiv = staticmethod(z3.UDiv)
+    URem = staticmethod(z3.URem)
+    SRem = staticmethod(z3.SRem)
+    LShR = staticmethod(z3.LShR)
+    Extract = staticmethod(z3.Extract)
+    Concat = staticmethod(z3.Concat)
+    And = staticmethod(z3.And)
+    Or = staticmethod(z3.Or)
+    Not = staticmethod(z3.Not)
+    simplify = staticmethod(z3.simplify)
+    is_expr = staticmethod(z3.is_expr)
+    is_const = staticmethod(z3.is_const)
+    get_vars = staticmethod(z3util.get_vars)
+
+    @staticmethod
+    def to_z3(expr):
+        return expr
+
+
+_impl = _Z3Backend
+
+
+def set_backend(name):
+    global _impl  # pylint: disable=global-statement
+    if name not in BACKENDS:
+        raise ValueError(f'unknown symbolic backend: {name}')
+    global_params.SYMBOLIC_BACKEND = name
+    _impl = symbolic_term if name == 'term' else _Z3Backend
+
+
+def get_backend():
+    return 'term' if _impl is symbolic_term else 'z3'
+
+
+# pylint: disable=invalid-name
+def BitVec(name, bits):
+    return _impl.BitVec(name, bits)
+
+
+def BitVecVal(value, bits):
+    return _impl.BitVecVal(value, bits)
+
+
+def BoolVal(value):
+    return _impl.BoolVal(value)
+
+
+def If(cond, then_value, else_value):
+    return _impl.If(cond, then_value, else_value)
+
+
+def ULT(first, second):
+    return _impl.ULT(first, second)
+
+
+def ULE(first, second):
+    return _impl.ULE(first, second)
+
+
+def UGT(first, second):
+    return _impl.UGT(first, second)
+
+
+def UGE(first, second):
+    return _impl.UGE(first, second)
+
+
+def UDiv(first, second):
+    return _impl.UDiv(first, second)
+
+
+def URem(first, second):
+    return _impl.URem(first, second)
+
+
+def SRem(first, second):
+    return _impl.SRem(first, second)
+
+
+def LShR(first, second):
+    return _impl.LShR(first, second)
+
+
+def Extract(high, low, expr):
+    return _impl.Extract(high, low, expr)
+
+
+def Concat(*args):
+    return _impl.Concat(*args)
+
+
+def And(*args):
+    return _impl.And(*args)
+
+
+def Or(*args):
+    return _impl.Or(*args)
+
+
+def Not(expr):
+    return _impl.Not(expr)
+# pylint: enable=invalid-name
+
+
+def simplify(expr):
+    return _impl.simplify(expr)
+
+
+def is_expr(value):
+    return _impl.is_expr(value)
+
+
+def is_const(value):
+    return _impl.is_const(value)
+
+
+def get_vars(expr):
+    return _impl.get_vars(expr)
+
+
+def to_z3(expr):
+    """Return expr as a z3 expression, e.g. to add it to a z3 solver."""
+    return _impl.to_z3(expr)
@@ -0,0 +1,98 @@
+"""Helpers over expressions of the configured symbolic backend, see smt."""
+from evm_engine.interpreter import smt
+from utils import global_params
+from utils import util
+
+
+def configure():
+    """Apply the symbolic backend and cache size of global_params."""
+    if smt.get_backend() != global_params.SYMBOLIC_BACKEND:
+        smt.set_backend(global_params.SYMBOLIC_BACKEND)
+        SIMPLIFY_CACHE.clear()
+    SIMPLIFY_CACHE.resize(global_params.SIMPLIFY_CACHE_SIZE)
+
+
+def to_symbolic(number, bits=256):
+    if not smt.is_expr(number):
+        return smt.BitVecVal(number, bits)
+    return number
+
+
+def to_real(value):
+    try:
+        return int(str(smt.simplify(value)))
+    except:  # pylint: disable=bare-except
+        return None
+
+
+def is_all_real(*args):
+    for element in args:
+        if smt.is_expr(element):
+            return False
+    return True
+
+
+# returns if two values are the same int or the same expression, the
+# expressions are compared by identity instead of the solver
+def is_same(first, second):
+    if smt.is_expr(first) or smt.is_expr(second):
+        return (smt.is_expr(first) and smt.is_expr(second) and
+                first.get_id() == second.get_id())
+    return first == second
+
+
+# process-wide cache of simplified z3 expressions, keyed by the id of the
+# z3 AST; the original expression is kept in the entry so that its id can
+# not be reused by another AST while the entry is alive
+SIMPLIFY_CACHE = util.LruCache(global_params.SIMPLIFY_CACHE_SIZE)
+
+
+def _simplify(value):
+    key = value.get_id()
+    entry = SIMPLIFY_CACHE.get(key)
+    if entry is not None:
+        return entry[1]
+    result = smt.simplify(value)
+    try:
+        if smt.is_const(result):
+            result = int(str(result))
+    except:  # pylint: disable=bare-except
+        pass
+    SIMPLIFY_CACHE.put(key, (value, result))
+    return result
+
+
+# simplify a z3 expression if possible, and convert to int if possible
+# todo: this is time-consuming, be careful to use this
+def convert_result(value):
+    if smt.is_expr(value):
+        return _simplify(value)
+    return value
+
+
+# convert_result for intermediate values, e.g. results of arithmetic
+# operations, which are only simplified where they are observed when
+# global_params.LAZY_SIMPLIFY is set
+def convert_intermediate(value):
+    if global_params.LAZY_SIMPLIFY:
+        return value
+    return convert_result(value)
+
+
+# convert_result for values where they are observed, e.g. storage keys,
+# memory addresses and values added to XGraph, which are already simplified
+# unless global_params.LAZY_SIMPLIFY is set
+def convert_observed(value):
+    if global_params.LAZY_SIMPLIFY:
+        return convert_result(value)
+    return value
+
+
+# convert result to int, if not success, return BIG_INT_256
+def convert_result_to_int(value):
+    if not smt.is_expr(value):
+        return value
+    value = _simplify(value)
+    if isinstance(value, int):
+        return value
+    return global_params.BIG_INT_256
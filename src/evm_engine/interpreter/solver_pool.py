@@ -0,0 +1,122 @@
+"""A pool of z3 worker processes answering feasibility queries.
+
+Queries are sent to the workers as SMT-LIB2 text when a branch is taken, so
+the solver works while the interpreter explores other states, and the state
+of the branch waits for the answer only when it is executed, or is dropped
+if the query comes back unsat. Workers are spawned rather than forked, since
+z3 contexts are not safe to share with a fork.
+"""
+import atexit
+import collections
+import concurrent.futures
+import multiprocessing
+import time
+
+import z3
+
+from evm_engine.interpreter import evm_params
+
+_POOL = None
+
+
+def _solve(text, timeout):
+    # runs in a worker process
+    start_time = time.time()
+    solver = z3.Solver()
+    solver.set('timeout', timeout)
+    solver.from_string(text)
+    result = str(solver.check())
+    return result, time.time() - start_time
+
+
+class Query:
+    """A feasibility query being answered by a worker."""
+
+    def __init__(self, future, key, conditions):
+        self.future = future
+        self.key = key
+        self.conditions = conditions
+        self.start_time = time.time()
+        # 'sat', 'unsat' or 'unknown' once answered
+        self.result = None
+        # time the worker spent on the query
+        self.solver_time = 0
+
+    def poll(self):
+        """Return the result of the query, None if not answered yet."""
+        if self.result is not None:
+            return self.result
+        if self.future.done():
+            try:
+                self.result, self.solver_time = self.future.result()
+            except Exception:  # pylint: disable=broad-except
+                self.result = 'unknown'
+        elif (time.time() - self.start_time) * 1000 > 2 * evm_params.Z3_TIMEOUT:
+            # the worker is stuck or the pool is overloaded, give up
+            self.future.cancel()
+            self.result = 'unknown'
+        return self.result
+
+    def wait(self):
+        """Return the result of the query once answered or given up."""
+        while self.poll() is None:
+            left = 2 * evm_params.Z3_TIMEOUT / 1000 - (time.time() -
+                                                       self.start_time)
+            concurrent.futures.wait([self.future], timeout=max(left, 0))
+        return self.result
+
+
+class SolverPool:
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self.outstanding = collections.deque()
+        # time the interpreter is blocked for too many outstanding queries
+        self.blocked_time = 0
+
+    def submit(self, key, conditions, z3_conditions):
+        while self.outstanding and self.outstanding[0].done():
+            self.outstanding.popleft()
+        if len(self.outstanding) >= self.max_pending:
+            start_time = time.time()
+            concurrent.futures.wait([self.outstanding.popleft()],
+                                    timeout=evm_params.Z3_TIMEOUT / 1000)
+            self.blocked_time += time.time() - start_time
+
+        solver = z3.Solver()
+        solver.add(*z3_conditions)
+        future = self.executor.submit(_solve, solver.sexpr(),
+                                      evm_params.Z3_TIMEOUT)
+        self.outstanding.append(future)
+        return Query(future, key, conditions)
+
+    def cancel(self):
+        """Cancel the outstanding queries, e.g. when exploration ends."""
+        for future in self.outstanding:
+            future.cancel()
+        self.outstanding.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_pool(workers, max_pending):
+    """Return the shared pool, which is reused by all interpreters."""
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is not None and _POOL.workers != workers:
+        _POOL.shutdown()
+        _POOL = None
+    if _POOL is None:
+        _POOL = SolverPool(workers, max_pending)
+    _POOL.max_pending = max_pending
+    return _POOL
+
+
+@atexit.register
+def _shutdown_pool():
+    if _POOL is not None:
+        _POOL.shutdown()
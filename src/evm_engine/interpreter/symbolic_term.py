@@ -0,0 +1,718 @@
+"""Hash-consed symbolic terms over fixed-width bit-vectors.
+
+The module mirrors the subset of the z3 python API used by the interpreter,
+e.g. BitVec, If, ULT, Extract and the python operators of BitVecRef, with the
+same semantics. Structurally equal terms are the same object, constants are
+folded and a few peephole rewrites are applied when a term is built, and a
+term is only translated to z3 by to_z3 when a solver query needs it.
+"""
+import itertools
+import weakref
+
+import z3
+
+# op names, bit-vector terms have width > 0 and boolean terms width 0
+_CONST = 'const'
+_VAR = 'var'
+_TRUE = 'true'
+_FALSE = 'false'
+
+_COMMUTATIVE = frozenset(('add', 'mul', 'and', 'or', 'xor', 'eq'))
+
+_INFIX = {
+    'add': '+',
+    'sub': '-',
+    'mul': '*',
+    'sdiv': '/',
+    'smod': '%',
+    'and': '&',
+    'or': '|',
+    'xor': '^',
+    'shl': '<<',
+    'ashr': '>>',
+    'eq': '==',
+    'slt': '<',
+    'sle': '<=',
+}
+
+_PREFIX = {
+    'udiv': 'UDiv',
+    'urem': 'URem',
+    'srem': 'SRem',
+    'lshr': 'LShR',
+    'ult': 'ULT',
+    'ule': 'ULE',
+    'ite': 'If',
+    'concat': 'Concat',
+    'not': 'Not',
+    'band': 'And',
+    'bor': 'Or',
+}
+
+# sub-terms with longer str() are printed as '...', like the z3 printer does
+# for deep expressions, which keeps str() linear in the size of the DAG
+MAX_STR_LENGTH = 1024
+
+# (op, width, params, child uids...) -> Term
+_TABLE = weakref.WeakValueDictionary()
+_UIDS = itertools.count(1)
+
+
+class Term:
+    """A node of the term DAG, build it by the module functions."""
+
+    __slots__ = ('op', 'width', 'params', 'args', 'uid', '_str', '_z3',
+                 '__weakref__')
+
+    def __init__(self, op, width, params, args):
+        self.op = op
+        self.width = width
+        # name of a variable, value of a constant, (high, low) of extract
+        self.params = params
+        self.args = args
+        self.uid = next(_UIDS)
+        self._str = None
+        self._z3 = None
+
+    def size(self):
+        return self.width
+
+    def get_id(self):
+        return self.uid
+
+    def is_bool(self):
+        return self.width == 0
+
+    def __hash__(self):
+        return self.uid
+
+    def __str__(self):
+        if self._str is None:
+            for term in _postorder(self):
+                if term._str is None:
+                    term._str = _format(term)
+        return self._str
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __bool__(self):
+        if self.op == _TRUE:
+            return True
+        if self.op == _FALSE:
+            return False
+        if self.op == 'eq':
+            return self.args[0] is self.args[1]
+        if self.op == 'not' and self.args[0].op == 'eq':
+            return self.args[0].args[0] is not self.args[0].args[1]
+        raise z3.Z3Exception(
+            'Symbolic expressions cannot be cast to concrete Boolean values.')
+
+    def __eq__(self, other):
+        return _eq(self, other)
+
+    def __ne__(self, other):
+        return Not(_eq(self, other))
+
+    def __add__(self, other):
+        return _add(self, other)
+
+    def __radd__(self, other):
+        return _add(other, self)
+
+    def __sub__(self, other):
+        return _sub(self, other)
+
+    def __rsub__(self, other):
+        return _sub(other, self)
+
+    def __mul__(self, other):
+        return _mul(self, other)
+
+    def __rmul__(self, other):
+        return _mul(other, self)
+
+    def __truediv__(self, other):
+        return _binary('sdiv', self, other)
+
+    def __rtruediv__(self, other):
+        return _binary('sdiv', other, self)
+
+    def __mod__(self, other):
+        return _binary('smod', self, other)
+
+    def __rmod__(self, other):
+        return _binary('smod', other, self)
+
+    def __and__(self, other):
+        return _and(self, other)
+
+    def __rand__(self, other):
+        return _and(other, self)
+
+    def __or__(self, other):
+        return _or(self, other)
+
+    def __ror__(self, other):
+        return _or(other, self)
+
+    def __xor__(self, other):
+        return _xor(self, other)
+
+    def __rxor__(self, other):
+        return _xor(other, self)
+
+    def __invert__(self):
+        if self.op == _CONST:
+            return _const(~self.params, self.width)
+        if self.op == 'bvnot':
+            return self.args[0]
+        return _mk('bvnot', self.width, None, (self,))
+
+    def __neg__(self):
+        return _sub(0, self)
+
+    def __lshift__(self, other):
+        return _shift('shl', self, other)
+
+    def __rlshift__(self, other):
+        return _shift('shl', other, self)
+
+    def __rshift__(self, other):
+        return _shift('ashr', self, other)
+
+    def __rrshift__(self, other):
+        return _shift('ashr', other, self)
+
+    def __lt__(self, other):
+        return _compare('slt', self, other)
+
+    def __le__(self, other):
+        return _compare('sle', self, other)
+
+    def __gt__(self, other):
+        return _compare('slt', other, self)
+
+    def __ge__(self, other):
+        return _compare('sle', other, self)
+
+
+def _mk(op, width, params, args):
+    key = (op, width, params) + tuple(arg.uid for arg in args)
+    term = _TABLE.get(key)
+    if term is None:
+        term = Term(op, width, params, args)
+        _TABLE[key] = term
+    return term
+
+
+def _const(value, width):
+    return _mk(_CONST, width, value & ((1 << width) - 1), ())
+
+
+def _is_value(term, value):
+    return term.op == _CONST and term.params == value
+
+
+def _mask(width):
+    return (1 << width) - 1
+
+
+def _signed(value, width):
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+def _coerce(first, second):
+    """Return both operands as terms of the same width."""
+    if isinstance(first, Term):
+        if isinstance(second, Term):
+            if first.width != second.width:
+                raise z3.Z3Exception('sort mismatch')
+            return first, second
+        return first, _const(second, first.width)
+    if isinstance(second, Term):
+        return _const(first, second.width), second
+    raise z3.Z3Exception('at least one of the arguments must be a term')
+
+
+def _to_bool(value):
+    if isinstance(value, Term):
+        return value
+    return BoolVal(value)
+
+
+def _order(op, first, second):
+    """Put constants first and order commutative operands by uid."""
+    if op in _COMMUTATIVE and (second.op == _CONST or
+                               (first.op != _CONST and
+                                second.uid < first.uid)):
+        return second, first
+    return first, second
+
+
+#
+#  Folding of constants, following the semantics of SMT-LIB bit-vectors
+#
+def _fold_udiv(first, second, width):
+    return _mask(width) if second == 0 else first // second
+
+
+def _fold_urem(first, second, width):
+    return first if second == 0 else first % second
+
+
+def _fold_sdiv(first, second, width):
+    first, second = _signed(first, width), _signed(second, width)
+    if second == 0:
+        return 1 if first < 0 else _mask(width)
+    quotient = abs(first) // abs(second)
+    return -quotient if (first < 0) != (second < 0) else quotient
+
+
+def _fold_srem(first, second, width):
+    first, second = _signed(first, width), _signed(second, width)
+    if second == 0:
+        return first
+    remainder = abs(first) % abs(second)
+    return -remainder if first < 0 else remainder
+
+
+def _fold_smod(first, second, width):
+    first, second = _signed(first, width), _signed(second, width)
+    if second == 0:
+        return first
+    return first % second
+
+
+def _fold_shl(first, second, width):
+    return 0 if second >= width else first << second
+
+
+def _fold_lshr(first, second, width):
+    return 0 if second >= width else first >> second
+
+
+def _fold_ashr(first, second, width):
+    return _signed(first, width) >> min(second, width)
+
+
+_FOLD = {
+    'add': lambda a, b, w: a + b,
+    'sub': lambda a, b, w: a - b,
+    'mul': lambda a, b, w: a * b,
+    'and': lambda a, b, w: a & b,
+    'or': lambda a, b, w: a | b,
+    'xor': lambda a, b, w: a ^ b,
+    'udiv': _fold_udiv,
+    'urem': _fold_urem,
+    'sdiv': _fold_sdiv,
+    'srem': _fold_srem,
+    'smod': _fold_smod,
+    'shl': _fold_shl,
+    'lshr': _fold_lshr,
+    'ashr': _fold_ashr,
+}
+
+_COMPARE = {
+    'eq': lambda a, b, w: a == b,
+    'ult': lambda a, b, w: a < b,
+    'ule': lambda a, b, w: a <= b,
+    'slt': lambda a, b, w: _signed(a, w) < _signed(b, w),
+    'sle': lambda a, b, w: _signed(a, w) <= _signed(b, w),
+}
+
+
+#
+#  Bit-vector operations
+#
+def _binary(op, first, second):
+    first, second = _coerce(first, second)
+    width = first.width
+    if first.op == _CONST and second.op == _CONST:
+        return _const(_FOLD[op](first.params, second.params, width), width)
+    if op in ('udiv', 'sdiv') and _is_value(second, 1):
+        return first
+    if op in ('urem', 'srem', 'smod') and _is_value(second, 1):
+        return _const(0, width)
+    first, second = _order(op, first, second)
+    return _mk(op, width, None, (first, second))
+
+
+def _associative(op, first, second):
+    """Build first op second, merging constants of nested op terms."""
+    first, second = _coerce(first, second)
+    width = first.width
+    first, second = _order(op, first, second)
+    if first.op == _CONST:
+        if second.op == _CONST:
+            return _const(_FOLD[op](first.params, second.params, width),
+                          width)
+        if second.op == op and second.args[0].op == _CONST:
+            value = _FOLD[op](first.params, second.args[0].params, width)
+            first, second = _const(value, width), second.args[1]
+    return _mk(op, width, None, (first, second))
+
+
+def _add(first, second):
+    first, second = _coerce(first, second)
+    if _is_value(first, 0):
+        return second
+    if _is_value(second, 0):
+        return first
+    return _associative('add', first, second)
+
+
+def _sub(first, second):
+    first, second = _coerce(first, second)
+    if first is second:
+        return _const(0, first.width)
+    if second.op == _CONST:
+        return _add(_const(-second.params, second.width), first)
+    return _binary('sub', first, second)
+
+
+def _mul(first, second):
+    first, second = _coerce(first, second)
+    for one, other in ((first, second), (second, first)):
+        if _is_value(one, 0):
+            return one
+        if _is_value(one, 1):
+            return other
+    return _associative('mul', first, second)
+
+
+def _and(first, second):
+    first, second = _coerce(first, second)
+    if first is second:
+        return first
+    for one, other in ((first, second), (second, first)):
+        if _is_value(one, 0):
+            return one
+        if _is_value(one, _mask(one.width)):
+            return other
+    return _associative('and', first, second)
+
+
+def _or(first, second):
+    first, second = _coerce(first, second)
+    if first is second:
+        return first
+    for one, other in ((first, second), (second, first)):
+        if _is_value(one, 0):
+            return other
+        if _is_value(one, _mask(one.width)):
+            return one
+    return _associative('or', first, second)
+
+
+def _xor(first, second):
+    first, second = _coerce(first, second)
+    if first is second:
+        return _const(0, first.width)
+    for one, other in ((first, second), (second, first)):
+        if _is_value(one, 0):
+            return other
+    return _associative('xor', first, second)
+
+
+def _shift(op, first, second):
+    first, second = _coerce(first, second)
+    if _is_value(second, 0):
+        return first
+    if (op != 'ashr' and second.op == _CONST and
+            second.params >= first.width):
+        return _const(0, first.width)
+    return _binary(op, first, second)
+
+
+#
+#  Boolean operations
+#
+def _eq(first, second):
+    if isinstance(first, bool) or isinstance(second, bool):
+        first, second = _to_bool(first), _to_bool(second)
+    else:
+        first, second = _coerce(first, second)
+    if first is second:
+        return BoolVal(True)
+    if first.op == _CONST and second.op == _CONST:
+        return BoolVal(False)
+    if first.is_bool():
+        return _mk('eq', 0, None, _order('eq', first, second))
+    first, second = _order('eq', first, second)
+    # If(c, k1, k2) == k, as built by ISZERO and comparisons
+    if (first.op == _CONST and second.op == 'ite' and
+            second.args[1].op == _CONST and second.args[2].op == _CONST):
+        cond, then_value, else_value = second.args
+        if then_value is first and else_value is not first:
+            return cond
+        if else_value is first and then_value is not first:
+            return Not(cond)
+        return BoolVal(then_value is first)
+    return _mk('eq', 0, None, (first, second))
+
+
+def _compare(op, first, second):
+    first, second = _coerce(first, second)
+    width = first.width
+    if first.op == _CONST and second.op == _CONST:
+        return BoolVal(_COMPARE[op](first.params, second.params, width))
+    if first is second:
+        return BoolVal(op in ('ule', 'sle'))
+    if op == 'ult' and _is_value(second, 0):
+        return BoolVal(False)
+    if op == 'ule' and _is_value(first, 0):
+        return BoolVal(True)
+    return _mk(op, 0, None, (first, second))
+
+
+def _connective(op, args):
+    unit, zero = (_TRUE, _FALSE) if op == 'band' else (_FALSE, _TRUE)
+    terms = []
+    uids = set()
+    for arg in args:
+        arg = _to_bool(arg)
+        if arg.op == zero:
+            return arg
+        if arg.op == unit or arg.uid in uids:
+            continue
+        uids.add(arg.uid)
+        terms.append(arg)
+    if not terms:
+        return BoolVal(unit == _TRUE)
+    if len(terms) == 1:
+        return terms[0]
+    return _mk(op, 0, None, tuple(terms))
+
+
+#
+#  The z3 like API
+#
+def BitVec(name, bits):  # pylint: disable=invalid-name
+    return _mk(_VAR, bits, name, ())
+
+
+def BitVecVal(value, bits):  # pylint: disable=invalid-name
+    return _const(value, bits)
+
+
+def BoolVal(value):  # pylint: disable=invalid-name
+    return _mk(_TRUE if value else _FALSE, 0, None, ())
+
+
+def If(cond, then_value, else_value):  # pylint: disable=invalid-name
+    cond = _to_bool(cond)
+    then_value, else_value = _coerce(then_value, else_value)
+    if cond.op == _TRUE or then_value is else_value:
+        return then_value
+    if cond.op == _FALSE:
+        return else_value
+    if cond.op == 'not':
+        cond, then_value, else_value = cond.args[0], else_value, then_value
+    return _mk('ite', then_value.width, None, (cond, then_value, else_value))
+
+
+def ULT(first, second):  # pylint: disable=invalid-name
+    return _compare('ult', first, second)
+
+
+def ULE(first, second):  # pylint: disable=invalid-name
+    return _compare('ule', first, second)
+
+
+def UGT(first, second):  # pylint: disable=invalid-name
+    return _compare('ult', second, first)
+
+
+def UGE(first, second):  # pylint: disable=invalid-name
+    return _compare('ule', second, first)
+
+
+def UDiv(first, second):  # pylint: disable=invalid-name
+    return _binary('udiv', first, second)
+
+
+def URem(first, second):  # pylint: disable=invalid-name
+    return _binary('urem', first, second)
+
+
+def SRem(first, second):  # pylint: disable=invalid-name
+    return _binary('srem', first, second)
+
+
+def LShR(first, second):  # pylint: disable=invalid-name
+    return _shift('lshr', first, second)
+
+
+def Extract(high, low, term):  # pylint: disable=invalid-name
+    if not 0 <= low <= high < term.width:
+        raise z3.Z3Exception('invalid extract')
+    width = high - low + 1
+    if low == 0 and width == term.width:
+        return term
+    if term.op == _CONST:
+        return _const(term.params >> low, width)
+    if term.op == 'extract':
+        return Extract(high + term.params[1], low + term.params[1],
+                       term.args[0])
+    if term.op == 'concat':
+        offset = term.width
+        for part in term.args:
+            offset -= part.width
+            if offset <= low and high < offset + part.width:
+                return Extract(high - offset, low - offset, part)
+    return _mk('extract', width, (high, low), (term,))
+
+
+def Concat(*args):  # pylint: disable=invalid-name
+    if len(args) == 1 and isinstance(args[0], (list, tuple)):
+        args = args[0]
+    parts = []
+    for arg in args:
+        if not isinstance(arg, Term):
+            raise z3.Z3Exception('Concat needs bit-vector terms')
+        if parts and parts[-1].op == _CONST and arg.op == _CONST:
+            last = parts.pop()
+            arg = _const((last.params << arg.width) | arg.params,
+                         last.width + arg.width)
+        parts.append(arg)
+    if len(parts) == 1:
+        return parts[0]
+    return _mk('concat', sum(part.width for part in parts), None,
+               tuple(parts))
+
+
+def And(*args):  # pylint: disable=invalid-name
+    return _connective('band', args)
+
+
+def Or(*args):  # pylint: disable=invalid-name
+    return _connective('bor', args)
+
+
+def Not(term):  # pylint: disable=invalid-name
+    term = _to_bool(term)
+    if term.op == _TRUE:
+        return BoolVal(False)
+    if term.op == _FALSE:
+        return BoolVal(True)
+    if term.op == 'not':
+        return term.args[0]
+    return _mk('not', 0, None, (term,))
+
+
+def simplify(term):
+    # terms are simplified when they are built
+    return term
+
+
+def is_expr(value):
+    return isinstance(value, Term)
+
+
+def is_const(value):
+    return isinstance(value, Term) and not value.args
+
+
+def get_vars(term):
+    return [t for t in _postorder(term) if t.op == _VAR]
+
+
+def to_z3(term):
+    """Translate a term, and all its sub-terms, to z3 expressions."""
+    if not isinstance(term, Term):
+        return term
+    if term._z3 is None:
+        for sub in _postorder(term):
+            if sub._z3 is None:
+                sub._z3 = _translate(sub)
+    return term._z3
+
+
+def _postorder(term):
+    """Yield the distinct sub-terms of term, children first."""
+    seen = set()
+    stack = [(term, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+        elif node.uid not in seen:
+            seen.add(node.uid)
+            stack.append((node, True))
+            for arg in reversed(node.args):
+                if arg.uid not in seen:
+                    stack.append((arg, False))
+
+
+def _format(term):
+    op = term.op
+    if op == _VAR:
+        return term.params
+    if op == _CONST:
+        return str(term.params)
+    if op in (_TRUE, _FALSE):
+        return 'True' if op == _TRUE else 'False'
+    if op in _INFIX:
+        return f' {_INFIX[op]} '.join(_format_operand(arg)
+                                         for arg in term.args)
+    if op == 'bvnot':
+        return f'~{_format_operand(term.args[0])}'
+    args = ', '.join(_format_arg(arg) for arg in term.args)
+    if op == 'extract':
+        return f'Extract({term.params[0]}, {term.params[1]}, {args})'
+    return f'{_PREFIX[op]}({args})'
+
+
+def _format_arg(term):
+    text = term._str  # pylint: disable=protected-access
+    return '...' if len(text) > MAX_STR_LENGTH else text
+
+
+def _format_operand(term):
+    if term.op in _INFIX:
+        return f'({_format_arg(term)})'
+    return _format_arg(term)
+
+
+def _translate(term):
+    op = term.op
+    args = [arg._z3 for arg in term.args]
+    if op == _VAR:
+        return z3.BitVec(term.params, term.width)
+    if op == _CONST:
+        return z3.BitVecVal(term.params, term.width)
+    if op in (_TRUE, _FALSE):
+        return z3.BoolVal(op == _TRUE)
+    if op == 'extract':
+        return z3.Extract(term.params[0], term.params[1], args[0])
+    return _Z3_OPS[op](*args)
+
+
+_Z3_OPS = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'sdiv': lambda a, b: a / b,
+    'smod': lambda a, b: a % b,
+    'and': lambda a, b: a & b,
+    'or': lambda a, b: a | b,
+    'xor': lambda a, b: a ^ b,
+    'shl': lambda a, b: a << b,
+    'ashr': lambda a, b: a >> b,
+    'bvnot': lambda a: ~a,
+    'eq': lambda a, b: a == b,
+    'slt': lambda a, b: a < b,
+    'sle': lambda a, b: a <= b,
+    'udiv': z3.UDiv,
+    'urem': z3.URem,
+    'srem': z3.SRem,
+    'lshr': z3.LShR,
+    'ult': z3.ULT,
+    'ule': z3.ULE,
+    'ite': z3.If,
+    'concat': z3.Concat,
+    'not': z3.Not,
+    'band': z3.And,
+    'bor': z3.Or,
+}
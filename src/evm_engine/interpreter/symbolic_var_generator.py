@@ -2,8 +2,10 @@ class Generator:
 
     def __init__(self):
         self.path = 0
+        self.loop = 0
 
-    # todo: str() of symbolic expression is time-consuming
+    # todo: str() of z3 expressions is time-consuming, terms of the term
+    #  backend cache their str()
 
     @staticmethod
     def gen_contract_address(pc):
@@ -34,8 +36,8 @@ class Generator:
         return f'codeHash_{address}'
 
     @staticmethod
-    def gen_return_data(pc, start, end, path_id):
-        return f'return_{pc}_{start}_{end}_{path_id}'
+    def gen_return_data(pc, start, end):
+        return f'return_{pc}_{start}_{end}'
 
     @staticmethod
     def gen_data_var(start, end, function):
@@ -108,6 +110,14 @@ class Generator:
     def gen_mem_var(pc):
         return f'mem_{pc}'
 
+    def gen_loop_id(self):
+        self.loop += 1
+        return str(self.loop)
+
+    @staticmethod
+    def gen_loop_var(block, loop_id, slot):
+        return f'loop_{block}_{loop_id}_{slot}'
+
     @staticmethod
     def gen_gas_var(pc):
         return f'gas_{pc}'
@@ -0,0 +1,58 @@
+import unittest
+
+from evm_engine.interpreter import concrete
+
+MAX = 2**256 - 1
+MINUS_ONE = MAX
+MINUS_TWO = MAX - 1
+MIN_SIGNED = 2**255
+
+
+class TestConcrete(unittest.TestCase):
+    def test_wrap_around(self):
+        self.assertEqual(concrete.add(MAX, 2), 1)
+        self.assertEqual(concrete.sub(0, 1), MAX)
+        self.assertEqual(concrete.mul(2**255, 2), 0)
+        self.assertEqual(concrete.exp(2, 256), 0)
+        self.assertEqual(concrete.not_(0), MAX)
+
+    def test_division_by_zero(self):
+        for op in (concrete.div, concrete.sdiv, concrete.mod, concrete.smod):
+            self.assertEqual(op(10, 0), 0)
+        self.assertEqual(concrete.addmod(1, 2, 0), 0)
+        self.assertEqual(concrete.mulmod(1, 2, 0), 0)
+
+    def test_signed(self):
+        self.assertEqual(concrete.sdiv(MINUS_TWO, 2), MINUS_ONE)
+        self.assertEqual(concrete.sdiv(7, MINUS_TWO), concrete.sub(0, 3))
+        self.assertEqual(concrete.sdiv(MIN_SIGNED, MINUS_ONE), MIN_SIGNED)
+        self.assertEqual(concrete.smod(concrete.sub(0, 7), 3), MINUS_ONE)
+        self.assertEqual(concrete.smod(7, concrete.sub(0, 3)), 1)
+        self.assertEqual(concrete.slt(MINUS_ONE, 0), 1)
+        self.assertEqual(concrete.sgt(MINUS_ONE, 0), 0)
+        self.assertEqual(concrete.lt(MINUS_ONE, 0), 0)
+        self.assertEqual(concrete.signextend(0, 0xff), MAX)
+        self.assertEqual(concrete.signextend(0, 0x17f), 0x7f)
+        self.assertEqual(concrete.signextend(31, 0xff), 0xff)
+
+    def test_modular(self):
+        self.assertEqual(concrete.addmod(MAX, 2, 7), (MAX + 2) % 7)
+        self.assertEqual(concrete.mulmod(MAX, MAX, 12), (MAX * MAX) % 12)
+
+    def test_byte_and_shifts(self):
+        self.assertEqual(concrete.byte(31, 0x1234), 0x34)
+        self.assertEqual(concrete.byte(30, 0x1234), 0x12)
+        self.assertEqual(concrete.byte(32, 0x1234), 0)
+        self.assertEqual(concrete.shl(4, MAX), MAX - 0xf)
+        self.assertEqual(concrete.shl(256, 1), 0)
+        self.assertEqual(concrete.shr(4, 0x100), 0x10)
+        self.assertEqual(concrete.shr(256, MAX), 0)
+        self.assertEqual(concrete.sar(4, MINUS_ONE), MINUS_ONE)
+        self.assertEqual(concrete.sar(1, MINUS_TWO), MINUS_ONE)
+        self.assertEqual(concrete.sar(300, MIN_SIGNED), MAX)
+        self.assertEqual(concrete.sar(300, 1), 0)
+        self.assertEqual(concrete.sar(1, 4), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
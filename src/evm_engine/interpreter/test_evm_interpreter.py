@@ -0,0 +1,190 @@
+import logging
+import time
+import unittest
+
+from evm_engine.interpreter import evm_interpreter
+from evm_engine.interpreter import explorer
+from evm_engine.interpreter import opcodes
+from evm_engine.interpreter import persistent
+from evm_engine.interpreter import solver_pool
+from evm_engine.interpreter import world_state
+from evm_engine.runtime import evm_runtime
+from utils import context as ctx
+from utils import global_params, log
+
+
+def new_interpreter(opcodes_str):
+    context = ctx.Context(time.time(), '', '', [], '')
+    runtime = evm_runtime.EvmRuntime(
+        context,
+        opcodes=opcodes_str,
+        input_type=global_params.LanguageType.SOLIDITY,
+        binary='')
+    runtime.build_cfg()
+    return evm_interpreter.EVMInterpreter(runtime, 'Test', context)
+
+
+def new_state(storage):
+    params = evm_interpreter.Parameter(
+        global_state={
+            'pc': 0,
+            'storage': world_state.StateMap(storage),
+            'balance': world_state.StateMap()
+        },
+        path_conditions_and_vars={'path_condition': persistent.LinkedList()})
+    return explorer.State(params, 0, 0, [], None)
+
+
+class TestEvmInterpreter(unittest.TestCase):
+
+    def setUp(self):
+        if log.mylogger is None:
+            log.mylogger = logging.getLogger(__name__)
+
+    def test_blockhash_pushes_one_word(self):
+        interpreter = new_interpreter('NUMBER BLOCKHASH POP STOP')
+        params = evm_interpreter.Parameter(stack=[5], global_state={'pc': 0})
+        interpreter._sym_exec_ins(  # pylint: disable=protected-access
+            params, 0, opcodes.decode_instruction('1 BLOCKHASH'))
+        self.assertEqual(len(params.stack), 1)
+
+        interpreter = new_interpreter('NUMBER BLOCKHASH POP STOP')
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertEqual(interpreter.total_no_of_paths['normal'], 1)
+        self.assertEqual(len(interpreter.total_visited_pc), 4)
+
+    def test_merge_at_post_dominator(self):
+        # 21: function a9059cbb storing 1 or 2 by the branch at 27
+        interpreter = new_interpreter(
+            'PUSH1 0x00 CALLDATALOAD PUSH1 0xe0 SHR DUP1 PUSH4 0xa9059cbb EQ '
+            'PUSH2 0x15 JUMPI PUSH1 0x00 DUP1 REVERT JUMPDEST PUSH1 0x04 '
+            'CALLDATALOAD PUSH2 0x23 JUMPI PUSH1 0x01 PUSH2 0x26 JUMP '
+            'JUMPDEST PUSH1 0x02 JUMPDEST PUSH1 0x00 SSTORE STOP')
+        self._set_param('MERGE_STATES', True)
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertEqual(interpreter.merged_states, 1)
+        # the merged path and the revert of the dispatcher
+        self.assertEqual(interpreter.total_no_of_paths['normal'], 2)
+
+    def test_no_merge_of_return_addresses(self):
+        # 21: function a9059cbb calling 57 from 2 call sites returning to 39
+        # and 52
+        interpreter = new_interpreter(
+            'PUSH1 0x00 CALLDATALOAD PUSH1 0xe0 SHR DUP1 PUSH4 0xa9059cbb EQ '
+            'PUSH2 0x15 JUMPI PUSH1 0x00 DUP1 REVERT JUMPDEST PUSH1 0x04 '
+            'CALLDATALOAD DUP1 PUSH2 0x2a JUMPI PUSH2 0x27 PUSH1 0x05 PUSH2 '
+            '0x39 JUMP JUMPDEST POP STOP JUMPDEST PUSH2 0x34 PUSH1 0x07 PUSH2 '
+            '0x39 JUMP JUMPDEST PUSH1 0x00 SSTORE STOP JUMPDEST PUSH1 0x01 ADD '
+            'SWAP1 JUMP')
+        self._set_param('MERGE_STATES', True)
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertEqual(interpreter.total_no_of_paths['normal'], 3)
+        self.assertEqual(interpreter.total_no_of_paths['exception'], 0)
+
+    def test_duplicate_state(self):
+        self._set_param('STATE_TABLE_SIZE', 10)
+        interpreter = new_interpreter('JUMPDEST PUSH1 0x00 JUMP')
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertEqual(interpreter.total_no_of_paths['duplicate'], 1)
+
+        first, second = new_state({1: 2}), new_state({1: 3})
+        # a collision of the storage hashes is not a duplicate
+        second.params.global_state['storage']._hash = first.params.global_state[
+            'storage'].get_hash()
+        # pylint: disable=protected-access
+        self.assertFalse(interpreter._is_duplicate(first))
+        self.assertFalse(interpreter._is_duplicate(second))
+        self.assertTrue(interpreter._is_duplicate(second))
+
+    def test_edge_limit_without_loops(self):
+        # 6 branches to the same block, paths over the edge limit of their
+        # edges are terminated although there is no loop
+        self._set_param('LOOP_BOUNDS', 'headers')
+        interpreter = new_interpreter(
+            'PUSH1 0x00 CALLDATALOAD PUSH2 0x07 JUMPI JUMPDEST PUSH1 0x20 '
+            'CALLDATALOAD PUSH2 0x0f JUMPI JUMPDEST PUSH1 0x40 CALLDATALOAD '
+            'PUSH2 0x17 JUMPI JUMPDEST PUSH1 0x60 CALLDATALOAD PUSH2 0x1f '
+            'JUMPI JUMPDEST PUSH1 0x80 CALLDATALOAD PUSH2 0x27 JUMPI JUMPDEST '
+            'PUSH1 0xa0 CALLDATALOAD PUSH2 0x2f JUMPI JUMPDEST STOP')
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertFalse(interpreter.back_edges)
+        self.assertEqual(interpreter.total_no_of_paths['normal'], 11)
+
+    def test_loop_summary_vars(self):
+        # loop at 2 storing its counter at 5 or 6, every path summarizes it
+        # with its own variables
+        self._set_param('LOOP_SUMMARY_K', 1)
+        interpreter = new_interpreter(
+            'PUSH1 0x00 JUMPDEST DUP1 PUSH1 0x00 CALLDATALOAD GT ISZERO PUSH2 '
+            '0x28 JUMPI PUSH1 0x20 CALLDATALOAD PUSH2 0x1a JUMPI PUSH1 0x05 '
+            'PUSH2 0x1d JUMP JUMPDEST PUSH1 0x06 JUMPDEST DUP2 SWAP1 SSTORE '
+            'PUSH1 0x01 ADD PUSH2 0x02 JUMP JUMPDEST STOP')
+        self.assertIsNotNone(interpreter.sym_exec())
+        names = {
+            str(var)
+            for var in interpreter.x_graph.mapping_var_node
+            if str(var).startswith('loop_')
+        }
+        self.assertEqual(
+            names, {
+                'loop_2_1_stack_0', 'loop_2_1_storage_6', 'loop_2_2_stack_0',
+                'loop_2_2_storage_5'
+            })
+
+    def test_loop_summary_over_loop_limit(self):
+        self._set_param('LOOP_SUMMARY_K', 4)
+        interpreter = new_interpreter(
+            'PUSH1 0x00 JUMPDEST DUP1 PUSH1 0x00 CALLDATALOAD GT ISZERO PUSH2 '
+            '0x18 JUMPI PUSH1 0x01 ADD DUP1 PUSH1 0x05 SSTORE PUSH2 0x02 JUMP '
+            'JUMPDEST STOP')
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertEqual(interpreter.gen.loop, 1)
+        # exits after 0 to 3 iterations and after the summary
+        self.assertEqual(interpreter.total_no_of_paths['normal'], 5)
+        self.assertEqual(interpreter.total_no_of_paths['loopLimit'], 1)
+
+    def test_solver_workers(self):
+        # the revert at 21 needs x == 1 and x == 2
+        self._set_param('PRUNE_INFEASIBLE', True)
+        self._set_param('SOLVER_WORKERS', 1)
+        interpreter = new_interpreter(
+            'PUSH1 0x00 CALLDATALOAD DUP1 PUSH1 0x01 EQ PUSH2 0x0c JUMPI STOP '
+            'JUMPDEST PUSH1 0x02 EQ PUSH2 0x15 JUMPI STOP JUMPDEST PUSH1 0x00 '
+            'DUP1 REVERT')
+        self.addCleanup(solver_pool.get_pool(1, 1).shutdown)
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertEqual(interpreter.discarded_states, 1)
+        self.assertEqual(interpreter.total_no_of_paths['normal'], 2)
+        self.assertNotIn(21, interpreter.total_visited_pc)
+
+    def test_saturation_per_function(self):
+        # functions a9059cbb at 32 and 70a08231 at 66, every path of a
+        # function covers all of its blocks
+        self._set_param('SATURATION_PATHS', 4)
+        self._set_param('SEARCH_STRATEGY', 'random')
+        interpreter = new_interpreter(
+            'PUSH1 0x00 CALLDATALOAD PUSH1 0xe0 SHR DUP1 PUSH4 0xa9059cbb EQ '
+            'PUSH2 0x20 JUMPI DUP1 PUSH4 0x70a08231 EQ PUSH2 0x42 JUMPI PUSH1 '
+            '0x00 DUP1 REVERT JUMPDEST PUSH1 0x04 CALLDATALOAD PUSH2 0x28 '
+            'JUMPI JUMPDEST PUSH1 0x24 CALLDATALOAD PUSH2 0x30 JUMPI JUMPDEST '
+            'PUSH1 0x44 CALLDATALOAD PUSH2 0x38 JUMPI JUMPDEST PUSH1 0x64 '
+            'CALLDATALOAD PUSH2 0x40 JUMPI JUMPDEST STOP JUMPDEST PUSH1 0x04 '
+            'CALLDATALOAD PUSH2 0x4a JUMPI JUMPDEST PUSH1 0x24 CALLDATALOAD '
+            'PUSH2 0x52 JUMPI JUMPDEST PUSH1 0x44 CALLDATALOAD PUSH2 0x5a '
+            'JUMPI JUMPDEST PUSH1 0x64 CALLDATALOAD PUSH2 0x62 JUMPI JUMPDEST '
+            'STOP')
+        self.assertIsNotNone(interpreter.sym_exec())
+        self.assertEqual(set(interpreter.stop_reasons),
+                         {'a9059cbb', '70a08231'})
+        # 1 path adding coverage and 4 not for each function, and the revert
+        # of the dispatcher, although the paths of the functions interleave
+        self.assertEqual(interpreter.total_no_of_paths['normal'], 11)
+
+    def _set_param(self, name, value):
+        self.addCleanup(setattr, global_params, name,
+                        getattr(global_params, name))
+        setattr(global_params, name, value)
+
+
+if __name__ == '__main__':
+    unittest.main()
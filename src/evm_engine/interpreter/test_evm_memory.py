@@ -0,0 +1,76 @@
+import unittest
+
+from evm_engine.interpreter import evm_memory
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import smt_util
+
+
+class TestEvmMemory(unittest.TestCase):
+    def test_concrete(self):
+        memory = evm_memory.Memory()
+        memory.write(0x40, 0x80, 32)
+        memory.write(0x5f, 0xff12, 1)
+        self.assertEqual(memory.load(0x40, 32), 0x12)
+        self.assertEqual(memory.load(0x50, 32), 0x12 << 128)
+        self.assertEqual(memory.load(0x1000, 32), 0)
+        self.assertEqual(memory.get_size(), 0x60)
+
+    def test_symbolic_overlay(self):
+        x = smt.BitVec('x', 256)
+        memory = evm_memory.Memory()
+        memory.write(0, x, 32)
+        self.assertEqual(str(memory.load(0, 32)), str(x))
+        memory.write(16, 0xab, 1)
+        value = memory.load(0, 32)
+        expected = smt.Concat(smt.Extract(255, 128, x),
+                              smt.BitVecVal(0xab, 8), smt.Extract(119, 0, x))
+        self.assertEqual(smt_util.convert_result_to_int(value - expected), 0)
+        self.assertEqual(
+            smt_util.convert_result_to_int(
+                memory.load(1, 2) - smt.Extract(247, 232, x)), 0)
+
+    def test_symbolic_address(self):
+        x = smt.BitVec('x', 256)
+        y = smt.BitVec('y', 256)
+        memory = evm_memory.Memory()
+        memory.write(x, 7, 32)
+        self.assertEqual(memory.load(x, 32), 7)
+        self.assertIsNone(memory.load(y, 32))
+        self.assertTrue(smt.is_expr(memory.get_size()))
+
+    def test_symbolic_size(self):
+        memory = evm_memory.Memory()
+        memory.write(smt.BitVecVal(2**255, 256), 7, 32)
+        self.assertEqual(
+            smt_util.convert_result_to_int(memory.get_size()), 2**255 + 32)
+
+    def test_copy_on_write(self):
+        memory = evm_memory.Memory()
+        memory.write(0, 1, 32)
+        forked = memory.copy()
+        forked.write(0, 2, 32)
+        self.assertEqual(memory.load(0, 32), 1)
+        self.assertEqual(forked.load(0, 32), 2)
+        forked.clear()
+        self.assertEqual(forked.load(0, 32), 0)
+        self.assertEqual(forked.get_size(), 32)
+
+    def test_clear_from(self):
+        x = smt.BitVec('x', 256)
+        memory = evm_memory.Memory()
+        memory.write(0x40, 0x80, 32)
+        memory.write(0x80, x, 32)
+        memory.write(0xa0, 1, 32)
+        memory.clear(0x90)
+        self.assertEqual(memory.load(0x40, 32), 0x80)
+        self.assertEqual(memory.load(0xa0, 32), 0)
+        self.assertEqual(
+            smt_util.convert_result_to_int(
+                memory.load(0x80, 32) -
+                smt.Concat(smt.Extract(255, 128, x), smt.BitVecVal(0, 128))),
+            0)
+        self.assertEqual(memory.get_size(), 0xc0)
+
+
+if __name__ == '__main__':
+    unittest.main()
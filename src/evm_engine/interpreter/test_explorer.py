@@ -0,0 +1,98 @@
+import unittest
+
+from evm_engine.interpreter import explorer
+
+
+def new_states(*edges):
+    return [explorer.State(None, block, pre_block, [], None)
+            for pre_block, block in edges]
+
+
+class TestExplorer(unittest.TestCase):
+    def pop_all(self, worklist):
+        blocks = []
+        while worklist:
+            blocks.append(worklist.pop().block)
+        return blocks
+
+    def test_dfs_pops_first_of_last_push(self):
+        worklist = explorer.new_worklist('dfs', {})
+        worklist.push(new_states((0, 1), (0, 2)))
+        self.assertEqual(worklist.pop().block, 1)
+        worklist.push(new_states((1, 3), (1, 4)))
+        self.assertEqual(self.pop_all(worklist), [3, 4, 2])
+
+    def test_bfs(self):
+        worklist = explorer.new_worklist('bfs', {})
+        worklist.push(new_states((0, 1), (0, 2)))
+        self.assertEqual(worklist.pop().block, 1)
+        worklist.push(new_states((1, 3), (1, 4)))
+        self.assertEqual(self.pop_all(worklist), [2, 3, 4])
+
+    def test_random_pops_every_state(self):
+        worklist = explorer.new_worklist('random', {})
+        worklist.push(new_states(*[(0, block) for block in range(10)]))
+        self.assertEqual(sorted(self.pop_all(worklist)), list(range(10)))
+
+    def test_uncovered_first(self):
+        visited_edges = {(0, 1): 1, (0, 3): 2}
+        worklist = explorer.new_worklist('uncovered', visited_edges)
+        worklist.push(new_states((0, 1), (0, 2), (0, 3)))
+        self.assertEqual(worklist.pop().block, 2)
+        self.assertEqual(self.pop_all(worklist), [1, 3])
+
+    def test_directed_nearest_first(self):
+        worklist = explorer.new_worklist('directed', {}, {2: 1, 3: 0, 4: 1})
+        worklist.push(new_states((0, 1), (0, 2), (0, 3)))
+        self.assertEqual(worklist.pop().block, 3)
+        worklist.push(new_states((3, 4), (3, 5)))
+        self.assertEqual(self.pop_all(worklist), [4, 2, 5, 1])
+
+    def test_scheduled_moves_to_task_in_budget(self):
+        budgets = {}
+        worklist = explorer.ScheduledWorklist(
+            lambda: explorer.new_worklist('dfs', {}), lambda state: state.block
+            // 10, budgets, 2, 1000, 1)
+        worklist.push(new_states((0, 1), (0, 11), (0, 2)))
+        self.assertEqual(list(budgets), [0, 1])
+        self.assertEqual(worklist.pop().block, 1)
+        budgets[0]['paths'] += 1
+        self.assertEqual(worklist.pop().block, 11)
+        budgets[1]['paths'] += 1
+        # every task is out of its budget
+        self.assertEqual(worklist.pop().block, 2)
+        self.assertFalse(worklist)
+
+    def test_merging_waits_for_frame(self):
+        frame = explorer.Frame('f', None)
+        frame.states = 3
+        merged = []
+
+        def merge(states):
+            merged.append([state.pre_block for state in states])
+            return states[:1]
+
+        worklist = explorer.MergingWorklist(explorer.new_worklist('dfs', {}),
+                                            {5}, merge)
+        states = [
+            explorer.State(None, block, pre_block, [], frame)
+            for pre_block, block in ((1, 5), (2, 5), (3, 4))
+        ]
+        worklist.push(states)
+        self.assertEqual(len(worklist), 3)
+        self.assertEqual(worklist.pop().block, 4)
+        self.assertEqual(merged, [])
+        frame.states -= 1
+        self.assertEqual(worklist.pop().pre_block, 1)
+        self.assertEqual(merged, [[1, 2]])
+        self.assertEqual(frame.states, 1)
+        self.assertEqual(worklist.merged_states, 1)
+        self.assertFalse(worklist)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            explorer.new_worklist('best', {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from evm_engine.interpreter import feasibility
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import solver_pool
+
+
+class TestFeasibility(unittest.TestCase):
+    def setUp(self):
+        self.checker = feasibility.FeasibilityChecker()
+        self.x = smt.BitVec('x', 256)
+        self.y = smt.BitVec('y', 256)
+        self.z = smt.BitVec('z', 256)
+
+    def test_infeasible_branch(self):
+        path_conditions = [smt.ULT(self.x, 10)]
+        self.assertFalse(
+            self.checker.is_feasible(path_conditions, smt.UGT(self.x, 20)))
+        self.assertTrue(
+            self.checker.is_feasible(path_conditions, smt.UGT(self.x, 5)))
+        self.assertFalse(self.checker.is_feasible([False], self.x == 1))
+        self.assertEqual(self.checker.get_stats()['pruned'], 2)
+
+    def test_slice_keeps_dependent_conditions(self):
+        first = smt.ULT(self.x, self.y)
+        second = smt.ULT(self.y, 5)
+        third = smt.ULT(self.z, 5)
+        conditions = self.checker._slice([first, second, third], self.x == 3)
+        self.assertEqual([str(expr) for expr in conditions],
+                         [str(first), str(second), str(self.x == 3)])
+
+    def test_cached_results(self):
+        path_conditions = [smt.ULT(self.x, 10), smt.ULT(self.y, 10)]
+        condition = smt.UGT(self.x, 20)
+        self.assertFalse(self.checker.is_feasible(path_conditions, condition))
+        self.assertFalse(
+            self.checker.is_feasible(path_conditions[:1], condition))
+        stats = self.checker.get_stats()
+        self.assertEqual(stats['solver_checks'], 1)
+        self.assertEqual(stats['cache_hits'], 1)
+
+    def test_solver_pool(self):
+        pool = solver_pool.SolverPool(1, 2)
+        try:
+            path_conditions = [smt.ULT(self.x, 10)]
+            query = self.checker.submit(path_conditions, smt.UGT(self.x, 20),
+                                        pool)
+            self.assertIsInstance(query, solver_pool.Query)
+            query.future.result(timeout=60)
+            self.assertFalse(self.checker.poll(query))
+            self.assertFalse(
+                self.checker.submit(path_conditions, smt.UGT(self.x, 20),
+                                    pool))
+            self.assertEqual(self.checker.get_stats()['pruned'], 2)
+        finally:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from evm_engine.interpreter import keccak
+
+
+class TestKeccak(unittest.TestCase):
+    def test_digests(self):
+        self.assertEqual(
+            keccak.keccak256(b'').hex(),
+            'c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470')
+        self.assertEqual(
+            keccak.keccak256(b'abc').hex(),
+            '4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45')
+        self.assertEqual(
+            keccak.keccak256(b'transfer(address,uint256)')[:4].hex(),
+            'a9059cbb')
+
+    def test_multiple_blocks(self):
+        self.assertEqual(len(keccak.keccak256(bytes(1000))), 32)
+        self.assertNotEqual(keccak.keccak256(bytes(136)),
+                            keccak.keccak256(bytes(135)))
+
+
+if __name__ == '__main__':
+    unittest.main()
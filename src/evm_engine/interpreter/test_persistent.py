@@ -0,0 +1,59 @@
+import unittest
+
+from evm_engine.interpreter import persistent
+
+
+class TestPersistent(unittest.TestCase):
+    def test_cow_dict_copies_on_write(self):
+        first = persistent.CowDict({1: 'a'})
+        second = first.copy()
+        self.assertEqual(second.get_private_size(), 0)
+        second[2] = 'b'
+        first.pop(1)
+        self.assertEqual(dict(first), {})
+        self.assertEqual(dict(second), {1: 'a', 2: 'b'})
+        self.assertIn(2, second)
+        self.assertGreater(second.get_private_size(), 0)
+
+    def test_linked_list_shares_prefix(self):
+        first = persistent.LinkedList([1, 2])
+        second = first.copy()
+        first.append(3)
+        second.append(4)
+        second.append(5)
+        self.assertEqual(list(first), [1, 2, 3])
+        self.assertEqual(list(second), [1, 2, 4, 5])
+        self.assertEqual(second[-1], 5)
+        self.assertEqual(second[-2], 4)
+        self.assertEqual(second[0], 1)
+        self.assertEqual(len(second), 4)
+        with self.assertRaises(IndexError):
+            _ = first[-4]
+        self.assertEqual(first.get_private_size() * 2,
+                         second.get_private_size())
+        self.assertEqual(first.get_common_length(second), 2)
+        self.assertEqual(second.get_common_length(first), 2)
+        head = second.head(3)
+        self.assertEqual(list(head), [1, 2, 4])
+        self.assertEqual(head.get_common_length(second), 3)
+        self.assertEqual(head.get_hash(),
+                         persistent.LinkedList([4, 2, 1]).get_hash())
+
+    def test_fork(self):
+        state = {
+            'stack': [1, 2],
+            'storage': persistent.CowDict({0: 1}),
+            'conditions': persistent.LinkedList([True]),
+            'pc': 0,
+        }
+        forked = persistent.fork(state)
+        forked['stack'].append(3)
+        forked['storage'][0] = 2
+        forked['conditions'].append(False)
+        self.assertEqual(state['stack'], [1, 2])
+        self.assertEqual(state['storage'][0], 1)
+        self.assertEqual(list(state['conditions']), [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
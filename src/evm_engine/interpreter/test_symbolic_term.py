@@ -0,0 +1,88 @@
+import random
+import unittest
+
+import z3
+
+from evm_engine.interpreter import symbolic_term as st
+
+OPERATIONS = [
+    lambda m, a, b: a + b,
+    lambda m, a, b: a - b,
+    lambda m, a, b: a * b,
+    lambda m, a, b: a / b,
+    lambda m, a, b: a % b,
+    lambda m, a, b: a & b,
+    lambda m, a, b: a | b,
+    lambda m, a, b: a ^ b,
+    lambda m, a, b: a << b,
+    lambda m, a, b: a >> b,
+    lambda m, a, b: ~a,
+    lambda m, a, b: m.UDiv(a, b),
+    lambda m, a, b: m.URem(a, b),
+    lambda m, a, b: m.SRem(a, b),
+    lambda m, a, b: m.LShR(a, b),
+    lambda m, a, b: m.If(m.ULT(a, b), a, b),
+    lambda m, a, b: m.If(a < b, a, b),
+    lambda m, a, b: m.If(m.Not(a == b), a, b),
+    lambda m, a, b: m.Extract(15, 0, m.Concat(m.Extract(7, 0, a), b)),
+]
+
+VALUES = [0, 1, 2, 7, 255, 2**16 - 1, 2**255, 2**256 - 1, 2**256 - 2]
+
+
+class TestSymbolicTerm(unittest.TestCase):
+    def test_hash_consing(self):
+        x = st.BitVec('x', 256)
+        y = st.BitVec('y', 256)
+        self.assertIs(x, st.BitVec('x', 256))
+        self.assertIs(x + y, y + x)
+        self.assertIs((x + 1) + 2, x + 3)
+        self.assertEqual(st.simplify(x - x).params, 0)
+        self.assertEqual({x: 1}[st.BitVec('x', 256)], 1)
+        self.assertNotIn(y, {x: 1})
+
+    def test_constant_folding_matches_z3(self):
+        rand = random.Random(0)
+        values = VALUES + [rand.getrandbits(256) for _ in range(20)]
+        for operation in OPERATIONS:
+            for first in values:
+                for second in rand.sample(values, 6):
+                    term = operation(st, st.BitVecVal(first, 256),
+                                     st.BitVecVal(second, 256))
+                    expected = z3.simplify(
+                        operation(z3, z3.BitVecVal(first, 256),
+                                  z3.BitVecVal(second, 256)))
+                    self.assertTrue(st.is_const(term))
+                    self.assertEqual(str(term), str(expected))
+
+    def test_rewrites_are_equivalent(self):
+        x = st.BitVec('x', 256)
+        y = st.BitVec('y', 256)
+        solver = z3.Solver()
+        for operation in OPERATIONS:
+            for first, second in ((x, y), (x, x), (x, 0), (x, 1), (0, y),
+                                  (x + 1, 2**256 - 1)):
+                if not isinstance(first, st.Term):
+                    first = st.BitVecVal(first, 256)
+                if not isinstance(second, st.Term):
+                    second = st.BitVecVal(second, 256)
+                term = operation(st, first, second)
+                expected = operation(z3, st.to_z3(first), st.to_z3(second))
+                solver.push()
+                solver.add(st.to_z3(term) != expected)
+                self.assertEqual(solver.check(), z3.unsat, str(term))
+                solver.pop()
+
+    def test_branch_conditions(self):
+        x = st.BitVec('x', 256)
+        flag = st.If(st.ULT(x, 5), st.BitVecVal(1, 256), st.BitVecVal(0, 256))
+        self.assertIs(flag != 0, st.ULT(x, 5))
+        self.assertIs(flag == 0, st.Not(st.ULT(x, 5)))
+        self.assertEqual(str(st.simplify(st.BitVecVal(3, 256) != 0)), 'True')
+        self.assertEqual(str(st.And(True, flag != 0)), 'ULT(x, 5)')
+        self.assertEqual(st.get_vars((x + st.BitVec('y', 256)) * x),
+                         [x, st.BitVec('y', 256)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import world_state
+
+
+class TestWorldState(unittest.TestCase):
+    def test_find(self):
+        x = smt.BitVec('x', 256)
+        y = smt.BitVec('y', 256)
+        storage = world_state.StateMap({1: 10, x + 1: 20})
+        self.assertEqual(storage.find(1), 1)
+        self.assertIsNone(storage.find(2))
+        self.assertEqual(storage[storage.find(x + 1)], 20)
+        self.assertIsNotNone(storage.find(smt.simplify(1 + x)))
+        self.assertIsNone(storage.find(y))
+
+    def test_copy_on_write(self):
+        x = smt.BitVec('x', 256)
+        storage = world_state.StateMap({1: 10})
+        forked = storage.copy()
+        forked[x] = 20
+        storage.pop(1)
+        self.assertIsNone(storage.find(x))
+        self.assertIsNone(storage.find(1))
+        self.assertEqual(forked[forked.find(x)], 20)
+        self.assertEqual(forked[1], 10)
+
+    def test_hash(self):
+        x = smt.BitVec('x', 256)
+        storage = world_state.StateMap({1: 10})
+        forked = storage.copy()
+        forked[x] = 20
+        self.assertNotEqual(forked.get_hash(), storage.get_hash())
+        forked[1] = 11
+        del forked[x]
+        forked[1] = 10
+        self.assertEqual(forked.get_hash(), storage.get_hash())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Maps of the world state indexed by addresses, e.g. storage and balances.
+
+A key is looked up in three steps:
+
+    1. concrete keys and symbolic keys identical to the key are found by the
+       dict in O(1), as symbolic expressions are hashed by their structure
+    2. a concrete key never aliases a symbolic one, since keys are simplified
+       expressions, so the lookup of a concrete key ends here
+    3. otherwise the symbolic keys, and only them, are compared with the key
+       by simplifying their difference, without the solver
+"""
+from evm_engine.interpreter import persistent
+from evm_engine.interpreter import smt
+from evm_engine.interpreter import smt_util
+
+
+class StateMap(persistent.CowDict):
+
+    __slots__ = ('_symbolic', '_hash')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        # symbolic keys in insertion order, values are unused
+        self._symbolic = persistent.CowDict()
+        # sum of the hashes of items, updated by writes
+        self._hash = 0
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def copy(self):
+        new = StateMap.__new__(StateMap)
+        new._data = self._data
+        new._shared = True
+        new._symbolic = self._symbolic.copy()
+        new._hash = self._hash
+        self._shared = True
+        return new
+
+    def get_hash(self):
+        """Return a hash of the items, equal for maps of the same items."""
+        return self._hash
+
+    def find(self, key):
+        """Return the key in the map equal to key, None if there is none."""
+        if key in self._data:
+            return key
+        if not smt.is_expr(key):
+            return None
+        for symbolic_key in self._symbolic:
+            if smt_util.convert_result_to_int(symbolic_key - key) == 0:
+                return symbolic_key
+        return None
+
+    def __setitem__(self, key, value):
+        if key in self._data:
+            self._hash -= hash((key, self._data[key]))
+        elif smt.is_expr(key):
+            self._symbolic[key] = None
+        self._hash = (self._hash + hash((key, value))) & persistent.HASH_MASK
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        value = self._data[key]
+        super().__delitem__(key)
+        self._hash = (self._hash - hash((key, value))) & persistent.HASH_MASK
+        self._symbolic.pop(key, None)
+
+    def pop(self, key, *default):
+        if key not in self._data:
+            return super().pop(key, *default)
+        value = self._data[key]
+        del self[key]
+        return value
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __repr__(self):
+        return f'StateMap({self._data!r})'
+
+    def get_private_size(self):
+        return (super().get_private_size() +
+                self._symbolic.get_private_size())
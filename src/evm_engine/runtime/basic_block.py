@@ -15,6 +15,8 @@ class BasicBlock:
         self.end_inst = end_inst
 
         self.instructions = []  # each instruction is a string
+        # instructions decoded from self.instructions, i.e. opcodes.Instruction
+        self.decoded_instructions = []
 
         self.jump_from = [
         ]  # all blocks from which can jump to or fall to this block
@@ -53,6 +55,12 @@ class BasicBlock:
     def get_instructions(self):
         return self.instructions
 
+    def add_decoded_instruction(self, instruction):
+        self.decoded_instructions.append(instruction)
+
+    def get_decoded_instructions(self):
+        return self.decoded_instructions
+
     def set_block_type(self, block_type):
         self.type = block_type
 
@@ -0,0 +1,503 @@
+"""Static analyses of the CFG of EvmRuntime, done before symbolic execution."""
+import collections
+
+from evm_engine.interpreter import opcodes
+
+# divisions add the constraint of a non zero divisor to the XGraph
+_DIVISIONS = {
+    opcodes.DIV.code, opcodes.SDIV.code, opcodes.MOD.code, opcodes.SMOD.code,
+    opcodes.ADDMOD.code, opcodes.MULMOD.code, opcodes.EXP.code
+}
+_PLAIN = {
+    opcodes.POP.code, opcodes.JUMPDEST.code, opcodes.JUMP.code,
+    opcodes.MLOAD.code, opcodes.MSTORE.code, opcodes.MSTORE8.code
+}
+_REVERTS = {opcodes.REVERT.code, opcodes.INVALID.code}
+
+# slots of the abstract stack tracked by resolve_jump_targets, DUP16 and
+# SWAP16 reach the 17th
+_STACK_DEPTH = 32
+# different abstract stacks a block is interpreted with, bounding the cost of
+# resolve_jump_targets to linear in the number of blocks
+_MAX_CONTEXTS = 16
+# abstract values of get_function_entries: the first 32 bytes of calldata,
+# and the selector of the called function in its low 4 bytes
+_CALLDATA = 'calldata'
+_SELECTOR = 'selector'
+_SELECTOR_MASK = 0xffffffff
+# the exit of CfgIndex.ipdom, following every block without successors
+_EXIT = -1
+
+
+class CfgIndex:
+    """Graph facts of the CFG of a contract, computed once for their users.
+
+    The CFG is the vertices and edges of EvmRuntime, entered at block 0, and
+    the edges of targets if given, e.g. of resolve_jump_targets.
+
+    Attributes:
+      blocks: start addresses of the blocks, sorted
+      successors, predecessors: block -> list of blocks
+      idom: block -> its immediate dominator, the entry and blocks not
+        reachable from it are not in it
+      ipdom: block -> its immediate post dominator, None for the exit,
+        blocks not reaching an exit are not in it
+      sccs: lists of blocks of strongly connected components, in reverse
+        topological order
+      scc_of: block -> index of its component in sccs
+      loops: header of a natural loop -> set of the blocks of its body
+      back_edges: set of (latch, header) edges closing the natural loops
+      reachable: block -> bitset of the blocks reachable from it, itself
+        included, where block has bit bits[block]
+    """
+
+    def __init__(self, runtime, targets=None):
+        self.blocks = sorted(runtime.vertices)
+        self.bits = {block: i for i, block in enumerate(self.blocks)}
+        self.successors = {
+            block: list(dict.fromkeys(runtime.edges.get(block, ())))
+            for block in self.blocks
+        }
+        if targets is not None:
+            for block, blocks in targets.items():
+                self.successors[block].extend(
+                    target for target in sorted(blocks)
+                    if target not in self.successors[block])
+        self.predecessors = {block: [] for block in self.blocks}
+        for block, targets in self.successors.items():
+            for target in targets:
+                self.predecessors[target].append(block)
+
+        self.idom = _get_idoms(0, self.successors, self.predecessors)
+        self.idom.pop(0, None)
+
+        exits = [block for block in self.blocks if not self.successors[block]]
+        reverse_successors = dict(self.predecessors)
+        reverse_successors[_EXIT] = exits
+        reverse_predecessors = {
+            block: list(targets) for block, targets in self.successors.items()
+        }
+        for block in exits:
+            reverse_predecessors[block].append(_EXIT)
+        self.ipdom = {
+            block: None if dominator == _EXIT else dominator
+            for block, dominator in _get_idoms(
+                _EXIT, reverse_successors, reverse_predecessors).items()
+            if block != _EXIT
+        }
+
+        self.sccs = _get_sccs(self.blocks, self.successors)
+        self.scc_of = {}
+        self.reachable = {}
+        scc_reachable = []
+        for i, scc in enumerate(self.sccs):
+            bits = 0
+            for block in scc:
+                self.scc_of[block] = i
+                bits |= 1 << self.bits[block]
+            for block in scc:
+                for target in self.successors[block]:
+                    if self.scc_of[target] != i:
+                        bits |= scc_reachable[self.scc_of[target]]
+            scc_reachable.append(bits)
+            for block in scc:
+                self.reachable[block] = bits
+
+        self.loops = {}
+        self.back_edges = set()
+        for block in self.blocks:
+            for header in self.successors[block]:
+                if self.dominates(header, block):
+                    self.back_edges.add((block, header))
+                    self.loops.setdefault(header, {header}).update(
+                        self._get_loop_body(header, block))
+
+    def dominates(self, dominator, block):
+        """Return if every path from the entry to block passes dominator."""
+        while block != dominator:
+            if block not in self.idom:
+                return dominator == block
+            block = self.idom[block]
+        return True
+
+    def post_dominates(self, dominator, block):
+        """Return if every path from block to an exit passes dominator."""
+        while block != dominator:
+            block = self.ipdom.get(block)
+            if block is None:
+                return False
+        return True
+
+    def reaches(self, block, target):
+        """Return if a path leads from block to target."""
+        return bool(self.reachable[block] >> self.bits[target] & 1)
+
+    def is_cyclic(self):
+        return any(self._is_cyclic(scc) for scc in self.sccs)
+
+    def count_loops(self):
+        """Return the number of loops, i.e. back edges of natural loops.
+
+        A cyclic component without a natural loop, which is entered at
+        several blocks, counts as one loop.
+        """
+        return len(self.back_edges) + sum(
+            1 for scc in self.sccs
+            if self._is_cyclic(scc) and not any(
+                block in self.loops for block in scc))
+
+    def _is_cyclic(self, scc):
+        return len(scc) > 1 or scc[0] in self.successors[scc[0]]
+
+    # blocks reaching latch without passing header
+    def _get_loop_body(self, header, latch):
+        body = {latch}
+        worklist = [latch]
+        while worklist:
+            block = worklist.pop()
+            if block == header:
+                continue
+            for predecessor in self.predecessors[block]:
+                if predecessor not in body:
+                    body.add(predecessor)
+                    worklist.append(predecessor)
+        return body
+
+
+# immediate dominators of the blocks reachable from entry, by the algorithm
+# of Cooper, Harvey and Kennedy, the entry dominates itself
+def _get_idoms(entry, successors, predecessors):
+    postorder = []
+    visited = {entry}
+    work = [(entry, iter(successors[entry]))]
+    while work:
+        block, targets = work[-1]
+        for target in targets:
+            if target not in visited:
+                visited.add(target)
+                work.append((target, iter(successors[target])))
+                break
+        else:
+            work.pop()
+            postorder.append(block)
+    number = {block: i for i, block in enumerate(postorder)}
+
+    idom = {entry: entry}
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(postorder):
+            if block == entry:
+                continue
+            new = None
+            for predecessor in predecessors[block]:
+                if predecessor not in idom:
+                    continue
+                if new is None:
+                    new = predecessor
+                    continue
+                while predecessor != new:
+                    while number[predecessor] < number[new]:
+                        predecessor = idom[predecessor]
+                    while number[new] < number[predecessor]:
+                        new = idom[new]
+            if idom.get(block) != new:
+                idom[block] = new
+                changed = True
+    return idom
+
+
+# strongly connected components by the algorithm of Tarjan, in reverse
+# topological order
+def _get_sccs(blocks, successors):
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    sccs = []
+    for root in blocks:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            block, targets = work[-1]
+            for target in targets:
+                if target not in index:
+                    index[target] = low[target] = len(index)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(successors[target])))
+                    break
+                if target in on_stack:
+                    low[block] = min(low[block], index[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[block])
+                if low[block] == index[block]:
+                    scc = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        scc.append(member)
+                        if member == block:
+                            break
+                    sccs.append(scc)
+    return sccs
+
+
+# returns if the instruction only changes the stack and memory of a path
+# and adds nothing to the XGraph
+def _is_silent(ins):
+    opcode = opcodes.BYTECODES.get(ins.code)
+    if opcode is None:
+        return False
+    if opcode.is_push() or opcode.is_dup() or opcode.is_swap():
+        return True
+    if opcode.is_arithmetic():
+        return ins.code not in _DIVISIONS
+    return ins.code in _PLAIN
+
+
+def _is_jumpdest(vertex):
+    instructions = vertex.get_decoded_instructions()
+    return bool(instructions) and instructions[0].code == opcodes.JUMPDEST.code
+
+
+def get_jump_dests(runtime):
+    """Return the blocks starting with JUMPDEST, the valid jump targets."""
+    return {
+        block for block, vertex in runtime.vertices.items()
+        if _is_jumpdest(vertex)
+    }
+
+
+def get_revert_blocks(runtime):
+    """Return the blocks from which a path can only revert.
+
+    A block only reverts if it ends with REVERT or INVALID, or jumps or falls
+    to such a block statically, and its other instructions are silent, so
+    that executing it records nothing but the REVERT terminal node.
+
+    Returns:
+      dict: block -> the next block of the path, None for the last block
+    """
+    predecessors = runtime.get_cfg_index().predecessors
+    revert_blocks = {}
+    worklist = []
+    for block, vertex in runtime.vertices.items():
+        instructions = vertex.get_decoded_instructions()
+        if (runtime.jump_type[block] == 'terminal' and instructions and
+                instructions[-1].code in _REVERTS and
+                all(_is_silent(ins) for ins in instructions[:-1])):
+            revert_blocks[block] = None
+            worklist.append(block)
+
+    while worklist:
+        target = worklist.pop()
+        for block in predecessors[target]:
+            if (block in revert_blocks or runtime.jump_type[block]
+                    not in ('falls_to', 'unconditional') or
+                    runtime.edges[block] != [target]):
+                continue
+            instructions = runtime.vertices[block].get_decoded_instructions()
+            if all(_is_silent(ins) for ins in instructions):
+                revert_blocks[block] = target
+                worklist.append(block)
+    return revert_blocks
+
+
+def get_changed_distances(runtime):
+    """Return the distances of blocks to the nearest changed block.
+
+    The distance is the number of edges on the shortest path from the block
+    to a block changed by the diff of the context, blocks reaching no
+    changed block are not in the result. Besides the edges of the CfgIndex, a
+    block jumping unconditionally and pushing the address of a JUMPDEST,
+    i.e. the call of an internal function and its return address, has an
+    edge to it, for the returns not resolved statically.
+    """
+    predecessors = {
+        block: list(blocks)
+        for block, blocks in runtime.get_cfg_index().predecessors.items()
+    }
+    for block, vertex in runtime.vertices.items():
+        if runtime.jump_type[block] != 'unconditional':
+            continue
+        for ins in vertex.get_decoded_instructions():
+            # 0 is the entry block, not returned to
+            target = runtime.vertices.get(ins.operand or None)
+            if (target is not None and ins.operand not in runtime.edges[block]
+                    and _is_jumpdest(target)):
+                predecessors[ins.operand].append(block)
+    distances = {
+        block: 0
+        for block, vertex in runtime.vertices.items()
+        if vertex.changed
+    }
+    queue = collections.deque(distances)
+    while queue:
+        target = queue.popleft()
+        for block in predecessors[target]:
+            if block not in distances:
+                distances[block] = distances[target] + 1
+                queue.append(block)
+    return distances
+
+
+def resolve_jump_targets(runtime):
+    """Return the jump targets of blocks found without symbolic execution.
+
+    Blocks are interpreted from the entry over abstract stacks holding the
+    pushed block addresses, other values being unknown, so that the return
+    address pushed by the call of an internal function resolves the jump at
+    its return. Only blocks starting with JUMPDEST are targets. Every block
+    is interpreted with at most _MAX_CONTEXTS different stacks, later ones
+    are dropped.
+
+    Returns:
+      dict: block -> set of the blocks it jumps to, static edges included
+    """
+    targets = {block: set() for block in runtime.vertices}
+    jump_dests = get_jump_dests(runtime)
+    contexts = {}
+    worklist = [(0, ())]
+    while worklist:
+        block, stack = worklist.pop()
+        vertex = runtime.vertices.get(block)
+        seen = contexts.setdefault(block, set())
+        if vertex is None or stack in seen or len(seen) >= _MAX_CONTEXTS:
+            continue
+        seen.add(stack)
+
+        stack = list(stack)
+        target = None
+        for ins in vertex.get_decoded_instructions():
+            opcode = opcodes.BYTECODES.get(ins.code)
+            if opcode is None:
+                break
+            if opcode.is_push():
+                stack.append(ins.operand if ins.operand in jump_dests else None)
+            elif opcode.is_dup():
+                n = ins.code - opcodes.DUP1.code + 1
+                stack.append(stack[-n] if n <= len(stack) else None)
+            elif opcode.is_swap():
+                n = ins.code - opcodes.SWAP1.code + 2
+                if n <= len(stack):
+                    stack[-1], stack[-n] = stack[-n], stack[-1]
+                elif stack:
+                    stack[-1] = None
+            else:
+                if ins.code in (opcodes.JUMP.code, opcodes.JUMPI.code):
+                    target = stack[-1] if stack else None
+                del stack[max(len(stack) - opcode.pop, 0):]
+                stack.extend([None] * opcode.push)
+        stack = tuple(stack[-_STACK_DEPTH:])
+
+        successors = []
+        jump_type = runtime.jump_type[block]
+        if jump_type in ('unconditional', 'conditional') and target is not None:
+            targets[block].add(target)
+            successors.append(target)
+        if jump_type in ('falls_to', 'conditional'):
+            successors.append(vertex.get_falls_to())
+        for successor in successors:
+            if successor is not None:
+                worklist.append((successor, stack))
+    return targets
+
+
+# value of the instruction of get_function_entries over the values of its
+# operands, the top of the stack first
+def _get_dispatch_value(code, args):
+    if code == opcodes.CALLDATALOAD.code and args[0] == 0:
+        return _CALLDATA
+    if code == opcodes.SHR.code and args == [0xe0, _CALLDATA]:
+        return _SELECTOR
+    if code == opcodes.DIV.code and args == [_CALLDATA, 1 << 0xe0]:
+        return _SELECTOR
+    if code == opcodes.AND.code and _SELECTOR in args and _SELECTOR_MASK in args:
+        return _SELECTOR
+    if code in (opcodes.EQ.code, opcodes.SUB.code, opcodes.XOR.code):
+        constants = [arg for arg in args if isinstance(arg, int)]
+        if _SELECTOR in args and constants:
+            kind = 'eq' if code == opcodes.EQ.code else 'ne'
+            return kind, constants[0]
+    if code == opcodes.ISZERO.code and isinstance(args[0], tuple):
+        kind, selector = args[0]
+        return 'ne' if kind == 'eq' else 'eq', selector
+    return None
+
+
+def get_function_entries(runtime):
+    """Return the start blocks of the public functions and their selectors.
+
+    The dispatcher is interpreted from the entry over abstract stacks which
+    track the selector loaded from calldata, by SHR or by DIV and AND, and
+    its comparisons with constants, so that the block a JUMPI takes if the
+    selector equals a constant is the entry of that function, whether the
+    comparisons are linear, split by GT and LT pivots or use SUB and ISZERO
+    as with via-IR. Function entries are not interpreted further.
+
+    Returns:
+      dict: start block of a function -> its selector
+    """
+    entries = {}
+    contexts = {}
+    worklist = [(0, ())]
+    while worklist:
+        block, stack = worklist.pop()
+        vertex = runtime.vertices.get(block)
+        seen = contexts.setdefault(block, set())
+        if (vertex is None or block in entries or stack in seen or
+                len(seen) >= _MAX_CONTEXTS):
+            continue
+        seen.add(stack)
+
+        stack = list(stack)
+        target = condition = None
+        for ins in vertex.get_decoded_instructions():
+            opcode = opcodes.BYTECODES.get(ins.code)
+            if opcode is None:
+                break
+            if opcode.is_push():
+                stack.append(ins.operand)
+            elif opcode.is_dup():
+                n = ins.code - opcodes.DUP1.code + 1
+                stack.append(stack[-n] if n <= len(stack) else None)
+            elif opcode.is_swap():
+                n = ins.code - opcodes.SWAP1.code + 2
+                if n <= len(stack):
+                    stack[-1], stack[-n] = stack[-n], stack[-1]
+                elif stack:
+                    stack[-1] = None
+            else:
+                args = stack[-1:-opcode.pop - 1:-1]
+                args.extend([None] * (opcode.pop - len(args)))
+                if ins.code in (opcodes.JUMP.code, opcodes.JUMPI.code):
+                    target, condition = args[0], args[-1]
+                del stack[max(len(stack) - opcode.pop, 0):]
+                if opcode.push:
+                    stack.append(_get_dispatch_value(ins.code, args))
+        stack = tuple(stack[-_STACK_DEPTH:])
+
+        jump_type = runtime.jump_type[block]
+        falls_to = vertex.get_falls_to()
+        if jump_type == 'conditional' and isinstance(condition, tuple):
+            kind, selector = condition
+            entry = target if kind == 'eq' else falls_to
+            if entry in runtime.vertices:
+                entries[entry] = selector & _SELECTOR_MASK
+        successors = []
+        if jump_type in ('unconditional', 'conditional'):
+            successors.append(target)
+        if jump_type in ('falls_to', 'conditional'):
+            successors.append(falls_to)
+        for successor in successors:
+            if successor in runtime.vertices and successor not in entries:
+                worklist.append((successor, stack))
+    return entries
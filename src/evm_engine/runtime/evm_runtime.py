@@ -1,10 +1,13 @@
 import os
+import re
 import sys
 
 import graphviz
 import six
 
+from evm_engine.interpreter import opcodes
 from evm_engine.runtime import basic_block
+from evm_engine.runtime import cfg_analysis
 from utils import util, global_params, log
 
 
@@ -37,7 +40,17 @@ class EvmRuntime:
         self.input_type = input_type
         self.binary = binary  # runtime evm bytes of the contract
 
+        # start block of a public function -> its selector in hex
         self.start_block_to_func_sig = {}
+        # start block of a public function -> its name, see
+        # get_start_block_to_func_sig
+        self.start_block_to_func_name = {}
+        # cfg_analysis.CfgIndex of the CFG, None for not computed since the
+        # last change of edges
+        self.cfg_index = None
+        # cfg_analysis.resolve_jump_targets of the blocks, None for not
+        # computed yet
+        self.jump_targets = None
 
     def build_cfg(self):
         if self.input_type == global_params.LanguageType.SOLIDITY:
@@ -68,32 +81,38 @@ class EvmRuntime:
             self._collect_vertices(file_contents)
             self._construct_bb()
             self._construct_static_edges()
+            self.get_start_block_to_func_sig()
         elif self.input_type == global_params.LanguageType.EVM:
             pass
         else:
             log.mylogger.error('Unknown file type %s', self.input_type)
             raise NotImplementedError(f'Unknown file type {self.input_type}')
 
-    # the algorithm is tricky and may fail if compiler modify the feature
     def get_start_block_to_func_sig(self):
-        state = 0
-        func_sig = None
-        for pc, instr in six.iteritems(self.instructions):
-            instr = ' '.join(instr.split(' ')[1:])
-            if state == 0 and instr.startswith('PUSH4'):
-                func_sig = instr.split(' ')[1][2:]
-                state += 1
-            elif state == 1 and instr.startswith('DUP'):
-                continue
-            elif state == 1 and instr.startswith('EQ'):
-                state += 1
-            elif state == 2 and instr.startswith('PUSH'):
-                state = 0
-                pc = instr.split(' ')[1]
-                pc = int(pc, 16)
-                self.start_block_to_func_sig[pc] = func_sig
-            else:
-                state = 0
+        """Find the start blocks of public functions, see
+        cfg_analysis.get_function_entries, and their names.
+
+        The name of a function is its name in the source map without
+        parameters, or its selector in hex if the source map has none.
+        """
+        self.start_block_to_func_sig = {
+            block: f'{selector:08x}' for block, selector in sorted(
+                cfg_analysis.get_function_entries(self).items())
+        }
+        sig_to_func = {}
+        if self.source_map is not None and self.source_map.sig_to_func:
+            # int keys for situations like "0x0abc" == "0xabc"
+            sig_to_func = {
+                int(sig, 16): func
+                for sig, func in self.source_map.sig_to_func.items()
+            }
+        self.start_block_to_func_name = {}
+        for block, func_sig in self.start_block_to_func_sig.items():
+            func_name = sig_to_func.get(int(func_sig, 16), func_sig)
+            match = re.match(r'(\w[\w\d_]*)\((.*)\)$', func_name)
+            if match:
+                func_name = match.group(1)
+            self.start_block_to_func_name[block] = func_name
         return self.start_block_to_func_sig
 
     def _collect_vertices(self, file_contents):
@@ -104,6 +123,8 @@ class EvmRuntime:
 
         self.end_ins_dict = {}
         self.instructions = {}
+        # instructions decoded once for the interpreter, {pc: Instruction}
+        self.decoded_instructions = {}
         self.jump_type = {}
 
         tok_string = None
@@ -130,6 +151,8 @@ class EvmRuntime:
                 idx += 1
 
             self.instructions[inst_pc] = value
+            self.decoded_instructions[inst_pc] = opcodes.decode_instruction(
+                value)
 
             if is_new_block:
                 current_block = inst_pc
@@ -167,11 +190,11 @@ class EvmRuntime:
             if key not in self.jump_type:
                 self.jump_type[key] = 'falls_to'
 
-        self.get_start_block_to_func_sig()
-
     def _construct_bb(self):
         self.vertices = {}
         self.edges = {}
+        self.cfg_index = None
+        self.jump_targets = None
 
         for start_address, end_address in self.end_ins_dict.items():
             block = basic_block.BasicBlock(start_address, end_address)
@@ -183,6 +206,8 @@ class EvmRuntime:
             for i in range(start_address, end_address + 1):
                 if i in self.instructions:
                     block.add_instruction(self.instructions[i])
+                    block.add_decoded_instruction(
+                        self.decoded_instructions[i])
                     if self.source_map is not None and self.source_map.instr_positions:
                         if self.source_map.in_src_file(
                                 self.source_map.instr_positions[i]['f']):
@@ -213,6 +238,38 @@ class EvmRuntime:
             self.vertices[start_address] = block
             self.edges[start_address] = []
 
+    def add_jump_targets(self, targets):
+        """Add the edges to jump targets not in the CFG yet.
+
+        Args:
+          targets: block -> its jump targets, e.g. of
+            cfg_analysis.resolve_jump_targets
+        """
+        for block, block_targets in targets.items():
+            for target in sorted(block_targets):
+                if target not in self.edges[block]:
+                    self.add_edge(block, target)
+                    self.vertices[target].set_jump_from(block)
+
+    def add_edge(self, block, target):
+        if target not in self.edges[block]:
+            self.edges[block].append(target)
+            self.cfg_index = None
+
+    def get_jump_targets(self):
+        """Return the jump targets resolved statically, computed once."""
+        if self.jump_targets is None:
+            self.jump_targets = cfg_analysis.resolve_jump_targets(self)
+        return self.jump_targets
+
+    def get_cfg_index(self):
+        """Return the CfgIndex of the CFG and the jump targets resolved
+        statically, computed once for its edges."""
+        if self.cfg_index is None:
+            self.cfg_index = cfg_analysis.CfgIndex(self,
+                                                   self.get_jump_targets())
+        return self.cfg_index
+
     def _construct_static_edges(self):
         key_list = sorted(self.jump_type.keys())
         length = len(key_list)
@@ -0,0 +1,116 @@
+import unittest
+
+from evm_engine.runtime import cfg_analysis
+from evm_engine.runtime import evm_runtime
+from utils import context as ctx
+from utils import global_params
+
+
+def new_runtime(opcodes):
+    runtime = evm_runtime.EvmRuntime(
+        ctx.Context(0, '', '', [], ''),
+        opcodes=opcodes,
+        input_type=global_params.LanguageType.SOLIDITY)
+    runtime.build_cfg()
+    return runtime
+
+
+class TestCfgAnalysis(unittest.TestCase):
+
+    def test_cfg_index(self):
+        # 2: loop of 2 and 9 exiting to 13, 12 is not reachable
+        runtime = new_runtime('PUSH1 0x00 JUMPDEST DUP1 CALLDATASIZE GT PUSH1 '
+                              '0x0d JUMPI PUSH1 0x02 JUMP STOP JUMPDEST STOP')
+        index = runtime.get_cfg_index()
+        self.assertEqual(index.idom, {2: 0, 9: 2, 13: 2})
+        self.assertEqual(index.ipdom, {0: 2, 2: 13, 9: 2, 12: None, 13: None})
+        self.assertTrue(index.dominates(2, 9))
+        self.assertFalse(index.dominates(9, 13))
+        self.assertTrue(index.post_dominates(13, 0))
+        self.assertEqual(index.loops, {2: {2, 9}})
+        self.assertEqual(index.back_edges, {(9, 2)})
+        self.assertEqual(index.count_loops(), 1)
+        self.assertEqual(sorted(index.sccs[index.scc_of[9]]), [2, 9])
+        self.assertTrue(index.is_cyclic())
+        self.assertTrue(index.reaches(9, 13))
+        self.assertFalse(index.reaches(13, 2))
+        self.assertIs(runtime.get_cfg_index(), index)
+        runtime.add_edge(12, 2)
+        self.assertEqual(runtime.get_cfg_index().predecessors[2], [0, 9, 12])
+
+    def test_revert_blocks(self):
+        # 0: a branch to 9 reverting after a jump to 13
+        runtime = new_runtime('CALLDATASIZE PUSH1 0x09 JUMPI STOP STOP STOP '
+                              'STOP STOP JUMPDEST PUSH1 0x0d JUMP JUMPDEST '
+                              'PUSH1 0x00 DUP1 REVERT')
+        self.assertEqual(cfg_analysis.get_revert_blocks(runtime), {
+            9: 13,
+            13: None
+        })
+
+    def test_resolve_return_address(self):
+        # 0: call of 8 returning to 6
+        runtime = new_runtime('PUSH1 0x06 PUSH1 0x08 JUMP STOP JUMPDEST STOP '
+                              'JUMPDEST JUMP')
+        self.assertEqual(runtime.edges[8], [])
+        targets = cfg_analysis.resolve_jump_targets(runtime)
+        self.assertEqual(targets[8], {6})
+        index = runtime.get_cfg_index()
+        self.assertEqual(index.successors[8], [6])
+        self.assertTrue(index.post_dominates(6, 0))
+        runtime.add_jump_targets(targets)
+        self.assertEqual(runtime.edges[8], [6])
+        self.assertEqual(runtime.vertices[6].get_jump_from(), [8])
+
+    def test_resolve_only_jumpdest(self):
+        # 0: call of 8 returning to 6, which is not a JUMPDEST
+        runtime = new_runtime('PUSH1 0x06 PUSH1 0x08 JUMP STOP STOP STOP '
+                              'JUMPDEST JUMP')
+        self.assertIn(6, runtime.vertices)
+        targets = cfg_analysis.resolve_jump_targets(runtime)
+        self.assertEqual(targets[0], {8})
+        self.assertEqual(targets[8], set())
+
+    def test_changed_distances(self):
+        runtime = new_runtime('PUSH1 0x06 PUSH1 0x08 JUMP STOP JUMPDEST STOP '
+                              'JUMPDEST JUMP')
+        runtime.vertices[6].set_changed(True)
+        # 8 returns to 6
+        self.assertEqual(cfg_analysis.get_changed_distances(runtime), {
+            6: 0,
+            0: 1,
+            8: 1
+        })
+
+    def test_linear_dispatcher(self):
+        # 27 and 29: entries of a9059cbb and 70a08231
+        runtime = new_runtime('PUSH1 0x00 CALLDATALOAD PUSH1 0xe0 SHR DUP1 '
+                              'PUSH4 0xa9059cbb EQ PUSH1 0x1b JUMPI DUP1 '
+                              'PUSH4 0x70a08231 EQ PUSH1 0x1d JUMPI STOP '
+                              'JUMPDEST STOP JUMPDEST STOP')
+        self.assertEqual(cfg_analysis.get_function_entries(runtime), {
+            27: 0xa9059cbb,
+            29: 0x70a08231
+        })
+        self.assertEqual(runtime.start_block_to_func_name, {
+            27: 'a9059cbb',
+            29: '70a08231'
+        })
+
+    def test_split_dispatcher(self):
+        # 47: pivot to 65, 61: entry of 12345678 if SUB is zero, 79: entry
+        # of a9059cbb if EQ is not zero
+        runtime = new_runtime(
+            'PUSH1 0x00 CALLDATALOAD PUSH29 0x01' + '00' * 28 +
+            ' SWAP1 DIV PUSH4 0xffffffff AND DUP1 PUSH4 0x70a08231 GT PUSH1 '
+            '0x41 JUMPI DUP1 PUSH4 0x12345678 SUB PUSH1 0x3f JUMPI JUMPDEST '
+            'STOP JUMPDEST STOP JUMPDEST DUP1 PUSH4 0xa9059cbb EQ ISZERO '
+            'ISZERO PUSH1 0x4f JUMPI STOP JUMPDEST STOP')
+        self.assertEqual(cfg_analysis.get_function_entries(runtime), {
+            61: 0x12345678,
+            79: 0xa9059cbb
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
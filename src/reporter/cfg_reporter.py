@@ -4,7 +4,8 @@ import os
 import networkx as nx
 
 from abstracts.cfg import cfg_abstract
-from utils import log
+from evm_engine.interpreter import smt_util
+from utils import global_params, log
 
 
 class CfgReporter:
@@ -25,6 +26,7 @@ class CfgReporter:
         self.cfg_json_path = ''
         self.cfg_edge_lists_path = ''
         self.cfg_abstract_path = ''
+        self.coverage_path = ''
 
     def set_contract_cfg(self, contract_name, env):
         # 1. construct cfg graph
@@ -85,6 +87,9 @@ class CfgReporter:
                 })
 
         self.cfg_json[contract_name] = c_cfg_json
+        # CfgIndex of the edges and the jumps resolved statically for the cfg
+        # abstracts, not for layout
+        cfg.graph['cfg_index'] = env.get_cfg_index()
         self.cfg_graphs[contract_name] = cfg
         self.cfg_edge_lists[contract_name] = edge_list
 
@@ -178,6 +183,11 @@ class CfgReporter:
                   encoding='utf8') as edgelist_file:
             edgelist_file.write(''.join(complete))
 
+    def dump_coverage(self):
+        self.coverage_path = os.path.join(self.output_path, 'coverage.json')
+        with open(self.coverage_path, 'w', encoding='utf8') as output_file:
+            json.dump(self.coverage, output_file)
+
     def dump_cfg_abstract(self):
         self.cfg_abstract_path = os.path.join(self.output_path,
                                               'cfg_abstract.json')
@@ -203,14 +213,69 @@ class CfgReporter:
         log.mylogger.info('Coverage Info: Visited pc: %d',
                           len(interpreter.total_visited_pc))
         log.mylogger.info('Coverage Info: Total pc: %d', len(env.instructions))
+        log.mylogger.info('Coverage Info: Executed instructions: %d, %.0f/s',
+                          interpreter.get_executed_instructions(),
+                          interpreter.get_instructions_per_second())
+        log.mylogger.info('Coverage Info: Max live paths: %d, %.0f bytes/path',
+                          interpreter.max_live_paths,
+                          interpreter.get_state_size_per_path())
+        solver_stats = interpreter.get_solver_stats()
+        log.mylogger.info(
+            'Coverage Info: Pruned branches: %d, solver queries: %d, '
+            'cache hits: %d, solver time: %.3f s', solver_stats['pruned'],
+            solver_stats['queries'],
+            solver_stats['cache_hits'] + solver_stats['model_hits'],
+            solver_stats['solver_time'])
+        log.mylogger.info(
+            'Coverage Info: Discarded infeasible states: %d, blocked: %.3f s',
+            solver_stats['discarded_states'], solver_stats['blocked_time'])
+        log.mylogger.info('Coverage Info: Search strategy: %s, timeout: %s',
+                          global_params.SEARCH_STRATEGY,
+                          str(interpreter.context.timeout))
+        log.mylogger.info('Coverage Info: Merged states: %d',
+                          interpreter.merged_states)
+        visited_edges = len(interpreter.total_visited_edges) - 1
+        completeness = {
+            'edges': visited_edges / edge_number if edge_number else 1,
+            'pcs': (len(interpreter.total_visited_pc) /
+                    len(env.instructions) if env.instructions else 1),
+            'closed_paths': sum(interpreter.total_no_of_paths.values()),
+            'open_paths': interpreter.open_paths
+        }
+        log.mylogger.info(
+            'Coverage Info: Completeness: edges %.3f, pcs %.3f, paths %d '
+            'closed, %d open', completeness['edges'], completeness['pcs'],
+            completeness['closed_paths'], completeness['open_paths'])
+        for name, reason in interpreter.stop_reasons.items():
+            log.mylogger.info('Coverage Info: Stopped exploring %s: %s', name,
+                              reason)
+        for name, budget in interpreter.function_budgets.items():
+            log.mylogger.info(
+                'Coverage Info: Function %s budget used: %.3f s, %d paths',
+                name, budget['time'], budget['paths'])
+        log.mylogger.info('Coverage Info: Simplify cache hits: %d, misses: %d',
+                          smt_util.SIMPLIFY_CACHE.hits,
+                          smt_util.SIMPLIFY_CACHE.misses)
 
         self.coverage[contract_name] = {
             'visited_paths': interpreter.total_no_of_paths,
             # subtract (0,0)
-            'visited_edges': len(interpreter.total_visited_edges) - 1,
+            'visited_edges': visited_edges,
             'total_edges': edge_number,
             'visited_pcs': len(interpreter.total_visited_pc),
-            'total_pcs': len(env.instructions)
+            'total_pcs': len(env.instructions),
+            'executed_instructions': interpreter.get_executed_instructions(),
+            'instructions_per_second': interpreter.get_instructions_per_second(),
+            'max_live_paths': interpreter.max_live_paths,
+            'state_bytes_per_path': interpreter.get_state_size_per_path(),
+            'solver': solver_stats,
+            'merged_states': interpreter.merged_states,
+            'function_budgets': interpreter.function_budgets,
+            'stop_reasons': interpreter.stop_reasons,
+            # coverage is reached at the deadline if timeout
+            'search_strategy': global_params.SEARCH_STRATEGY,
+            'timeout': interpreter.context.timeout,
+            'completeness': completeness
         }
 
         # self.information[contract_name] = {
@@ -22,6 +22,93 @@ COMPILATION_ERR = False
 # run in debug mod, which show more logs
 DEBUG_MOD = False
 
+# symbolic expressions backend of the evm interpreter, 'z3' or 'term' for
+# the hash-consed terms of evm_engine/interpreter/symbolic_term
+SYMBOLIC_BACKEND = 'z3'
+
+# build arithmetic results unsimplified and only simplify them where they
+# are observed, e.g. jump targets, branch conditions, storage keys, memory
+# addresses and XGraph nodes
+LAZY_SIMPLIFY = False
+
+# max number of simplified z3 expressions kept by smt_util.convert_result,
+# 0 for no cache
+SIMPLIFY_CACHE_SIZE = 100000
+
+# order of exploring paths in the evm interpreter, 'dfs', 'bfs', 'random',
+# 'uncovered' for the paths of unvisited edges first or 'directed' for the
+# paths nearest to the blocks changed by the diff first
+SEARCH_STRATEGY = 'dfs'
+
+# explore only the functions reaching a block changed by the diff, and the
+# dispatcher, no function is skipped if the diff changes no block
+CHANGED_FUNCTIONS_ONLY = False
+
+# explore the functions of a contract in turns, each in a fair share of
+# SYM_TIMEOUT and at most FUNCTION_PATH_BUDGET paths until every function
+# used its share, see evm_engine/interpreter/explorer.ScheduledWorklist
+SCHEDULE_FUNCTIONS = False
+FUNCTION_PATH_BUDGET = 1000
+
+# stop exploring a function once this number of its consecutive paths, or
+# its paths terminated in this number of seconds, add no visited edge, pc or
+# XGraph node or edge, 0 for not stopping
+SATURATION_PATHS = 0
+SATURATION_TIME = 0
+
+# where the loop bounds of the evm interpreter apply: 'edges' for every edge
+# entering a conditional block, or 'headers' for only the back edges of
+# natural loops, found by cfg_analysis.CfgIndex over the static and resolved
+# edges, with bounds shrinking with the time left of SYM_TIMEOUT
+LOOP_BOUNDS = 'edges'
+
+# replace the stack and storage values changed by an iteration of a loop by
+# fresh symbolic variables at its LOOP_SUMMARY_K-th back edge, and terminate
+# the path at the next one instead of LOOP_LIMIT, 0 for not summarizing loops,
+# a path still stops at the EDGE_LIMIT of its function
+LOOP_SUMMARY_K = 0
+
+# check branch conditions with the solver and do not explore infeasible
+# branches, see evm_engine/interpreter/feasibility
+PRUNE_INFEASIBLE = False
+
+# max number of cached solver results and variables of expressions
+SOLVER_CACHE_SIZE = 10000
+
+# number of solver worker processes for PRUNE_INFEASIBLE, which answer the
+# queries of branches while other states are explored, 0 for solving in the
+# interpreter process
+SOLVER_WORKERS = 0
+
+# max number of queries sent to the solver workers and not answered yet
+MAX_PENDING_QUERIES = 32
+
+# merge states of a function meeting at the immediate post dominator of a
+# conditional jump, see evm_engine/interpreter/merging
+MERGE_STATES = False
+
+# max number of different stack, storage and balance values of states to
+# merge, states differing more are explored separately
+MAX_MERGE_DIFFS = 8
+
+# max number of states kept for every function, a path reaching a kept
+# state is terminated as a duplicate, 0 for not detecting duplicate states
+STATE_TABLE_SIZE = 0
+
+# terminate paths entering blocks which can only revert without executing
+# them, see evm_engine/runtime/cfg_analysis
+SKIP_REVERT_BLOCKS = False
+
+# edges of the CFG resolved statically by abstract interpretation of the
+# stack, see evm_engine/runtime/cfg_analysis.resolve_jump_targets, added to
+# the CFG found by symbolic execution: 'never', 'fallback' for only if
+# symbolic execution is timeout, or 'always'
+STATIC_CFG = 'fallback'
+
+# keep the XGraph and visited CFG explored until SYM_TIMEOUT as the results
+# of a contract, instead of an error and zero abstracts
+ANYTIME_RESULTS = False
+
 # big int over 2^256, for not int
 BIG_INT_256 = pow(2, 256)
 
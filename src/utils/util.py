@@ -1,3 +1,4 @@
+import collections
 import os
 import re
 import yaml
@@ -6,7 +7,7 @@ from utils import global_params
 from utils import log
 from utils import skills
 
-from z3 import is_expr, BitVecVal, simplify, is_const, unknown
+from z3 import unknown
 
 
 def remove_prefix(text, prefix):
@@ -32,6 +33,46 @@ def get_config(config_path):
             global_params.SYM_TIMEOUT = cfg['timeout']
         if 'debug' in cfg:
             global_params.DEBUG_MOD = cfg['debug']
+        if 'symbolic_backend' in cfg:
+            global_params.SYMBOLIC_BACKEND = cfg['symbolic_backend']
+        if 'lazy_simplify' in cfg:
+            global_params.LAZY_SIMPLIFY = cfg['lazy_simplify']
+        if 'simplify_cache_size' in cfg:
+            global_params.SIMPLIFY_CACHE_SIZE = cfg['simplify_cache_size']
+        if 'search_strategy' in cfg:
+            global_params.SEARCH_STRATEGY = cfg['search_strategy']
+        if 'changed_functions_only' in cfg:
+            global_params.CHANGED_FUNCTIONS_ONLY = cfg['changed_functions_only']
+        if 'schedule_functions' in cfg:
+            global_params.SCHEDULE_FUNCTIONS = cfg['schedule_functions']
+        if 'function_path_budget' in cfg:
+            global_params.FUNCTION_PATH_BUDGET = cfg['function_path_budget']
+        if 'saturation_paths' in cfg:
+            global_params.SATURATION_PATHS = cfg['saturation_paths']
+        if 'saturation_time' in cfg:
+            global_params.SATURATION_TIME = cfg['saturation_time']
+        if 'loop_bounds' in cfg:
+            global_params.LOOP_BOUNDS = cfg['loop_bounds']
+        if 'loop_summary_k' in cfg:
+            global_params.LOOP_SUMMARY_K = cfg['loop_summary_k']
+        if 'static_cfg' in cfg:
+            global_params.STATIC_CFG = cfg['static_cfg']
+        if 'anytime_results' in cfg:
+            global_params.ANYTIME_RESULTS = cfg['anytime_results']
+        if 'prune_infeasible' in cfg:
+            global_params.PRUNE_INFEASIBLE = cfg['prune_infeasible']
+        if 'solver_workers' in cfg:
+            global_params.SOLVER_WORKERS = cfg['solver_workers']
+        if 'max_pending_queries' in cfg:
+            global_params.MAX_PENDING_QUERIES = cfg['max_pending_queries']
+        if 'merge_states' in cfg:
+            global_params.MERGE_STATES = cfg['merge_states']
+        if 'max_merge_diffs' in cfg:
+            global_params.MAX_MERGE_DIFFS = cfg['max_merge_diffs']
+        if 'state_table_size' in cfg:
+            global_params.STATE_TABLE_SIZE = cfg['state_table_size']
+        if 'skip_revert_blocks' in cfg:
+            global_params.SKIP_REVERT_BLOCKS = cfg['skip_revert_blocks']
         if 'ast_abstracts' in cfg:
             global_params.AST = cfg['ast_abstracts']
         if 'cfg_abstracts' in cfg:
@@ -74,19 +115,6 @@ def intersect(list1, range):
         return False
 
 
-def to_symbolic(number, bits=256):
-    if not is_expr(number):
-        return BitVecVal(number, bits)
-    return number
-
-
-def to_real(value):
-    try:
-        return int(str(simplify(value)))
-    except:  # pylint: disable=bare-except
-        return None
-
-
 def custom_deepcopy(input_dict):
     output = {}
     for key in input_dict:
@@ -99,39 +127,46 @@ def custom_deepcopy(input_dict):
     return output
 
 
-def is_all_real(*args):
-    for element in args:
-        if is_expr(element):
-            return False
-    return True
-
-
-# simplify a z3 expression if possible, and convert to int if possible
-# todo: this is time-consuming, be careful to use this
-def convert_result(value):
-    if is_expr(value):
-        value = simplify(value)
-    try:
-        if is_const(value):
-            value = int(str(value))
-    except:  # pylint: disable=bare-except
-        pass
-    return value
-
-
-# convert result to int, if not success, return BIG_INT_256
-def convert_result_to_int(value):
-    if is_expr(value):
-        value = simplify(value)
-    else:
-        return value
-    try:
-        if is_const(value):
-            value = int(str(value))
-            return value
-    except:  # pylint: disable=bare-except
-        pass
-    return global_params.BIG_INT_256
+class LruCache:
+    """A bounded mapping which evicts the least recently used entry."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def resize(self, max_size):
+        self.max_size = max_size
+        while len(self._data) > max(max_size, 0):
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
 
 
 def ceil32(x):